@@ -3,15 +3,30 @@
 KOSPI, KOSDAQ, 미국 시장의 섹터별/종목별 턴어라운드 시각화
 """
 
+import time
+import_started = time.perf_counter()    # 모듈 가져오기 시간 (서버 시작 지표)
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+import threading
 import warnings
+
+from startup import get_refresher, prewarm, lazy_import, record_import, record_first_render
+from pipeline import MARKETS, generate_sample_data, default_reader
+from screener import ScreenerIndex, DEFAULT_QUERY, DEFAULT_TOP_K
+from correlation import (
+    WINDOWS, DEFAULT_WINDOW, DEFAULT_CLUSTERS, MAX_CELLS, sync_correlation, cluster, flat_clusters, block_mean,
+    cluster_summary,
+)
+from horizons import HORIZONS, BAR_SIZES, BASE_VIEW, SAMPLE_HISTORY_DAYS, bar_options, select_view
+from intraday import INTERVALS, FileReplayFeed, IntradaySession, ensure_replay, replay_path
+from stock_table import DISPLAY_COLUMNS, sector_rows, query_stocks, stock_page, page_count
+from ticker_memo import default_memo
+from metrics import Metrics, setup_logging
 warnings.filterwarnings('ignore')
+setup_logging()
+record_import('app', time.perf_counter() - import_started)
 
 # 페이지 설정
 st.set_page_config(
@@ -58,504 +73,198 @@ st.markdown("""
 
 # ============ 데이터 로딩 함수들 ============
 
-@st.cache_data(ttl=3600)
-def load_market_data(market: str, use_real_data: bool = False):
-    """시장 데이터 로드 (실제 API 또는 샘플 데이터)"""
-    
-    if use_real_data:
-        try:
-            data = load_real_data(market)
-            # 데이터 유효성 검사
-            if data and 'sectors' in data and len(data['sectors']) > 0:
-                if 'turnaround_score' in data['sectors'].columns:
-                    return data
-            st.warning("실제 데이터가 불완전합니다. 샘플 데이터를 사용합니다.")
-        except Exception as e:
-            st.warning(f"실제 데이터 로드 실패: {e}. 샘플 데이터를 사용합니다.")
-    
-    return generate_sample_data(market)
+def format_age(seconds: float) -> str:
+    """경과 시간 표시"""
+    if seconds < 60:
+        return f"{seconds:.0f}초"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}분"
+    return f"{seconds / 3600:.1f}시간"
 
 
-def load_real_data(market: str):
-    """실제 데이터 로드 (FinanceDataReader 사용)"""
-    try:
-        import FinanceDataReader as fdr
-    except ImportError:
-        raise Exception("FinanceDataReader가 설치되어 있지 않습니다.")
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=120)
-    
-    if market == "KOSPI":
-        sector_stocks = {
-            '반도체': {'005930': '삼성전자', '000660': 'SK하이닉스', '042700': '한미반도체'},
-            '자동차': {'005380': '현대차', '000270': '기아', '012330': '현대모비스'},
-            '금융': {'105560': 'KB금융', '055550': '신한지주', '086790': '하나금융'},
-            '바이오': {'207940': '삼성바이오', '068270': '셀트리온', '326030': 'SK바이오팜'},
-            '2차전지': {'373220': 'LG에너지솔루션', '006400': '삼성SDI', '096770': 'SK이노베이션'},
-            '철강': {'005490': 'POSCO홀딩스', '004020': '현대제철', '001230': '동국제강'},
-            '화학': {'051910': 'LG화학', '010950': 'S-Oil', '011170': '롯데케미칼'},
-            '조선': {'009540': '한국조선해양', '010620': '현대미포조선', '042660': '대우조선해양'},
-        }
-    elif market == "KOSDAQ":
-        sector_stocks = {
-            '바이오': {'196170': '알테오젠', '298380': '에이비엘바이오', '141080': '레고켐바이오'},
-            '2차전지소재': {'247540': '에코프로비엠', '278280': '천보', '086520': '에코프로'},
-            '게임': {'263750': '펄어비스', '112040': '위메이드', '194480': '데브시스터즈'},
-            'IT서비스': {'403870': '플레이트', '053800': '안랩', '030520': '한글과컴퓨터'},
-            '반도체장비': {'036830': '솔브레인홀딩스', '098460': '고영', '240810': '원익IPS'},
-        }
-    else:  # US
-        sector_stocks = {
-            'Technology': {'NVDA': 'NVIDIA', 'AAPL': 'Apple', 'MSFT': 'Microsoft', 'GOOGL': 'Google', 'META': 'Meta'},
-            'Healthcare': {'UNH': 'UnitedHealth', 'JNJ': 'J&J', 'PFE': 'Pfizer', 'ABBV': 'Abbvie', 'MRK': 'Merck'},
-            'Financials': {'JPM': 'JPMorgan', 'BAC': 'Bank of America', 'WFC': 'Wells Fargo', 'GS': 'Goldman', 'MS': 'Morgan Stanley'},
-            'Energy': {'XOM': 'Exxon', 'CVX': 'Chevron', 'COP': 'ConocoPhillips', 'SLB': 'Schlumberger', 'EOG': 'EOG'},
-            'Consumer': {'AMZN': 'Amazon', 'TSLA': 'Tesla', 'WMT': 'Walmart', 'HD': 'Home Depot', 'NKE': 'Nike'},
-        }
-    
-    dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
-    sector_data = []
-    stock_data = []
-    
-    for sector_name, stocks in sector_stocks.items():
-        sector_prices = []
-        
-        for code, name in stocks.items():
-            try:
-                df = fdr.DataReader(code, start_date, end_date)
-                if df is None or len(df) < 20:
-                    continue
-                    
-                if 'Close' not in df.columns:
-                    continue
-                    
-                prices = df['Close'].dropna().values
-                if len(prices) < 20:
-                    continue
-                
-                # 기술적 지표 계산
-                price_series = pd.Series(prices)
-                ma20 = price_series.rolling(20).mean().iloc[-1]
-                ma60 = price_series.rolling(min(60, len(prices))).mean().iloc[-1]
-                
-                delta = price_series.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-                rs = gain / loss
-                rsi_value = (100 - (100 / (1 + rs))).iloc[-1]
-                rsi = rsi_value if not np.isnan(rsi_value) else 50
-                
-                low_price = float(min(prices))
-                current_price = float(prices[-1])
-                from_low = ((current_price - low_price) / low_price) * 100 if low_price > 0 else 0
-                ma20_vs_ma60 = ((ma20 / ma60) - 1) * 100 if ma60 > 0 else 0
-                
-                # 스코어 계산
-                score = 0
-                score += min(from_low / 2, 30)
-                score += 20 if ma20 > ma60 else 0
-                score += min(max(rsi - 30, 0) / 2, 25)
-                score += 15  # 거래량 기본점수
-                
-                is_turnaround = score >= 50
-                
-                stock_data.append({
-                    'sector': sector_name,
-                    'stock': name,
-                    'from_low': round(float(from_low), 1),
-                    'ma20_vs_ma60': round(float(ma20_vs_ma60), 2),
-                    'rsi': round(float(rsi), 1),
-                    'volume_ratio': 100.0,
-                    'foreign_buy': 0.0,
-                    'turnaround_score': round(min(float(score), 100)),
-                    'is_turnaround': is_turnaround,
-                })
-                
-                # 섹터 평균용 데이터 수집
-                normalized_prices = (prices / prices[0] * 100).tolist()
-                sector_prices.append({
-                    'prices': normalized_prices[-90:] if len(normalized_prices) > 90 else normalized_prices,
-                    'from_low': from_low,
-                    'ma20_vs_ma60': ma20_vs_ma60,
-                    'rsi': rsi,
-                    'score': score
-                })
-            except Exception as e:
-                continue
-        
-        # 섹터 평균 계산
-        if sector_prices:
-            avg_from_low = np.mean([s['from_low'] for s in sector_prices])
-            avg_ma = np.mean([s['ma20_vs_ma60'] for s in sector_prices])
-            avg_rsi = np.mean([s['rsi'] for s in sector_prices])
-            avg_score = np.mean([s['score'] for s in sector_prices])
-            
-            # 가격 데이터 평균
-            min_len = min(len(s['prices']) for s in sector_prices)
-            if min_len > 0:
-                avg_prices = np.mean([s['prices'][:min_len] for s in sector_prices], axis=0)
-            else:
-                avg_prices = [100.0] * 90
-            
-            sector_data.append({
-                'sector': sector_name,
-                'prices': avg_prices.tolist() if isinstance(avg_prices, np.ndarray) else avg_prices,
-                'dates': dates[:len(avg_prices)].tolist(),
-                'current_price': float(avg_prices[-1]) if len(avg_prices) > 0 else 100.0,
-                'from_low': round(float(avg_from_low), 1),
-                'ma20': 0.0,
-                'ma60': 0.0,
-                'ma20_vs_ma60': round(float(avg_ma), 2),
-                'rsi': round(float(avg_rsi), 1),
-                'volume_ratio': 100.0,
-                'foreign_buy': 0.0,
-                'turnaround_score': round(min(float(avg_score), 100)),
-                'is_turnaround': avg_score >= 50,
-            })
-    
-    if not sector_data:
-        raise Exception("데이터를 가져올 수 없습니다. 네트워크 연결을 확인하세요.")
-    
-    return {
-        'sectors': pd.DataFrame(sector_data),
-        'stocks': pd.DataFrame(stock_data) if stock_data else pd.DataFrame(),
-        'dates': dates,
-    }
+# ============ 시각화 함수들 ============
 
+# 차트 모듈(plotly.express 등)은 첫 차트를 그릴 때 가져옴
+CHART_BUILDERS = {
+    'ranking': 'create_turnaround_ranking_chart',
+    'price_trend': 'create_price_trend_chart',
+    'score_trend': 'create_score_trend_chart',
+    'indicator': 'create_indicator_chart',
+    'scatter': 'create_scatter_chart',
+    'radar': 'create_radar_chart',
+    'correlation': 'create_correlation_heatmap',
+}
 
-def generate_sample_data(market: str) -> dict:
-    """샘플 데이터 생성"""
-    
-    np.random.seed(42)
-    
-    sectors_config = {
-        'KOSPI': {
-            '반도체': ['삼성전자', 'SK하이닉스', 'DB하이텍', '리노공업', '한미반도체'],
-            '자동차': ['현대차', '기아', '현대모비스', '만도', 'HL만도'],
-            '금융': ['KB금융', '신한지주', '하나금융', '우리금융', '삼성생명'],
-            '바이오': ['삼성바이오', '셀트리온', 'SK바이오팜', '유한양행', '녹십자'],
-            '2차전지': ['LG에너지솔루션', '삼성SDI', 'SK이노베이션', '에코프로비엠', '포스코퓨처엠'],
-            '철강': ['POSCO홀딩스', '현대제철', '동국제강', '세아베스틸', '고려아연'],
-            '화학': ['LG화학', 'S-Oil', '롯데케미칼', '금호석유', 'SK케미칼'],
-            '조선': ['한국조선해양', '현대미포조선', '삼성중공업', '대우조선해양', 'HD현대'],
-            '건설': ['삼성물산', '현대건설', 'GS건설', '대림산업', 'DL이앤씨'],
-            '유통': ['삼성물산', '신세계', '현대백화점', '롯데쇼핑', 'BGF리테일'],
-        },
-        'KOSDAQ': {
-            'IT서비스': ['카카오게임즈', '더존비즈온', '위메이드', '컴투스', '네오위즈'],
-            '게임': ['크래프톤', '펄어비스', '스마일게이트', '넷마블', '웹젠'],
-            '바이오': ['알테오젠', '에이비엘바이오', '레고켐바이오', '펩트론', '메드팩토'],
-            '엔터테인먼트': ['하이브', 'JYP엔터', 'SM엔터', '와이지엔터', '큐브엔터'],
-            '반도체장비': ['원익IPS', '주성엔지니어링', '피에스케이', '테스', '유진테크'],
-            '2차전지소재': ['에코프로', '엘앤에프', '코스모신소재', '나노신소재', '천보'],
-            '로봇': ['레인보우로보틱스', '두산로보틱스', '로보스타', '뉴로메카', '티로보틱스'],
-            'AI/SW': ['솔트룩스', '마인즈랩', '셀바스AI', '코난테크놀로지', '플리토'],
-            '의료기기': ['오스템임플란트', '레이', '바텍', '디오', '덴티움'],
-            '신재생에너지': ['씨에스윈드', '한화솔루션', 'OCI', 'SK가스', '두산퓨얼셀'],
-        },
-        'US': {
-            'Technology': ['NVIDIA', 'Apple', 'Microsoft', 'Google', 'Meta'],
-            'Healthcare': ['UnitedHealth', 'Johnson & Johnson', 'Pfizer', 'Abbvie', 'Merck'],
-            'Financials': ['JPMorgan', 'Bank of America', 'Wells Fargo', 'Goldman Sachs', 'Morgan Stanley'],
-            'Energy': ['Exxon Mobil', 'Chevron', 'ConocoPhillips', 'Schlumberger', 'EOG Resources'],
-            'Consumer': ['Amazon', 'Tesla', 'Walmart', 'Home Depot', 'Nike'],
-            'Industrials': ['Caterpillar', 'Boeing', 'Honeywell', '3M', 'Union Pacific'],
-            'Materials': ['Linde', 'Air Products', 'Sherwin-Williams', 'Freeport-McMoRan', 'Nucor'],
-            'Real Estate': ['Prologis', 'American Tower', 'Crown Castle', 'Equinix', 'Public Storage'],
-            'Utilities': ['NextEra Energy', 'Duke Energy', 'Southern Company', 'Dominion', 'Exelon'],
-            'Communication': ['Verizon', 'AT&T', 'T-Mobile', 'Comcast', 'Disney'],
-        }
-    }
-    
-    sectors = sectors_config.get(market, sectors_config['KOSPI'])
-    
-    # 날짜 생성 (최근 90일)
-    dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
-    
-    sector_data = []
-    stock_data = []
-    
-    for sector_name, stocks in sectors.items():
-        # 섹터가 턴어라운드 중인지 결정
-        is_turnaround = np.random.random() > 0.4
-        turnaround_day = np.random.randint(30, 60) if is_turnaround else None
-        
-        # 섹터 가격 데이터 생성
-        base_price = 100
-        prices = []
-        
-        for i in range(len(dates)):
-            if is_turnaround:
-                if i < turnaround_day:
-                    # 하락 구간
-                    price = base_price - (turnaround_day - i) * 0.3 + np.random.randn() * 1
-                else:
-                    # 상승 구간
-                    price = base_price + (i - turnaround_day) * 0.4 + np.random.randn() * 1
-            else:
-                # 횡보 또는 하락
-                price = base_price + np.cumsum(np.random.randn(i+1) * 0.5)[-1]
-            prices.append(max(price, 50))
-        
-        prices = np.array(prices)
-        
-        # 기술적 지표 계산
-        ma20 = pd.Series(prices).rolling(20).mean().iloc[-1]
-        ma60 = pd.Series(prices).rolling(60).mean().iloc[-1]
-        
-        # RSI 계산
-        delta = pd.Series(prices).diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = (100 - (100 / (1 + rs))).iloc[-1]
-        
-        low_price = min(prices)
-        current_price = prices[-1]
-        from_low = ((current_price - low_price) / low_price) * 100
-        
-        # 거래량 (턴어라운드 시 증가)
-        volume_ratio = 150 + np.random.rand() * 50 if is_turnaround else 80 + np.random.rand() * 40
-        
-        # 외국인 순매수
-        foreign_buy = np.random.randn() * 500 + (200 if is_turnaround else -100)
-        
-        # 턴어라운드 스코어 계산
-        score = 0
-        score += min(from_low / 2, 30)  # 저점 대비 상승률 (최대 30점)
-        score += 20 if ma20 > ma60 else 0  # 골든크로스 (20점)
-        score += min(max(rsi - 30, 0) / 2, 25)  # RSI (최대 25점)
-        score += min(volume_ratio / 10, 15)  # 거래량 (최대 15점)
-        score += 10 if foreign_buy > 0 else 0  # 외국인 순매수 (10점)
-        
-        sector_data.append({
-            'sector': sector_name,
-            'prices': prices.tolist(),
-            'dates': dates.tolist(),
-            'current_price': current_price,
-            'from_low': round(from_low, 1),
-            'ma20': ma20,
-            'ma60': ma60,
-            'ma20_vs_ma60': round((ma20 / ma60 - 1) * 100, 2) if ma60 else 0,
-            'rsi': round(rsi, 1) if not np.isnan(rsi) else 50,
-            'volume_ratio': round(volume_ratio, 1),
-            'foreign_buy': round(foreign_buy, 1),
-            'turnaround_score': round(min(score, 100)),
-            'is_turnaround': is_turnaround,
-        })
-        
-        # 개별 종목 데이터
-        for stock_name in stocks:
-            stock_turnaround = is_turnaround and np.random.random() > 0.3
-            stock_from_low = from_low * (0.7 + np.random.rand() * 0.6)
-            stock_rsi = rsi * (0.8 + np.random.rand() * 0.4) if not np.isnan(rsi) else 50
-            stock_ma = (ma20 / ma60 - 1) * 100 * (0.7 + np.random.rand() * 0.6) if ma60 else 0
-            
-            stock_score = 0
-            stock_score += min(stock_from_low / 2, 30)
-            stock_score += 20 if stock_ma > 0 else 0
-            stock_score += min(max(stock_rsi - 30, 0) / 2, 25)
-            stock_score += min(volume_ratio / 10, 15) * (0.8 + np.random.rand() * 0.4)
-            stock_score += 10 if np.random.random() > 0.5 else 0
-            
-            stock_data.append({
-                'sector': sector_name,
-                'stock': stock_name,
-                'from_low': round(stock_from_low, 1),
-                'ma20_vs_ma60': round(stock_ma, 2),
-                'rsi': round(min(max(stock_rsi, 0), 100), 1),
-                'volume_ratio': round(volume_ratio * (0.7 + np.random.rand() * 0.6), 1),
-                'foreign_buy': round(foreign_buy * (0.5 + np.random.rand()), 1),
-                'turnaround_score': round(min(max(stock_score, 0), 100)),
-                'is_turnaround': stock_turnaround,
-            })
-    
-    return {
-        'sectors': pd.DataFrame(sector_data),
-        'stocks': pd.DataFrame(stock_data),
-        'dates': dates,
-    }
 
+@st.cache_resource(max_entries=64, show_spinner=False)
+def cached_chart(chart: str, key: tuple, _args: tuple):
+    """차트 메모이제이션 (key = (스냅샷 식별자, 입력값), 같은 key면 만든 Figure를 그대로 재사용)
 
-# ============ 시각화 함수들 ============
+    Figure는 그리기 전용으로만 쓰므로 복사 없이 공유한다.
+    """
+    return getattr(lazy_import('charts'), CHART_BUILDERS[chart])(*_args)
 
-def create_turnaround_ranking_chart(df: pd.DataFrame):
-    """턴어라운드 스코어 랭킹 차트"""
-    df_sorted = df.sort_values('turnaround_score', ascending=True)
-    
-    colors = ['#00d26a' if score >= 70 else '#ffc107' if score >= 50 else '#ff6b6b' 
-              for score in df_sorted['turnaround_score']]
-    
-    fig = go.Figure(go.Bar(
-        x=df_sorted['turnaround_score'],
-        y=df_sorted['sector'],
-        orientation='h',
-        marker_color=colors,
-        text=df_sorted['turnaround_score'],
-        textposition='outside',
-        hovertemplate='<b>%{y}</b><br>스코어: %{x}<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title='🔥 섹터별 턴어라운드 스코어',
-        xaxis_title='스코어',
-        yaxis_title='',
-        height=400,
-        margin=dict(l=20, r=20, t=50, b=20),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
-    
-    fig.update_xaxes(range=[0, 110])
-    
-    return fig
 
+def show_metrics(load: dict, render: dict, providers: dict = None, startup: dict = None, memo: dict = None):
+    """사이드바 진단 패널 (데이터 로드, 이번 화면 그리기, 시세 공급자 상태, 종목 메모, 서버 시작)"""
+    for title, summary in (("데이터 로드", load), ("화면 그리기", render)):
+        if not summary:
+            continue
+        st.markdown(f"**{title}** · {summary['name']} · 총 {summary['total'] * 1000:,.0f}ms")
+        st.dataframe(
+            pd.DataFrame({'단계': list(summary['stages']),
+                          'ms': [round(v * 1000, 1) for v in summary['stages'].values()]}),
+            hide_index=True, use_container_width=True
+        )
+        if summary['counts']:
+            st.caption(" · ".join(f"{key} {value:,}" for key, value in summary['counts'].items()))
+        if summary['errors']:
+            st.caption("실패: " + ", ".join(f"{key} {value}" for key, value in summary['errors'].items()))
+        latency = summary['latency_ms']
+        if latency['count']:
+            st.caption(f"공급자 응답 {latency['count']:,}건 · p50 {latency['p50']}ms · "
+                       f"p90 {latency['p90']}ms · p99 {latency['p99']}ms · 최대 {latency['max']}ms")
+    if providers:
+        st.markdown("**시세 공급자** (이 프로세스 누적)")
+        st.dataframe(pd.DataFrame(providers).T.fillna(0), use_container_width=True)
+    if memo:
+        st.caption(f"종목 메모 {memo['entries']:,}개 · {memo['mb']}MB · 적중 {memo.get('hits', 0):,} · "
+                   f"부재 {memo.get('misses', 0):,} · 제거 {memo.get('evicted', 0) + memo.get('expired', 0):,}")
+    if startup:
+        first = startup['first_render']
+        since = "서버 시작" if startup['launcher'] else "첫 요청"
+        st.markdown(f"**서버 시작** · {since} 후 첫 화면 {first.get('since_start', 0):,.1f}초")
+        st.dataframe(
+            pd.DataFrame({'모듈': list(startup['imports']),
+                          'ms': [round(v * 1000, 1) for v in startup['imports'].values()]}),
+            hide_index=True, use_container_width=True
+        )
+        if startup['prewarm']:
+            st.caption("미리 만들기: " + " · ".join(
+                f"{key} {value['since_start']:,.1f}초{'' if value['ok'] else ' (실패)'}"
+                for key, value in startup['prewarm'].items()))
 
-def create_price_trend_chart(data: dict, selected_sectors: list):
-    """가격 추이 차트"""
-    fig = go.Figure()
-    
-    colors = px.colors.qualitative.Set2
-    
-    for i, sector in enumerate(selected_sectors):
-        sector_row = data['sectors'][data['sectors']['sector'] == sector].iloc[0]
-        
-        fig.add_trace(go.Scatter(
-            x=data['dates'],
-            y=sector_row['prices'],
-            mode='lines',
-            name=sector,
-            line=dict(width=2, color=colors[i % len(colors)]),
-            hovertemplate='<b>%{fullData.name}</b><br>날짜: %{x}<br>가격: %{y:.1f}<extra></extra>'
-        ))
-    
-    fig.update_layout(
-        title='📊 섹터별 가격 추이 (3개월)',
-        xaxis_title='날짜',
-        yaxis_title='지수 (기준=100)',
-        height=400,
-        hovermode='x unified',
-        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
-    
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-    
-    return fig
 
+@st.cache_resource(max_entries=8, show_spinner=False)
+def cached_sector_rows(key: tuple, _stocks: pd.DataFrame) -> dict:
+    """스냅샷별 섹터 -> 종목 행 위치 색인 (key = 스냅샷 식별자)"""
+    return sector_rows(_stocks)
 
-def create_indicator_chart(df: pd.DataFrame):
-    """기술적 지표 종합 차트"""
-    df_sorted = df.sort_values('turnaround_score', ascending=False)
-    
-    fig = make_subplots(
-        rows=1, cols=2,
-        subplot_titles=('저점 대비 상승률 & MA 크로스', 'RSI & 거래량'),
-        horizontal_spacing=0.1
-    )
-    
-    # 저점 대비 상승률
-    colors1 = ['#00d26a' if x > 15 else '#ffc107' if x > 0 else '#ff6b6b' for x in df_sorted['from_low']]
-    fig.add_trace(
-        go.Bar(
-            x=df_sorted['sector'],
-            y=df_sorted['from_low'],
-            name='저점 대비 상승률(%)',
-            marker_color=colors1,
-            hovertemplate='%{x}<br>저점 대비: %{y:.1f}%<extra></extra>'
-        ),
-        row=1, col=1
-    )
-    
-    # MA 크로스 라인
-    fig.add_trace(
-        go.Scatter(
-            x=df_sorted['sector'],
-            y=df_sorted['ma20_vs_ma60'],
-            name='MA20-MA60(%)',
-            mode='lines+markers',
-            line=dict(color='#8b5cf6', width=2),
-            marker=dict(size=8),
-            hovertemplate='%{x}<br>MA크로스: %{y:.1f}%<extra></extra>'
-        ),
-        row=1, col=1
-    )
-    
-    # RSI
-    colors2 = ['#00d26a' if x > 50 else '#ff6b6b' for x in df_sorted['rsi']]
-    fig.add_trace(
-        go.Bar(
-            x=df_sorted['sector'],
-            y=df_sorted['rsi'],
-            name='RSI',
-            marker_color=colors2,
-            hovertemplate='%{x}<br>RSI: %{y:.1f}<extra></extra>'
-        ),
-        row=1, col=2
-    )
-    
-    # RSI 50 기준선
-    fig.add_hline(y=50, line_dash="dash", line_color="gray", row=1, col=2)
-    
-    fig.update_layout(
-        height=400,
-        showlegend=True,
-        legend=dict(orientation='h', yanchor='bottom', y=1.08, xanchor='center', x=0.5),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
-    
-    fig.update_xaxes(tickangle=45)
-    
-    return fig
-
-
-def create_scatter_chart(df: pd.DataFrame):
-    """턴어라운드 버블 차트"""
-    fig = px.scatter(
-        df,
-        x='from_low',
-        y='rsi',
-        size='turnaround_score',
-        color='turnaround_score',
-        hover_name='sector',
-        color_continuous_scale='RdYlGn',
-        size_max=50,
-        hover_data={
-            'from_low': ':.1f',
-            'rsi': ':.1f',
-            'ma20_vs_ma60': ':.2f',
-            'turnaround_score': True
-        }
-    )
-    
-    # 사분면 표시
-    fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
-    fig.add_vline(x=15, line_dash="dash", line_color="gray", opacity=0.5)
-    
-    # 주석 추가
-    fig.add_annotation(x=30, y=70, text="🚀 강한 턴어라운드", showarrow=False, font=dict(size=12, color="green"))
-    fig.add_annotation(x=-5, y=30, text="⚠️ 약세 지속", showarrow=False, font=dict(size=12, color="red"))
-    
-    fig.update_layout(
-        title='🎯 턴어라운드 매트릭스 (저점대비 vs RSI)',
-        xaxis_title='저점 대비 상승률 (%)',
-        yaxis_title='RSI',
-        height=450,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def cached_screener(key: tuple, _frames: dict) -> ScreenerIndex:
+    """스냅샷 조합별 스크리너 색인 (key = 시장별 스냅샷 식별자)"""
+    return ScreenerIndex.from_markets(_frames)
+
+
+@st.cache_resource
+def get_correlation_states() -> tuple:
+    """프로세스 공용 상관 행렬 상태 ((시장, 실제 데이터, 대상) -> RollingCorrelation)와 잠금"""
+    return {}, threading.Lock()
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def cached_correlation(key: tuple, state_key: tuple, window: int, _panel) -> dict:
+    """스냅샷별 상관 행렬과 군집 (key = (스냅샷 식별자, 대상, 창), 이전 스냅샷 상태에 새 거래일만 반영)"""
+    started = time.perf_counter()
+    states, lock = get_correlation_states()
+    with lock:
+        state = sync_correlation(states.get(state_key), _panel, window)
+        states[state_key] = state
+        corr = state.matrix()
+    return {'matrix': corr, **cluster(corr), 'elapsed': time.perf_counter() - started}
+
+
+def show_stock_table(stocks: pd.DataFrame, rows, sector: str):
+    """종목별 상세 테이블 (필터/정렬 후 현재 페이지만 그림)"""
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+    with col1:
+        search = st.text_input("종목명 검색", key='stock_search')
+    with col2:
+        min_score = st.slider("최소 스코어", 0, 100, 0, step=5, key='stock_min_score')
+    with col3:
+        sort_label = st.selectbox("정렬", options=list(DISPLAY_COLUMNS.values()), index=1, key='stock_sort')
+    with col4:
+        ascending = st.toggle("오름차순", value=False, key='stock_ascending')
+    only_turnaround = st.checkbox("턴어라운드 종목만 (50점 이상)", value=False, key='stock_only_turnaround')
+    
+    sort_by = next(column for column, label in DISPLAY_COLUMNS.items() if label == sort_label)
+    matched = query_stocks(stocks, rows, search, min_score, only_turnaround, sort_by, ascending)
+    n_pages = page_count(len(matched))
+    
+    # 조건이 바뀌면 첫 페이지부터
+    page = st.number_input(f"페이지 (총 {n_pages}쪽, {len(matched):,}개 종목)", min_value=1, max_value=n_pages,
+                           value=1, step=1,
+                           key=f"stock_page:{sector}:{search}:{min_score}:{only_turnaround}:{sort_by}:{ascending}")
+    
+    st.dataframe(
+        stock_page(stocks, matched, page),
+        column_config={
+            '스코어': st.column_config.ProgressColumn('스코어', min_value=0, max_value=100, format='%d'),
+            '저점대비(%)': st.column_config.NumberColumn(format='%.1f'),
+            'MA크로스(%)': st.column_config.NumberColumn(format='%.2f'),
+            'RSI': st.column_config.NumberColumn(format='%.1f'),
+            '거래량(%)': st.column_config.NumberColumn(format='%.1f'),
+        },
+        hide_index=True,
+        use_container_width=True,
+        height=400
     )
-    
-    return fig
 
 
-def create_stock_table(df: pd.DataFrame, sector: str):
-    """종목별 상세 테이블"""
-    sector_stocks = df[df['sector'] == sector].sort_values('turnaround_score', ascending=False)
-    return sector_stocks
+INTRADAY_REFRESH = 2    # 장중 현황 갱신 주기 (초)
+
+
+@st.fragment(run_every=INTRADAY_REFRESH)
+def show_intraday(data: dict, token: tuple, use_real_data: bool, interval: str):
+    """장중 현황 (이 부분만 주기적으로 다시 실행해 새 분봉을 반영하고 바뀐 섹터/종목만 보냄)"""
+    market = token[0]
+    key = (token, interval)
+    if st.session_state.get('intraday_key') != key:
+        # 스냅샷이나 봉 간격이 바뀌면 상태를 새로 만듦 (재생 파일이 없거나 스냅샷과 맞지 않으면 스냅샷 종가로 합성)
+        path = replay_path(market, use_real_data)
+        ensure_replay(data, path, market)
+        st.session_state['intraday'] = (IntradaySession(data, use_real_data), FileReplayFeed(path, interval))
+        st.session_state['intraday_key'] = key
+    session, feed = st.session_state['intraday']
+    
+    started = time.perf_counter()
+    changes = session.apply(feed.poll())
+    elapsed = time.perf_counter() - started
+    
+    st.subheader("⏱️ 장중 현황")
+    if feed.now is None:
+        st.caption("첫 봉 대기 중")
+        return
+    if session.bars_applied and not session.bars_matched:
+        st.warning("재생 피드의 종목이 현재 스냅샷 종목과 하나도 맞지 않습니다.")
+    st.caption(f"{feed.now:%Y-%m-%d %H:%M} 기준 · 누적 봉 {session.bars_applied:,}개 · 이번 갱신 "
+               f"종목 {len(changes['stocks']):,}개 / 섹터 {len(changes['sectors'])}개 · {elapsed * 1000:.0f}ms"
+               + (" · 재생 끝" if feed.done else ""))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        sectors = session.sectors[['sector', 'turnaround_score', 'from_low', 'rsi']].assign(
+            change=session.sectors['turnaround_score'].to_numpy() - data['sectors']['turnaround_score'].to_numpy())
+        st.dataframe(
+            sectors.sort_values('turnaround_score', ascending=False).rename(columns={
+                'sector': '섹터', 'turnaround_score': '스코어', 'from_low': '저점대비(%)', 'rsi': 'RSI',
+                'change': '변화'}),
+            hide_index=True, use_container_width=True, height=300
+        )
+    with col2:
+        # 이번 갱신에서 바뀐 종목만, 스냅샷 대비 변화가 큰 순서로
+        rows = changes['stocks']
+        change = session.score_change()[rows]
+        order = np.argsort(-np.abs(change), kind='stable')[:20]
+        rows, change = rows[order], change[order]
+        st.dataframe(
+            session.stocks.iloc[rows][['stock', 'sector', 'turnaround_score', 'from_low', 'rsi']]
+            .assign(change=np.rint(change).astype(int))
+            .rename(columns={'stock': '종목명', 'sector': '섹터', 'turnaround_score': '스코어',
+                             'from_low': '저점대비(%)', 'rsi': 'RSI', 'change': '변화'}),
+            hide_index=True, use_container_width=True, height=300
+        )
 
 
 # ============ 메인 앱 ============
@@ -583,8 +292,24 @@ def main():
             help="체크하면 실제 시장 데이터를 가져옵니다. 인터넷 연결이 필요합니다."
         )
         
+        intraday_mode = st.toggle(
+            "장중 모드",
+            value=False,
+            help="분봉 피드를 받아 바뀐 섹터/종목만 다시 계산합니다. 오프라인에서는 로컬 재생 파일을 씁니다."
+        )
+        interval = INTERVALS[st.radio("봉 간격", options=list(INTERVALS), horizontal=True)] if intraday_mode else None
+        
         st.divider()
         
+        horizon = st.radio(
+            "기간",
+            options=list(HORIZONS),
+            horizontal=True,
+            help="지표 계산 기간 (저점 = 기간 내 최저가, MA20/MA60/RSI는 선택한 봉 기준). 갱신 때 미리 계산해 둔 결과를 바로 보여줍니다."
+        )
+        bar = st.radio("봉", options=bar_options(horizon), format_func=BAR_SIZES.get, horizontal=True,
+                       key=f"bar:{horizon}")
+        
         sort_by = st.selectbox(
             "정렬 기준",
             options=['turnaround_score', 'from_low', 'rsi', 'ma20_vs_ma60'],
@@ -596,186 +321,310 @@ def main():
             }.get(x, x)
         )
         
+        top_n = st.slider(
+            "상위 표시 개수",
+            min_value=5, max_value=100, value=20, step=5,
+            help="차트에는 정렬 기준 상위 N개 섹터만 표시합니다 (종목 테이블은 검색·필터 결과 전체를 페이지로 나눠 보여줌)."
+        )
+        
+        show_diagnostics = st.checkbox("진단 정보 표시", value=False,
+                                       help="데이터 로드와 화면 그리기의 단계별 시간, 종목 수, 응답 시간을 보여줍니다.")
+        diagnostics = st.empty()
+        
         st.divider()
         
         st.markdown("### 📖 지표 설명")
         st.markdown("""
         - **턴어라운드 스코어**: 종합 점수 (0-100)
-        - **저점 대비**: 3개월 저점 대비 상승률
+        - **저점 대비**: 선택 기간(기본 3개월) 저점 대비 상승률
         - **MA20-MA60**: 골든크로스 신호
         - **RSI**: 50↑ = 상승 모멘텀
         - **거래량**: 평균 대비 비율
         """)
     
-    # 데이터 로드
+    # 데이터 로드 (마지막 스냅샷을 바로 쓰고, 갱신은 백그라운드에서)
+    render = Metrics('render')
     with st.spinner('데이터 로딩 중...'):
-        data = load_market_data(market, use_real_data)
+        # 다른 시장 스냅샷도 백그라운드에서 미리 만들어 둠 (startup.py로 띄웠으면 이미 만드는 중)
+        prewarm([(m, use_real_data) for m in MARKETS])
+        snapshot = get_refresher().get((market, use_real_data))
+    render.lap('snapshot')
+    
+    # 차트 메모이제이션 키에 쓰는 스냅샷 식별자
+    token = (market, use_real_data, snapshot.built_at)
+    if snapshot.data is None:
+        st.warning(f"실제 데이터 로드 실패: {snapshot.error}. 샘플 데이터를 사용합니다.")
+        data = generate_sample_data(market, history_days=SAMPLE_HISTORY_DAYS)
+        token = (market, False, None)
+    else:
+        data = snapshot.data
+        if snapshot.error:
+            st.warning(f"최근 갱신 실패: {snapshot.error}. {format_age(snapshot.age)} 전 스냅샷을 표시합니다.")
+        st.caption(f"🕒 {format_age(snapshot.age)} 전 갱신")
+    
+    # 기간/봉 조합은 스냅샷에 미리 계산된 테이블로 바꾸기만 함 (장중 모드는 기본 일봉 기준)
+    base_data, base_token = data, token
+    if (horizon, bar) != BASE_VIEW:
+        if (horizon, bar) in data.get('views', {}):
+            data = select_view(data, horizon, bar)
+            token = token + (horizon, bar)
+        else:
+            st.caption(f"{horizon} {BAR_SIZES[bar]} 테이블이 없는 스냅샷입니다. 기본 기간으로 표시합니다.")
     
     sectors_df = data['sectors'].sort_values(sort_by, ascending=False)
     stocks_df = data['stocks']
+    top_sectors_df = sectors_df.head(top_n)
     
-    # 탭 구성
-    tab1, tab2, tab3 = st.tabs(["📊 섹터 분석", "🔍 종목 분석", "📈 상세 차트"])
+    if 'coverage' in data:
+        coverage = data['coverage']
+        st.caption(f"스캔: {coverage['scanned']:,}/{coverage['universe']:,}개 종목 "
+                   f"({coverage['elapsed']:.1f}초 / 제한 {coverage['budget']:.0f}초)")
     
-    with tab1:
-        # 상단 메트릭
-        col1, col2, col3, col4 = st.columns(4)
-        
-        top_sector = sectors_df.iloc[0]
-        turnaround_count = len(sectors_df[sectors_df['is_turnaround']])
-        avg_score = sectors_df['turnaround_score'].mean()
-        avg_from_low = sectors_df['from_low'].mean()
-        
-        with col1:
-            st.metric(
-                label="🏆 Top 섹터",
-                value=top_sector['sector'],
-                delta=f"스코어: {top_sector['turnaround_score']}"
-            )
-        with col2:
-            st.metric(
-                label="🔥 턴어라운드 섹터",
-                value=f"{turnaround_count}개",
-                delta=f"전체 {len(sectors_df)}개 중"
-            )
-        with col3:
-            st.metric(
-                label="📊 평균 스코어",
-                value=f"{avg_score:.1f}",
-                delta="양호" if avg_score >= 50 else "주의"
-            )
-        with col4:
-            st.metric(
-                label="📈 평균 저점대비",
-                value=f"{avg_from_low:.1f}%",
-                delta="상승" if avg_from_low > 0 else "하락"
+    render.lap('prepare')
+    
+    if intraday_mode:
+        # 실제 데이터 로드에 실패해 샘플을 보여줄 때는 샘플 재생 파일/상태를 씀 (base_token[1] = 실제 데이터 여부)
+        show_intraday(base_data, base_token, base_token[1], interval)
+    
+    # 탭 구성 (선택된 탭만 실행)
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 섹터 분석", "🔍 종목 분석", "📈 상세 차트", "🧮 스크리너", "🔗 동조화"],
+                                           key='main_tab', on_change='rerun')
+    
+    if tab1.open:
+        with tab1:
+            # 상단 메트릭
+            col1, col2, col3, col4 = st.columns(4)
+            
+            top_sector = sectors_df.iloc[0]
+            turnaround_count = len(sectors_df[sectors_df['is_turnaround']])
+            avg_score = sectors_df['turnaround_score'].mean()
+            avg_from_low = sectors_df['from_low'].mean()
+            
+            with col1:
+                st.metric(
+                    label="🏆 Top 섹터",
+                    value=top_sector['sector'],
+                    delta=f"스코어: {top_sector['turnaround_score']}"
+                )
+            with col2:
+                st.metric(
+                    label="🔥 턴어라운드 섹터",
+                    value=f"{turnaround_count}개",
+                    delta=f"전체 {len(sectors_df)}개 중"
+                )
+            with col3:
+                st.metric(
+                    label="📊 평균 스코어",
+                    value=f"{avg_score:.1f}",
+                    delta="양호" if avg_score >= 50 else "주의"
+                )
+            with col4:
+                st.metric(
+                    label="📈 평균 저점대비",
+                    value=f"{avg_from_low:.1f}%",
+                    delta="상승" if avg_from_low > 0 else "하락"
+                )
+            
+            st.divider()
+            
+            # 차트 영역
+            col_left, col_right = st.columns([1, 1])
+            
+            with col_left:
+                st.plotly_chart(cached_chart('ranking', (token, sort_by, top_n), (top_sectors_df,)),
+                                use_container_width=True)
+            
+            with col_right:
+                # 상위 5개 섹터 선택
+                top_sectors = sectors_df.head(5)['sector'].tolist()
+                st.plotly_chart(cached_chart('price_trend', (token, tuple(top_sectors)), (data, top_sectors)),
+                                use_container_width=True)
+            
+            # 지표 차트
+            st.plotly_chart(cached_chart('indicator', (token, sort_by, top_n), (top_sectors_df,)),
+                            use_container_width=True)
+            
+            # 버블 차트
+            st.plotly_chart(cached_chart('scatter', (token, sort_by, top_n), (top_sectors_df,)),
+                            use_container_width=True)
+    
+    if tab2.open:
+        with tab2:
+            st.subheader("🔍 종목별 턴어라운드 분석")
+            
+            # 섹터 선택
+            selected_sector = st.selectbox(
+                "섹터 선택",
+                options=sectors_df['sector'].tolist(),
+                index=0
             )
-        
-        st.divider()
-        
-        # 차트 영역
-        col_left, col_right = st.columns([1, 1])
-        
-        with col_left:
-            st.plotly_chart(create_turnaround_ranking_chart(sectors_df), use_container_width=True)
-        
-        with col_right:
-            # 상위 5개 섹터 선택
-            top_sectors = sectors_df.head(5)['sector'].tolist()
-            st.plotly_chart(create_price_trend_chart(data, top_sectors), use_container_width=True)
-        
-        # 지표 차트
-        st.plotly_chart(create_indicator_chart(sectors_df), use_container_width=True)
-        
-        # 버블 차트
-        st.plotly_chart(create_scatter_chart(sectors_df), use_container_width=True)
+            
+            # 선택된 섹터 정보
+            sector_info = sectors_df[sectors_df['sector'] == selected_sector].iloc[0]
+            
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                score_color = "turnaround-high" if sector_info['turnaround_score'] >= 70 else "turnaround-mid" if sector_info['turnaround_score'] >= 50 else "turnaround-low"
+                st.markdown(f"**스코어**<br><span class='{score_color}'>{sector_info['turnaround_score']}</span>", unsafe_allow_html=True)
+            with col2:
+                st.metric("저점 대비", f"{sector_info['from_low']:.1f}%")
+            with col3:
+                st.metric("MA 크로스", f"{sector_info['ma20_vs_ma60']:.2f}%")
+            with col4:
+                st.metric("RSI", f"{sector_info['rsi']:.1f}")
+            with col5:
+                st.metric("거래량", f"{sector_info['volume_ratio']:.1f}%")
+            
+            st.divider()
+            
+            # 종목 테이블 (섹터 색인은 스냅샷마다 한 번)
+            rows = cached_sector_rows(token, stocks_df).get(selected_sector, np.empty(0, dtype=int))
+            show_stock_table(stocks_df, rows, selected_sector)
     
-    with tab2:
-        st.subheader("🔍 종목별 턴어라운드 분석")
-        
-        # 섹터 선택
-        selected_sector = st.selectbox(
-            "섹터 선택",
-            options=sectors_df['sector'].tolist(),
-            index=0
-        )
-        
-        # 선택된 섹터 정보
-        sector_info = sectors_df[sectors_df['sector'] == selected_sector].iloc[0]
-        
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            score_color = "turnaround-high" if sector_info['turnaround_score'] >= 70 else "turnaround-mid" if sector_info['turnaround_score'] >= 50 else "turnaround-low"
-            st.markdown(f"**스코어**<br><span class='{score_color}'>{sector_info['turnaround_score']}</span>", unsafe_allow_html=True)
-        with col2:
-            st.metric("저점 대비", f"{sector_info['from_low']:.1f}%")
-        with col3:
-            st.metric("MA 크로스", f"{sector_info['ma20_vs_ma60']:.2f}%")
-        with col4:
-            st.metric("RSI", f"{sector_info['rsi']:.1f}")
-        with col5:
-            st.metric("거래량", f"{sector_info['volume_ratio']:.1f}%")
-        
-        st.divider()
-        
-        # 종목 테이블
-        stock_table = create_stock_table(stocks_df, selected_sector)
-        
-        # 스타일링된 테이블
-        def highlight_turnaround(row):
-            score = row['스코어']
-            if score >= 70:
-                return ['background-color: rgba(0, 210, 106, 0.2)'] * len(row)
-            elif score >= 50:
-                return ['background-color: rgba(255, 193, 7, 0.2)'] * len(row)
+    if tab3.open:
+        with tab3:
+            st.subheader("📈 상세 차트 분석")
+            
+            # 여러 섹터 선택
+            selected_sectors = st.multiselect(
+                "비교할 섹터 선택 (최대 5개)",
+                options=sectors_df['sector'].tolist(),
+                default=sectors_df.head(3)['sector'].tolist(),
+                max_selections=5
+            )
+            
+            # 기간을 좁히면 그 구간만 다시 잘라 화면 폭만큼 촘촘하게 그림 (전체 기간이면 자르지 않음)
+            dates = data['sector_panel'].dates
+            date_range = None
+            if len(dates) > 1:
+                picked = st.select_slider(
+                    "기간",
+                    options=list(dates),
+                    value=(dates[0], dates[-1]),
+                    format_func=lambda d: d.strftime('%Y-%m-%d'),
+                    key=f"trend_range:{dates[0]:%Y%m%d}:{dates[-1]:%Y%m%d}:{len(dates)}"
+                )
+                if picked != (dates[0], dates[-1]):
+                    date_range = picked
+            
+            if selected_sectors:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    fig = cached_chart('price_trend', (token, tuple(selected_sectors), date_range),
+                                       (data, selected_sectors, date_range))
+                    st.plotly_chart(fig, use_container_width=True)
+                    points = sum(len(trace.x) for trace in fig.data)
+                    st.caption(f"표시 {points:,}개 점 · {'WebGL' if fig.data and fig.data[0].type == 'scattergl' else 'SVG'}")
+                
+                with col2:
+                    st.plotly_chart(cached_chart('score_trend', (token, tuple(selected_sectors), date_range),
+                                                 (data, selected_sectors, date_range)),
+                                    use_container_width=True)
+                
+                # 선택된 섹터들의 상세 비교
+                comparison_df = sectors_df[sectors_df['sector'].isin(selected_sectors)]
+                st.plotly_chart(cached_chart('radar', (token, tuple(comparison_df['sector'])), (comparison_df,)),
+                                use_container_width=True)
             else:
-                return ['background-color: rgba(255, 107, 107, 0.2)'] * len(row)
-        
-        styled_df = stock_table[['stock', 'from_low', 'ma20_vs_ma60', 'rsi', 'volume_ratio', 'turnaround_score']].copy()
-        styled_df.columns = ['종목명', '저점대비(%)', 'MA크로스(%)', 'RSI', '거래량(%)', '스코어']
-        
-        st.dataframe(
-            styled_df.style.apply(highlight_turnaround, axis=1).format({
-                '저점대비(%)': '{:.1f}',
-                'MA크로스(%)': '{:.2f}',
-                'RSI': '{:.1f}',
-                '거래량(%)': '{:.1f}',
-                '스코어': '{:.0f}'
-            }),
-            use_container_width=True,
-            height=400
-        )
+                st.info("비교할 섹터를 선택해주세요.")
     
-    with tab3:
-        st.subheader("📈 상세 차트 분석")
-        
-        # 여러 섹터 선택
-        selected_sectors = st.multiselect(
-            "비교할 섹터 선택 (최대 5개)",
-            options=sectors_df['sector'].tolist(),
-            default=sectors_df.head(3)['sector'].tolist(),
-            max_selections=5
-        )
-        
-        if selected_sectors:
-            st.plotly_chart(create_price_trend_chart(data, selected_sectors), use_container_width=True)
+    if tab4.open:
+        with tab4:
+            st.subheader("🧮 종목 스크리너")
             
-            # 선택된 섹터들의 상세 비교
-            comparison_df = sectors_df[sectors_df['sector'].isin(selected_sectors)]
+            all_markets = st.checkbox("전체 시장 (KOSPI · KOSDAQ · US)", value=False, key='screen_all_markets')
+            if all_markets:
+                frames, tokens = {}, []
+                for m in MARKETS:
+                    other = snapshot if m == market else get_refresher().get((m, use_real_data))
+                    if other.data is not None:
+                        frames[m] = other.data['stocks']
+                        tokens.append((m, other.built_at))
+                index = cached_screener(tuple(tokens), _frames=frames)
+            else:
+                index = cached_screener((token,), _frames={market: stocks_df})
             
-            fig = go.Figure()
+            query = st.text_input("조건", value=DEFAULT_QUERY, key='screen_query',
+                                  help="열 비교를 &(그리고), |(또는)로 연결. 열: " + ", ".join(index.columns))
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                numeric = list(index.numeric)
+                screen_by = st.selectbox("정렬 기준", options=numeric, index=numeric.index('turnaround_score'),
+                                         key='screen_by')
+            with col2:
+                screen_k = st.number_input("상위 k", min_value=1, max_value=500, value=DEFAULT_TOP_K, key='screen_k')
+            with col3:
+                screen_ascending = st.toggle("오름차순", value=False, key='screen_ascending')
             
-            categories = ['저점대비', 'RSI', 'MA크로스', '거래량', '스코어']
+            try:
+                started = time.perf_counter()
+                matched = index.match(query)
+                result = index.top(query, screen_by, int(screen_k), screen_ascending)
+                elapsed = time.perf_counter() - started
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.caption(f"{len(index):,}개 종목 중 {len(matched):,}개 일치 · {elapsed * 1000:.1f}ms")
+                st.dataframe(result, hide_index=True, use_container_width=True, height=400)
+    
+    if tab5.open:
+        with tab5:
+            st.subheader("🔗 섹터/종목 동조화")
             
-            for _, row in comparison_df.iterrows():
-                # 정규화된 값
-                values = [
-                    min(row['from_low'] / 50 * 100, 100),  # 저점대비 (50% = 100점)
-                    row['rsi'],  # RSI (이미 0-100)
-                    min(max((row['ma20_vs_ma60'] + 10) / 20 * 100, 0), 100),  # MA크로스 (-10~10% → 0-100)
-                    min(row['volume_ratio'], 100),  # 거래량 (100% = 100점)
-                    row['turnaround_score']  # 스코어
-                ]
-                values.append(values[0])  # 레이더 차트 닫기
-                
-                fig.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=categories + [categories[0]],
-                    fill='toself',
-                    name=row['sector'],
-                    opacity=0.6
-                ))
+            col1, col2, col3 = st.columns([2, 2, 1])
+            with col1:
+                target = st.radio("대상", options=['섹터', '전체 종목'], horizontal=True, key='corr_target')
             
-            fig.update_layout(
-                polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-                showlegend=True,
-                title='🎯 섹터별 레이더 차트',
-                height=500
-            )
+            # 일간 수익률 기준이므로 기간/봉 선택과 무관하게 기본 일봉 패널 사용
+            if target == '섹터':
+                panel = base_data['sector_panel']
+                score_of = dict(zip(base_data['sectors']['sector'], base_data['sectors']['turnaround_score']))
+                scores = [score_of.get(label, np.nan) for label in panel.labels]
+            else:
+                panel = base_data['panel']
+                scores = base_data['stocks']['turnaround_score'].to_numpy()
+            labels = list(panel.labels)
             
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("비교할 섹터를 선택해주세요.")
+            with col2:
+                window = st.select_slider("수익률 기간 (거래일)", options=WINDOWS, value=DEFAULT_WINDOW, key='corr_window')
+            with col3:
+                n_clusters = st.number_input("군집 수", min_value=1, max_value=max(len(labels), 1),
+                                             value=max(1, min(DEFAULT_CLUSTERS, len(labels) // 3)),
+                                             key=f"corr_clusters:{target}")
+            result = cached_correlation((base_token, target, window), (market, use_real_data, target), window,
+                                        _panel=panel)
+            order = result['order']
+            
+            if len(labels) <= MAX_CELLS:
+                matrix = result['matrix'][np.ix_(order, order)]
+                names = [labels[i] for i in order]
+                note = ""
+            else:
+                # 화면에는 군집 순서대로 묶은 칸의 평균만 보냄
+                matrix, starts = block_mean(result['matrix'], order)
+                names = [f"{labels[order[s]]} 외 {n - 1}" for s, n in zip(starts, np.diff(np.r_[starts, len(order)]))]
+                note = f" · 화면은 {len(names)}x{len(names)}칸 평균"
+            if (horizon, bar) != BASE_VIEW:
+                st.info(f"동조화는 선택한 기간/봉({horizon} {BAR_SIZES[bar]})과 무관하게 기본 일봉의 최근 {window}거래일 "
+                        "수익률로 계산합니다.")
+            st.caption(f"{len(labels):,}개 x 기본 일봉 최근 {window}거래일 수익률 · 행렬 {result['matrix'].nbytes / 1e6:.1f}MB · "
+                       f"계산/군집 {result['elapsed'] * 1000:,.0f}ms{note}")
+            st.plotly_chart(cached_chart('correlation', (base_token, target, window),
+                                         (matrix, names, f"🔗 {target} 수익률 상관관계 (군집 순서)", len(names) <= 60)),
+                            use_container_width=True)
+            
+            clusters = flat_clusters(result['linkage'], int(n_clusters))
+            st.dataframe(cluster_summary(result['matrix'], labels, clusters, order, scores),
+                         hide_index=True, use_container_width=True)
+    
+    render.lap('tab')
+    render_summary = render.log(market=market, real=use_real_data, tab=st.session_state.get('main_tab'))
+    startup = record_first_render(render_summary, market=market, real=use_real_data)
+    if show_diagnostics:
+        with diagnostics.container():
+            show_metrics(data.get('metrics'), render_summary, default_reader().summary() if use_real_data else None,
+                         startup, default_memo().summary() if use_real_data else None)
     
     # 푸터
     st.divider()
@@ -0,0 +1,244 @@
+"""
+턴어라운드 스코어 백테스트
+전 종목 x 전 거래일 스코어를 한 번에 계산해 점수 구간/기준 점수별 미래 수익률, 적중률, 교체율을 집계
+"""
+
+import sys
+import time
+import argparse
+import itertools
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from indicators import MIN_HISTORY, MA_LONG, LOOKBACK_BARS, indicator_panels, rolling_mean, rolling_min
+
+
+HORIZONS = (5, 20, 60)                  # 미래 수익률 기간 (거래일)
+THRESHOLDS = (40, 50, 60, 70)           # 턴어라운드 판정 기준 점수
+BUCKETS = tuple(range(0, 101, 10))      # 점수 구간 경계
+LOW_WINDOW = LOOKBACK_BARS             # 저점 대비 상승률의 저점 구간 (대시보드 기본 테이블 조회 구간)
+
+# 스코어 항목별 만점 (turnaround_score와 같은 배점)
+DEFAULT_WEIGHTS = {'from_low': 30, 'ma_cross': 20, 'rsi': 25, 'volume': 15, 'foreign': 10}
+
+
+def score_components(close: np.ndarray, volume: np.ndarray = None, foreign: np.ndarray = None) -> dict:
+    """일자별 스코어 항목을 0~1로 정규화한 float32 행렬 (항목 -> 종목 x 일자)
+
+    만점 x 항목값을 더하면 그날 대시보드 기본 테이블의 turnaround_score와 같다. 저점은 기본 테이블 조회 구간
+    (LOOKBACK_DAYS 달력일 ≒ LOW_WINDOW 거래일) 안의 최저가이며, 스코어 추이(score_history.daily_scores)처럼
+    행렬 시작부터의 최저가가 아니다. 거래량이 없으면 실제 데이터 경로처럼 거래량 항목은 만점,
+    외국인 순매수가 없으면 0점으로 둔다.
+    """
+    close = np.asarray(close, dtype=float)
+    ind = indicator_panels(close)
+    low = rolling_min(close, LOW_WINDOW)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        from_low = np.where(low > 0, (close - low) / low * 100, 0.0)
+
+    components = {
+        'from_low': np.minimum(from_low / 60, 1),
+        'ma_cross': ind['ma20_vs_ma60'] > 0,
+        'rsi': np.minimum(np.maximum(ind['rsi'] - 30, 0) / 50, 1),
+    }
+    if volume is None:
+        components['volume'] = np.ones_like(close)
+    else:
+        volume = np.asarray(volume, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = rolling_mean(volume, 5) / rolling_mean(volume, MA_LONG, min_periods=MIN_HISTORY) * 100
+        components['volume'] = np.minimum(np.nan_to_num(ratio) / 150, 1)
+    components['foreign'] = np.zeros_like(close) if foreign is None else np.broadcast_to(
+        np.asarray(foreign, dtype=float) > 0, close.shape)
+
+    # 지표가 준비되지 않은 구간(이력 MIN_HISTORY일 미만)과 결측일은 NaN
+    invalid = np.isnan(ind['ma20']) | np.isnan(close)
+    out = {}
+    for name, values in components.items():
+        values = np.asarray(values, dtype=np.float32)
+        out[name] = np.where(invalid, np.float32(np.nan), values)
+    return out
+
+
+def score_panel(components: dict, weights: dict = None) -> np.ndarray:
+    """항목별 가중합 스코어 (종목 x 일자, 100점 상한)"""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    score = np.zeros_like(next(iter(components.values())))
+    for name, values in components.items():
+        if weights.get(name):
+            score += np.float32(weights[name]) * values
+    return np.minimum(score, 100, out=score)
+
+
+def forward_returns(close: np.ndarray, horizons=HORIZONS) -> dict:
+    """기간별 미래 수익률(%) 행렬 (끝쪽 기간 부족 구간은 NaN)"""
+    close = np.asarray(close, dtype=np.float32)
+    out = {}
+    for h in horizons:
+        ret = np.full(close.shape, np.nan, dtype=np.float32)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ret[:, :-h] = (close[:, h:] / close[:, :-h] - 1) * 100
+        out[h] = ret
+    return out
+
+
+def bucket_report(score: np.ndarray, returns: dict, buckets=BUCKETS) -> pd.DataFrame:
+    """점수 구간별 관측 수, 평균 미래 수익률, 적중률(수익률 > 0)"""
+    edges = np.asarray(buckets)
+    labels = [f"{lo}-{hi}" for lo, hi in zip(edges[:-1], edges[1:])]
+    which = np.clip(np.digitize(score, edges[1:-1]), 0, len(labels) - 1)
+    valid_score = ~np.isnan(score)
+
+    rows = {}
+    for h, ret in returns.items():
+        valid = valid_score & ~np.isnan(ret)
+        b = which[valid]
+        r = ret[valid].astype(float)
+        count = np.bincount(b, minlength=len(labels))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rows[f"{h}일 평균(%)"] = np.bincount(b, weights=r, minlength=len(labels)) / count
+            rows[f"{h}일 적중률(%)"] = np.bincount(b, weights=r > 0, minlength=len(labels)) / count * 100
+        rows[f"{h}일 관측"] = count
+    return pd.DataFrame(rows, index=pd.Index(labels, name='점수 구간'))
+
+
+def threshold_report(score: np.ndarray, returns: dict, thresholds=THRESHOLDS) -> pd.DataFrame:
+    """기준 점수별 신호 수, 평균 미래 수익률, 적중률, 전체 대비 초과 수익률, 일평균 교체율"""
+    valid_score = ~np.isnan(score)
+    rows = []
+    for threshold in thresholds:
+        selected = valid_score & (score >= threshold)
+        row = {'기준 점수': threshold, '일평균 신호 종목': selected.sum(axis=0).mean()}
+
+        # 교체율: 전날 신호 종목 중 오늘 빠진 비율 (한 방향)
+        held = selected[:, :-1].sum(axis=0)
+        exited = (selected[:, :-1] & ~selected[:, 1:]).sum(axis=0)
+        row['교체율(%)'] = exited.sum() / held.sum() * 100 if held.sum() else np.nan
+
+        for h, ret in returns.items():
+            valid = selected & ~np.isnan(ret)
+            base = valid_score & ~np.isnan(ret)
+            r = ret[valid].astype(float)
+            row[f"{h}일 평균(%)"] = r.mean() if len(r) else np.nan
+            row[f"{h}일 적중률(%)"] = (r > 0).mean() * 100 if len(r) else np.nan
+            row[f"{h}일 초과(%)"] = row[f"{h}일 평균(%)"] - ret[base].astype(float).mean()
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('기준 점수')
+
+
+def run_backtest(close: np.ndarray, volume: np.ndarray = None, foreign: np.ndarray = None,
+                 weights: dict = None, horizons=HORIZONS, thresholds=THRESHOLDS) -> dict:
+    """전 종목 x 전 거래일 백테스트 결과 {'buckets', 'thresholds', 'timings'}"""
+    timings = {}
+    t0 = time.perf_counter()
+    components = score_components(close, volume, foreign)
+    timings['components'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    score = score_panel(components, weights)
+    returns = forward_returns(close, horizons)
+    timings['score'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    result = {
+        'buckets': bucket_report(score, returns),
+        'thresholds': threshold_report(score, returns, thresholds),
+    }
+    timings['report'] = time.perf_counter() - t0
+    result['timings'] = timings
+    return result
+
+
+def sweep(close: np.ndarray, grid: dict, volume: np.ndarray = None, foreign: np.ndarray = None,
+          threshold: float = 50, horizon: int = 20) -> pd.DataFrame:
+    """가중치 조합별 (기준 점수 이상 신호의) 미래 수익률/적중률 (항목 계산은 한 번만)
+
+    grid: 항목 -> 후보 만점 목록 (예: {'from_low': [20, 30, 40], 'rsi': [15, 25]}), 빠진 항목은 기본 배점.
+    """
+    components = score_components(close, volume, foreign)
+    ret = forward_returns(close, (horizon,))[horizon]
+    base = ~np.isnan(ret)
+    base_mean = ret[base & ~np.isnan(components['ma_cross'])].astype(float).mean()
+
+    names = list(grid)
+    rows = []
+    for combo in itertools.product(*(grid[name] for name in names)):
+        weights = dict(zip(names, combo))
+        score = score_panel(components, weights)
+        selected = (score >= threshold) & base
+        r = ret[selected].astype(float)
+        rows.append({
+            **weights,
+            '신호 수': int(selected.sum()),
+            f"{horizon}일 평균(%)": r.mean() if len(r) else np.nan,
+            f"{horizon}일 적중률(%)": (r > 0).mean() * 100 if len(r) else np.nan,
+            f"{horizon}일 초과(%)": (r.mean() - base_mean) if len(r) else np.nan,
+        })
+    return pd.DataFrame(rows).sort_values(f"{horizon}일 평균(%)", ascending=False, ignore_index=True)
+
+
+def load_history(market: str, years: float, read_fn=None):
+    """실제 데이터 종가 행렬 (로컬 저장소 경유, 종목 x 거래일)"""
+    from fetcher import fetch_histories
+    from price_store import PriceStore
+    from price_panel import PricePanel
+    from pipeline import default_reader
+    from universe import load_universe
+
+    end = datetime.now()
+    start = end - timedelta(days=int(years * 365))
+    codes = list(dict.fromkeys(code for stocks in load_universe(market).values() for code in stocks))
+    read_fn = PriceStore().reader(read_fn or default_reader())
+
+    labels, closes, volumes = [], [], []
+    for code, df, error in fetch_histories(read_fn, codes, start, end, deadline=max(90.0, len(codes) * 0.5)):
+        if error is None and df is not None and 'Close' in df.columns and len(df) >= MIN_HISTORY:
+            labels.append(code)
+            closes.append(df['Close'])
+            volumes.append(df['Volume'] if 'Volume' in df.columns else df['Close'] * np.nan)
+    close = PricePanel.from_series(labels, closes)
+    volume = PricePanel.from_series(labels, volumes, dates=close.dates)
+    return close.values, volume.values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="턴어라운드 스코어 백테스트")
+    parser.add_argument('--market', help="실제 데이터 시장 (KOSPI/KOSDAQ/US, 생략하면 합성 데이터)")
+    parser.add_argument('--years', type=float, default=3, help="실제 데이터 기간 (년)")
+    parser.add_argument('--tickers', type=int, default=3000, help="합성 데이터 종목 수")
+    parser.add_argument('--days', type=int, default=1260, help="합성 데이터 거래일 수")
+    parser.add_argument('--sweep', action='store_true', help="가중치 조합 비교")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.market:
+        close, volume = load_history(args.market, args.years)
+        source = f"{args.market} {args.years:g}년"
+    else:
+        from synthetic import generate_market
+        market = generate_market(n_tickers=args.tickers, n_sectors=30, n_days=args.days)
+        close, volume = market['close'], market['volume']
+        source = "합성"
+    print(f"{source}: {close.shape[0]:,}종목 x {close.shape[1]:,}일 (준비 {time.perf_counter() - t0:.2f}초)")
+
+    pd.set_option('display.width', 200)
+    pd.set_option('display.max_columns', 20)
+    result = run_backtest(close, volume)
+    print(result['buckets'].round(2))
+    print(result['thresholds'].round(2))
+    print("소요: " + ", ".join(f"{name} {seconds:.2f}초" for name, seconds in result['timings'].items()))
+
+    if args.sweep:
+        t0 = time.perf_counter()
+        table = sweep(close, {'from_low': [20, 30, 40], 'ma_cross': [10, 20, 30], 'rsi': [15, 25, 35],
+                              'volume': [0, 15]}, volume)
+        print(table.head(10).round(2))
+        print(f"가중치 {len(table)}개 조합 {time.perf_counter() - t0:.2f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    # 사용법: python backtest.py [--market KOSPI --years 3] [--tickers 3000 --days 1260] [--sweep]
+    sys.exit(main())
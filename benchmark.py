@@ -0,0 +1,299 @@
+"""
+성능 측정
+샘플 데이터 생성, 지표/스코어 계산, 실제 데이터 로드(가짜 공급자), 차트 생성 시간을 여러 규모에서 재고
+(서버 시작 항목은 새 프로세스에서 모듈 가져오기와 첫 화면 시간을 잼)
+JSON 기준값으로 저장해 커밋 간 비교
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import statistics
+
+import numpy as np
+import pandas as pd
+
+from price_store import DEFAULT_STORE_DIR
+
+
+TICKER_SIZES = (50, 500, 2000, 10000)
+DAY_SIZES = (90, 250, 1260, 2520)          # 약 3개월 ~ 10년 거래일
+SECTOR_SIZES = (10, 100)
+QUICK_TICKER_SIZES = (50, 500)
+QUICK_DAY_SIZES = (90, 250)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25                    # 기준 대비 이 배수보다 느려지면 회귀로 표시
+DEFAULT_OUTPUT_DIR = os.path.join(DEFAULT_STORE_DIR, 'bench')
+
+
+def measure(fn, repeat: int = DEFAULT_REPEAT, warmup: bool = False) -> dict:
+    """fn()을 repeat번 실행한 시간 (초, warmup이면 첫 실행은 빼고 잼)"""
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def synthetic_universe(n_tickers: int, n_sectors: int) -> dict:
+    """가짜 공급자용 섹터 -> {종목코드: 종목명}"""
+    return {
+        f"섹터{s + 1:02d}": {f"{i:06d}": f"종목{i:06d}" for i in range(s, n_tickers, n_sectors)}
+        for s in range(n_sectors)
+    }
+
+
+def sectors_for(n_tickers: int) -> int:
+    return 30 if n_tickers >= 300 else 10
+
+
+def bench_sample(tickers, days, repeat):
+    from pipeline import generate_sample_data
+
+    for n in tickers:
+        for d in days:
+            yield {'tickers': n, 'days': d}, measure(
+                lambda: generate_sample_data('KOSPI', n_tickers=n, n_sectors=sectors_for(n), n_days=d), repeat)
+
+
+def bench_indicators(tickers, days, repeat):
+    from indicators import compute_indicators, turnaround_score, volume_points
+    from synthetic import generate_market
+
+    for n in tickers:
+        for d in days:
+            market = generate_market(n_tickers=n, n_sectors=sectors_for(n), n_days=d)
+            close = market['close'].astype(float)
+            volume = market['volume']
+
+            def run():
+                ind = compute_indicators(close)
+                volume_ratio = volume[:, -5:].mean(axis=1) / volume[:, -60:].mean(axis=1) * 100
+                turnaround_score(ind['from_low'], ind['ma20_vs_ma60'], ind['rsi'], volume_points(volume_ratio))
+
+            yield {'tickers': n, 'days': d}, measure(run, repeat)
+
+
+def bench_real_load(tickers, days, repeat):
+    """load_real_data 전체 (가짜 공급자, 지연 없음) - 조회 기간은 load_real_data가 정하므로 days는 쓰지 않음"""
+    from fetcher import FakeDataReader
+    from pipeline import load_real_data
+
+    reader = FakeDataReader(latency=0.0, jitter=0.0)
+    for n in tickers:
+        universe = synthetic_universe(n, sectors_for(n))
+        yield {'tickers': n}, measure(
+            lambda: load_real_data('KOSPI', read_fn=reader, universe=universe, deadline=3600), repeat)
+
+
+def bench_charts(tickers, days, repeat):
+    """차트별 생성 시간 (섹터 수 x 거래일 수)"""
+    import charts
+    from pipeline import generate_sample_data
+
+    for n_sectors in SECTOR_SIZES:
+        for d in days:
+            data = generate_sample_data('KOSPI', n_tickers=n_sectors * 5, n_sectors=n_sectors, n_days=d)
+            sectors = data['sectors'].sort_values('turnaround_score', ascending=False)
+            top5 = sectors.head(5)
+            builders = {
+                'ranking': lambda: charts.create_turnaround_ranking_chart(sectors),
+                'price_trend': lambda: charts.create_price_trend_chart(data, top5['sector'].tolist()),
+                'indicator': lambda: charts.create_indicator_chart(sectors),
+                'scatter': lambda: charts.create_scatter_chart(sectors),
+                'radar': lambda: charts.create_radar_chart(top5),
+            }
+            for chart, build in builders.items():
+                yield {'chart': chart, 'sectors': n_sectors, 'days': d}, measure(build, repeat, warmup=True)
+
+
+def bench_stock_table(tickers, days, repeat):
+    """종목 탭 한 번 그리기에 해당하는 필터/정렬/페이지 생성 (가장 큰 섹터, 섹터 색인은 미리 만든 상태)"""
+    from pipeline import generate_sample_data
+    from stock_table import sector_rows, query_stocks, stock_page
+
+    for n in tickers:
+        n_sectors = sectors_for(n)
+        stocks = generate_sample_data('KOSPI', n_tickers=n, n_sectors=n_sectors, n_days=90)['stocks']
+        index = sector_rows(stocks)
+        rows = max(index.values(), key=len)
+
+        def run():
+            stock_page(stocks, query_stocks(stocks, rows, search='0', min_score=30), page=1)
+
+        yield {'tickers': n, 'sector_rows': len(rows)}, measure(run, repeat, warmup=True)
+
+
+def bench_screener(tickers, days, repeat):
+    """복합 조건 + 상위 20개 (세 시장을 합친 색인, 색인 생성은 제외)"""
+    from pipeline import MARKETS, generate_sample_data
+    from screener import ScreenerIndex, DEFAULT_QUERY
+
+    for n in tickers:
+        frames = {market: generate_sample_data(market, n_tickers=n, n_sectors=sectors_for(n), n_days=90,
+                                               seed=i)['stocks'] for i, market in enumerate(MARKETS)}
+        index = ScreenerIndex.from_markets(frames)
+        yield {'tickers': n * len(MARKETS)}, measure(lambda: index.top(DEFAULT_QUERY, k=20), repeat, warmup=True)
+
+
+def bench_correlation(tickers, days, repeat):
+    """최근 60일 수익률 상관 행렬 전체 계산, 하루 외적 갱신, 평균 연결 군집 (행렬이 큰 1만 종목 이상은 제외)"""
+    from synthetic import generate_market
+    from price_panel import PricePanel
+    from correlation import DEFAULT_WINDOW, RollingCorrelation, sync_correlation, cluster
+
+    for n in tickers:
+        if n > 5000:
+            continue
+        market = generate_market(n_tickers=n, n_sectors=sectors_for(n), n_days=DEFAULT_WINDOW + 2)
+        labels = [f"{i:05d}" for i in range(n)]
+        panel = PricePanel(market['dates'], labels, market['close'])
+        previous = PricePanel(panel.dates[:-1], labels, panel.values[:, :-1])
+
+        def full():
+            return RollingCorrelation.from_panel(panel, DEFAULT_WINDOW).matrix()
+
+        # 하루 갱신은 한 번만 의미가 있으므로 (다시 부르면 반영할 날이 없음) 1회만 잼
+        base = RollingCorrelation.from_panel(previous, DEFAULT_WINDOW)
+        yield {'tickers': n, 'step': 'full'}, measure(full, repeat)
+        yield {'tickers': n, 'step': 'update'}, measure(lambda: sync_correlation(base, panel, DEFAULT_WINDOW), 1)
+        corr = full()
+        yield {'tickers': n, 'step': 'cluster'}, measure(lambda: cluster(corr), repeat)
+
+
+STARTUP_CASES = {
+    'streamlit': "import streamlit",
+    'pipeline': "import pipeline",
+    'charts': "import charts",
+    'first_render': "from streamlit.testing.v1 import AppTest\n"
+                    "AppTest.from_file('app.py', default_timeout=300).run()",
+}
+
+
+def cold_start(code: str, repeat: int) -> dict:
+    """새 파이썬 프로세스에서 code를 처음 실행하는 시간 (초, 인터프리터 시작은 빼고 잼)"""
+    script = f"import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append(float(out.stdout.split()[-1]))
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat}
+
+
+def bench_startup(tickers, days, repeat):
+    """서버 프로세스의 모듈 가져오기와 첫 화면(샘플 데이터, 공유 캐시 그대로) 시간 (규모와 무관)"""
+    for step, code in STARTUP_CASES.items():
+        yield {'step': step}, cold_start(code, repeat)
+
+
+SUITES = {
+    'sample': bench_sample,
+    'indicators': bench_indicators,
+    'real_load': bench_real_load,
+    'charts': bench_charts,
+    'stock_table': bench_stock_table,
+    'screener': bench_screener,
+    'correlation': bench_correlation,
+    'startup': bench_startup,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(suites=None, quick: bool = False, repeat: int = DEFAULT_REPEAT) -> dict:
+    """측정 실행 결과 (meta + 케이스별 min/median 초)"""
+    tickers = QUICK_TICKER_SIZES if quick else TICKER_SIZES
+    days = QUICK_DAY_SIZES if quick else DAY_SIZES
+    results = []
+    for suite in suites or SUITES:
+        for params, timing in SUITES[suite](tickers, days, repeat):
+            results.append({'suite': suite, 'params': params, **timing})
+            label = ' '.join(f"{k}={v}" for k, v in params.items())
+            print(f"{suite:<11} {label:<40} {timing['min'] * 1000:10.1f}ms  (중앙값 {timing['median'] * 1000:.1f}ms)")
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'quick': quick,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def case_key(result: dict) -> tuple:
+    return (result['suite'], tuple(sorted(result['params'].items())))
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """기준 대비 느려진 케이스 목록 [(케이스, 기준 초, 현재 초, 배수)] (최솟값 기준)"""
+    base = {case_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = base.get(case_key(result))
+        if old is None or old['min'] <= 0:
+            continue
+        ratio = result['min'] / old['min']
+        if ratio > threshold:
+            regressions.append((case_key(result), old['min'], result['min'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터/지표/차트 성능 측정")
+    parser.add_argument('suites', nargs='*', help=f"측정할 항목 (기본: 전체 - {', '.join(SUITES)})")
+    parser.add_argument('--quick', action='store_true', help="작은 규모만 측정")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--out', help="결과 JSON 경로 (기본: .data/bench/<커밋>-<시각>.json)")
+    parser.add_argument('--compare', help="비교할 기준 JSON 경로")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"알 수 없는 항목: {', '.join(unknown)} (가능: {', '.join(SUITES)})")
+
+    report = run(args.suites or None, args.quick, args.repeat)
+
+    path = args.out
+    if path is None:
+        stamp = pd.Timestamp.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(DEFAULT_OUTPUT_DIR, f"{report['meta']['commit'] or 'local'}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"저장: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for (suite, params), old, new, ratio in regressions:
+            label = ' '.join(f"{k}={v}" for k, v in params)
+            print(f"느려짐: {suite} {label}  {old * 1000:.1f}ms -> {new * 1000:.1f}ms ({ratio:.2f}x)")
+        print(f"기준 {baseline['meta'].get('commit')} 대비 회귀 {len(regressions)}건 (기준 {args.threshold:g}x)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    # 사용법: python benchmark.py [sample indicators real_load charts stock_table screener] [--quick] [--compare 기준.json]
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+차트 생성
+섹터/종목 데이터로 Plotly Figure를 만듦 (Streamlit 없이 사용 가능)
+"""
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from downsample import DEFAULT_MAX_POINTS, WEBGL_THRESHOLD, downsample_series
+
+
+def create_turnaround_ranking_chart(df: pd.DataFrame):
+    """턴어라운드 스코어 랭킹 차트"""
+    df_sorted = df.sort_values('turnaround_score', ascending=True)
+    
+    colors = ['#00d26a' if score >= 70 else '#ffc107' if score >= 50 else '#ff6b6b' 
+              for score in df_sorted['turnaround_score']]
+    
+    fig = go.Figure(go.Bar(
+        x=df_sorted['turnaround_score'],
+        y=df_sorted['sector'],
+        orientation='h',
+        marker_color=colors,
+        text=df_sorted['turnaround_score'],
+        textposition='outside',
+        hovertemplate='<b>%{y}</b><br>스코어: %{x}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title='🔥 섹터별 턴어라운드 스코어',
+        xaxis_title='스코어',
+        yaxis_title='',
+        height=400,
+        margin=dict(l=20, r=20, t=50, b=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    fig.update_xaxes(range=[0, 110])
+    
+    return fig
+
+
+def add_line_traces(fig, panel, selected_sectors: list, hovertemplate: str, date_range=None,
+                    max_points: int = DEFAULT_MAX_POINTS):
+    """패널 행들을 선 그래프로 추가 (기간을 자르고 LTTB로 max_points개 이하로 줄임, 점이 많으면 WebGL)"""
+    colors = px.colors.qualitative.Set2
+    
+    dates = panel.dates
+    cols = slice(None)
+    if date_range is not None:
+        start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        cols = slice(dates.searchsorted(start, 'left'), dates.searchsorted(end, 'right'))
+    series = [downsample_series(dates[cols], panel.series(sector)[cols], max_points) for sector in selected_sectors]
+    
+    trace = go.Scattergl if sum(len(x) for x, _ in series) > WEBGL_THRESHOLD else go.Scatter
+    for i, (sector, (x, y)) in enumerate(zip(selected_sectors, series)):
+        fig.add_trace(trace(
+            x=x,
+            y=y,
+            mode='lines',
+            name=sector,
+            line=dict(width=2, color=colors[i % len(colors)]),
+            hovertemplate=hovertemplate
+        ))
+
+
+def create_price_trend_chart(data: dict, selected_sectors: list, date_range=None,
+                             max_points: int = DEFAULT_MAX_POINTS):
+    """가격 추이 차트"""
+    fig = go.Figure()
+    
+    add_line_traces(fig, data['sector_panel'], selected_sectors,
+                    '<b>%{fullData.name}</b><br>날짜: %{x}<br>가격: %{y:.1f}<extra></extra>', date_range, max_points)
+    
+    fig.update_layout(
+        title='📊 섹터별 가격 추이',
+        xaxis_title='날짜',
+        yaxis_title='지수 (기준=100)',
+        height=400,
+        hovermode='x unified',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+    
+    return fig
+
+
+def create_score_trend_chart(data: dict, selected_sectors: list, date_range=None,
+                             max_points: int = DEFAULT_MAX_POINTS):
+    """스코어 추이 차트"""
+    fig = go.Figure()
+    
+    add_line_traces(fig, data['sector_scores'], selected_sectors,
+                    '<b>%{fullData.name}</b><br>날짜: %{x}<br>스코어: %{y:.0f}<extra></extra>', date_range, max_points)
+    
+    # 턴어라운드 기준선
+    fig.add_hline(y=50, line_dash='dash', line_color='rgba(255,193,7,0.7)',
+                  annotation_text='턴어라운드 기준 (50)', annotation_position='bottom right')
+    
+    fig.update_layout(
+        title='🔥 섹터별 턴어라운드 스코어 추이',
+        xaxis_title='날짜',
+        yaxis_title='스코어',
+        height=400,
+        hovermode='x unified',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+    fig.update_yaxes(range=[0, 100], showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+    
+    return fig
+
+
+def create_indicator_chart(df: pd.DataFrame):
+    """기술적 지표 종합 차트"""
+    df_sorted = df.sort_values('turnaround_score', ascending=False)
+    
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=('저점 대비 상승률 & MA 크로스', 'RSI & 거래량'),
+        horizontal_spacing=0.1
+    )
+    
+    # 저점 대비 상승률
+    colors1 = ['#00d26a' if x > 15 else '#ffc107' if x > 0 else '#ff6b6b' for x in df_sorted['from_low']]
+    fig.add_trace(
+        go.Bar(
+            x=df_sorted['sector'],
+            y=df_sorted['from_low'],
+            name='저점 대비 상승률(%)',
+            marker_color=colors1,
+            hovertemplate='%{x}<br>저점 대비: %{y:.1f}%<extra></extra>'
+        ),
+        row=1, col=1
+    )
+    
+    # MA 크로스 라인
+    fig.add_trace(
+        go.Scatter(
+            x=df_sorted['sector'],
+            y=df_sorted['ma20_vs_ma60'],
+            name='MA20-MA60(%)',
+            mode='lines+markers',
+            line=dict(color='#8b5cf6', width=2),
+            marker=dict(size=8),
+            hovertemplate='%{x}<br>MA크로스: %{y:.1f}%<extra></extra>'
+        ),
+        row=1, col=1
+    )
+    
+    # RSI
+    colors2 = ['#00d26a' if x > 50 else '#ff6b6b' for x in df_sorted['rsi']]
+    fig.add_trace(
+        go.Bar(
+            x=df_sorted['sector'],
+            y=df_sorted['rsi'],
+            name='RSI',
+            marker_color=colors2,
+            hovertemplate='%{x}<br>RSI: %{y:.1f}<extra></extra>'
+        ),
+        row=1, col=2
+    )
+    
+    # RSI 50 기준선
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", row=1, col=2)
+    
+    fig.update_layout(
+        height=400,
+        showlegend=True,
+        legend=dict(orientation='h', yanchor='bottom', y=1.08, xanchor='center', x=0.5),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    fig.update_xaxes(tickangle=45)
+    
+    return fig
+
+
+def create_scatter_chart(df: pd.DataFrame):
+    """턴어라운드 버블 차트"""
+    fig = px.scatter(
+        df,
+        x='from_low',
+        y='rsi',
+        size='turnaround_score',
+        color='turnaround_score',
+        hover_name='sector',
+        color_continuous_scale='RdYlGn',
+        size_max=50,
+        hover_data={
+            'from_low': ':.1f',
+            'rsi': ':.1f',
+            'ma20_vs_ma60': ':.2f',
+            'turnaround_score': True
+        }
+    )
+    
+    # 사분면 표시
+    fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
+    fig.add_vline(x=15, line_dash="dash", line_color="gray", opacity=0.5)
+    
+    # 주석 추가
+    fig.add_annotation(x=30, y=70, text="🚀 강한 턴어라운드", showarrow=False, font=dict(size=12, color="green"))
+    fig.add_annotation(x=-5, y=30, text="⚠️ 약세 지속", showarrow=False, font=dict(size=12, color="red"))
+    
+    fig.update_layout(
+        title='🎯 턴어라운드 매트릭스 (저점대비 vs RSI)',
+        xaxis_title='저점 대비 상승률 (%)',
+        yaxis_title='RSI',
+        height=450,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    return fig
+
+
+def create_radar_chart(comparison_df: pd.DataFrame):
+    """섹터별 레이더 차트"""
+    fig = go.Figure()
+    
+    categories = ['저점대비', 'RSI', 'MA크로스', '거래량', '스코어']
+    
+    for _, row in comparison_df.iterrows():
+        # 정규화된 값
+        values = [
+            min(row['from_low'] / 50 * 100, 100),  # 저점대비 (50% = 100점)
+            row['rsi'],  # RSI (이미 0-100)
+            min(max((row['ma20_vs_ma60'] + 10) / 20 * 100, 0), 100),  # MA크로스 (-10~10% → 0-100)
+            min(row['volume_ratio'], 100),  # 거래량 (100% = 100점)
+            row['turnaround_score']  # 스코어
+        ]
+        values.append(values[0])  # 레이더 차트 닫기
+    
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories + [categories[0]],
+            fill='toself',
+            name=row['sector'],
+            opacity=0.6
+        ))
+    
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        showlegend=True,
+        title='🎯 섹터별 레이더 차트',
+        height=500
+    )
+    
+    return fig
+
+
+def create_correlation_heatmap(matrix, labels: list, title: str = '🔗 수익률 상관관계', show_labels: bool = True):
+    """상관 행렬 히트맵 (행/열 순서는 넘겨준 그대로, -1 파랑 ~ 1 빨강)"""
+    fig = go.Figure(go.Heatmap(
+        z=matrix,
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu_r',
+        hovertemplate='%{y} · %{x}<br>상관: %{z:.2f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        height=600,
+        margin=dict(l=20, r=20, t=50, b=20),
+        xaxis=dict(showticklabels=show_labels, tickangle=-45),
+        yaxis=dict(showticklabels=show_labels, autorange='reversed'),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    
+    return fig
@@ -0,0 +1,308 @@
+"""
+수익률 상관관계와 계층 군집
+가격 패널의 일간 로그 수익률로 최근 window일 상관 행렬을 float32 블록 연산으로 만들고, 새 거래일은 외적 갱신으로 반영
+군집은 평균 연결 계층 군집 (scipy 없이 numpy, 행별 최근접 군집 캐시)
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+
+
+DEFAULT_WINDOW = 60
+WINDOWS = (20, 40, 60)
+BLOCK = 512             # 블록 연산 한 번에 다루는 행 수 (임시 배열 = BLOCK x 종목 수)
+MAX_CELLS = 200         # 히트맵 한 변의 최대 칸 수 (넘으면 군집 순서대로 묶어 평균)
+DEFAULT_CLUSTERS = 10
+
+
+def log_returns(values: np.ndarray) -> np.ndarray:
+    """종목 x 일자 가격 -> 종목 x (일자-1) 로그 수익률 (float32, 결측일은 직전 가격 유지로 0)"""
+    values = np.asarray(values, dtype=np.float32)
+    n, t = values.shape
+    if t < 2:
+        return np.zeros((n, 0), dtype=np.float32)
+    # 결측은 직전 유효 가격으로 채움 (상장 전 구간은 첫 가격으로)
+    filled = np.maximum.accumulate(np.where(np.isnan(values), -1, np.arange(t)), axis=1)
+    first = np.argmax(~np.isnan(values), axis=1)
+    filled = np.where(filled < 0, first[:, None], filled)
+    prices = np.take_along_axis(values, filled, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.diff(np.log(prices), axis=1)
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0).astype(np.float32)
+
+
+def blocked_cross(x: np.ndarray, block: int = BLOCK) -> np.ndarray:
+    """x @ x.T (float32, 행 블록 단위로 계산)"""
+    out = np.empty((len(x), len(x)), dtype=np.float32)
+    for lo in range(0, len(x), block):
+        np.dot(x[lo:lo + block], x.T, out=out[lo:lo + block])
+    return out
+
+
+class RollingCorrelation:
+    """최근 window일 수익률 상관 행렬 상태 (수익률 합과 교차곱 합을 유지)
+
+    새 거래일은 교차곱에 더하고 창에서 빠지는 날은 빼는 외적 갱신(종목 수^2)으로 반영하므로,
+    전체를 다시 곱하는(종목 수^2 x window) 것보다 빠르다. 마지막 날은 다시 받은 값으로 고칠 수 있다.
+    """
+
+    RESUM_EVERY = 250   # 누적 오차 정리를 위해 이 횟수마다 창 전체로 다시 계산
+
+    def __init__(self, labels, window: int = DEFAULT_WINDOW):
+        self.labels = list(labels)
+        self.window = window
+        n = len(self.labels)
+        self.buffer = np.zeros((n, window), dtype=np.float32)    # 창 안 수익률 (원형 버퍼)
+        self.count = 0
+        self.next = 0                                            # 다음에 쓸 버퍼 열
+        self.sums = np.zeros(n, dtype=np.float64)
+        self.cross = np.zeros((n, n), dtype=np.float32)
+        self.last_date = None
+        self._updates = 0
+
+    @classmethod
+    def from_panel(cls, panel: PricePanel, window: int = DEFAULT_WINDOW) -> 'RollingCorrelation':
+        state = cls(panel.labels, window)
+        returns = log_returns(panel.values)[:, -window:]
+        k = returns.shape[1]
+        state.buffer[:, :k] = returns
+        state.count, state.next = k, k % window
+        state._resum()
+        state.last_date = panel.dates[-1] if len(panel.dates) else None
+        return state
+
+    def push(self, returns: np.ndarray):
+        """새 거래일 수익률 (종목 수 길이) 추가, 창이 차 있으면 가장 오래된 날을 뺌"""
+        returns = np.asarray(returns, dtype=np.float32)
+        old = self.buffer[:, self.next].copy() if self.count == self.window else None
+        self._add_outer(returns, old)
+        self.buffer[:, self.next] = returns
+        self.next = (self.next + 1) % self.window
+        self.count = min(self.count + 1, self.window)
+        self._tick()
+
+    def replace_last(self, returns: np.ndarray):
+        """마지막 날 수익률을 고침 (장중/재수집으로 마지막 봉이 바뀐 경우)"""
+        returns = np.asarray(returns, dtype=np.float32)
+        last = (self.next - 1) % self.window
+        old = self.buffer[:, last].copy()
+        if np.array_equal(old, returns):
+            return
+        self._add_outer(returns, old)
+        self.buffer[:, last] = returns
+        self._tick()
+
+    def matrix(self, block: int = BLOCK) -> np.ndarray:
+        """상관 행렬 (float32, 변동이 없는 종목은 다른 종목과 0, 대각은 1)"""
+        n, w = len(self.labels), max(self.count, 1)
+        mean = (self.sums / w).astype(np.float32)
+        var = np.maximum(np.diag(self.cross) / w - mean * mean, 0)
+        std = np.sqrt(var)
+        inv = np.where(std > 0, 1 / np.where(std > 0, std, 1), 0).astype(np.float32)
+
+        out = np.empty((n, n), dtype=np.float32)
+        for lo in range(0, n, block):
+            rows = slice(lo, lo + block)
+            cov = self.cross[rows] / np.float32(w) - np.outer(mean[rows], mean)
+            np.multiply(cov, np.outer(inv[rows], inv), out=out[rows])
+        np.clip(out, -1, 1, out=out)
+        np.fill_diagonal(out, 1)
+        return out
+
+    def _add_outer(self, new: np.ndarray, old: np.ndarray = None, block: int = BLOCK):
+        """교차곱에 new 외적을 더하고 old 외적을 뺌 (행 블록 단위)"""
+        self.sums += new
+        if old is not None:
+            self.sums -= old
+        for lo in range(0, len(new), block):
+            rows = slice(lo, lo + block)
+            update = np.outer(new[rows], new)
+            if old is not None:
+                update -= np.outer(old[rows], old)
+            self.cross[rows] += update
+
+    def _tick(self):
+        self._updates += 1
+        if self._updates % self.RESUM_EVERY == 0:
+            self._resum()
+
+    def _resum(self):
+        window = self.buffer if self.count == self.window else self.buffer[:, :self.count]
+        self.sums = window.sum(axis=1, dtype=np.float64)
+        self.cross = blocked_cross(np.ascontiguousarray(window))
+
+
+def sync_correlation(state: RollingCorrelation, panel: PricePanel, window: int = DEFAULT_WINDOW) -> RollingCorrelation:
+    """state를 panel에 맞춤 (라벨/창이 같으면 마지막 날을 고치고 새 거래일만 반영, 아니면 새로 만듦)"""
+    if (state is None or state.window != window or state.labels != list(panel.labels)
+            or state.last_date is None or state.last_date not in panel.dates):
+        return RollingCorrelation.from_panel(panel, window)
+
+    last = panel.dates.get_loc(state.last_date)
+    n_new = len(panel.dates) - 1 - last
+    if n_new >= window:
+        return RollingCorrelation.from_panel(panel, window)
+    # 마지막 날부터의 수익률 (마지막 날 수익률은 그 전날 가격이 필요하므로 한 칸 앞부터)
+    returns = log_returns(panel.values[:, max(last - 1, 0):])
+    if last > 0 and state.count:
+        state.replace_last(returns[:, 0])
+    for j in range(returns.shape[1] - n_new, returns.shape[1]):
+        state.push(returns[:, j])
+    state.last_date = panel.dates[-1]
+    return state
+
+
+def average_linkage(dist: np.ndarray) -> np.ndarray:
+    """평균 연결 계층 군집 (scipy linkage 형식 [군집 a, 군집 b, 거리, 크기], 새 군집 번호 = n + 단계)
+
+    행마다 가장 가까운 군집을 캐시해 두고, 합쳐진 군집과 관련된 행만 다시 찾으므로 단계당 O(n) 근처로 끝난다.
+    """
+    n = len(dist)
+    out = np.empty((max(n - 1, 0), 4))
+    if n < 2:
+        return out
+    d = np.array(dist, dtype=np.float32)
+    np.fill_diagonal(d, np.inf)
+    size = np.ones(n)
+    ids = np.arange(n)
+    nearest = np.argmin(d, axis=1)
+    nearest_d = d[np.arange(n), nearest]
+
+    for step in range(n - 1):
+        i = int(np.argmin(nearest_d))
+        j = int(nearest[i])
+        if j < i:
+            i, j = j, i
+        out[step] = (min(ids[i], ids[j]), max(ids[i], ids[j]), d[i, j], size[i] + size[j])
+
+        # Lance-Williams 평균 연결: 새 군집(i 자리)까지 거리 = 크기 가중 평균, j 자리는 비움
+        merged = (size[i] * d[i] + size[j] * d[j]) / (size[i] + size[j])
+        merged[i] = merged[j] = np.inf
+        d[i], d[:, i] = merged, merged
+        d[j], d[:, j] = np.inf, np.inf
+        size[i] += size[j]
+        ids[i] = n + step
+        nearest_d[j] = np.inf
+
+        # 가장 가까운 군집이 i/j였던 행은 다시 찾고, 새 군집이 더 가까워진 행은 i로 바꿈
+        stale = np.flatnonzero((nearest == i) | (nearest == j))
+        stale = stale[stale != j]
+        closer = merged < nearest_d
+        nearest[closer], nearest_d[closer] = i, merged[closer]
+        for k in np.union1d(stale, [i]):
+            nearest[k] = np.argmin(d[k])
+            nearest_d[k] = d[k, nearest[k]]
+    return out
+
+
+def leaf_order(linkage: np.ndarray) -> np.ndarray:
+    """덴드로그램 왼쪽부터의 원래 행 순서"""
+    n = len(linkage) + 1
+    if n == 1:
+        return np.zeros(1, dtype=int)
+    order = []
+    stack = [2 * n - 2]
+    while stack:
+        node = stack.pop()
+        if node < n:
+            order.append(node)
+        else:
+            a, b = linkage[node - n, :2].astype(int)
+            stack.extend((b, a))
+    return np.array(order)
+
+
+def flat_clusters(linkage: np.ndarray, k: int) -> np.ndarray:
+    """군집 k개로 자른 행별 군집 번호 (0부터, 덴드로그램 순서대로 번호를 붙임)"""
+    n = len(linkage) + 1
+    parent = np.arange(2 * n - 1)
+    for step in range(n - max(k, 1)):
+        a, b = linkage[step, :2].astype(int)
+        parent[a] = parent[b] = n + step
+
+    def root(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    roots = np.array([root(i) for i in range(n)])
+    labels = np.empty(n, dtype=int)
+    seen = {}
+    for i in leaf_order(linkage):
+        labels[i] = seen.setdefault(roots[i], len(seen))
+    return labels
+
+
+def cluster(corr: np.ndarray) -> dict:
+    """상관 행렬 -> 군집 결과 {'linkage', 'order'} (거리 = 1 - 상관)"""
+    linkage = average_linkage(1 - corr)
+    return {'linkage': linkage, 'order': leaf_order(linkage)}
+
+
+def block_mean(corr: np.ndarray, order: np.ndarray, max_cells: int = MAX_CELLS):
+    """군집 순서로 정렬한 행렬을 한 변 max_cells칸 이하로 묶어 평균 (칸별 시작 위치도 반환)"""
+    n = len(order)
+    starts = np.unique((np.arange(min(n, max_cells)) * n / min(n, max_cells)).astype(int)) if n else np.zeros(0, int)
+    counts = np.diff(np.r_[starts, n])
+    rows = np.add.reduceat(corr[order], starts, axis=0) if n else corr
+    cells = np.add.reduceat(rows[:, order], starts, axis=1) if n else corr
+    return cells / np.outer(counts, counts), starts
+
+
+def cluster_summary(corr: np.ndarray, labels: list, clusters: np.ndarray, order: np.ndarray, scores=None,
+                    n_names: int = 5) -> pd.DataFrame:
+    """군집별 크기, 군집 안 평균 상관, 평균 스코어, 구성 (덴드로그램 순서 앞쪽 n_names개)"""
+    rows = []
+    ordered = clusters[order]
+    for c in range(clusters.max() + 1 if len(clusters) else 0):
+        members = order[ordered == c]
+        size = len(members)
+        inner = corr[np.ix_(members, members)]
+        mean_corr = (inner.sum(dtype=np.float64) - size) / (size * (size - 1)) if size > 1 else np.nan
+        names = ', '.join(str(labels[i]) for i in members[:n_names])
+        row = {'군집': c + 1, '크기': size, '평균 상관': round(float(mean_corr), 2)}
+        if scores is not None:
+            row['평균 스코어'] = round(float(np.nanmean(np.asarray(scores, dtype=float)[members])), 1)
+        row['구성'] = names + (f" 외 {size - n_names}개" if size > n_names else '')
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # 전체 다시 계산과 하루 외적 갱신, 군집 시간 비교
+    from synthetic import generate_market
+
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    market = generate_market(n_tickers=n_tickers, n_sectors=30, n_days=DEFAULT_WINDOW + 30)
+    labels = [f"{i:05d}" for i in range(n_tickers)]
+    panel = PricePanel(market['dates'], labels, market['close'])
+
+    def until(k):
+        return PricePanel(panel.dates[:k], labels, panel.values[:, :k])
+
+    start = time.perf_counter()
+    state = RollingCorrelation.from_panel(until(DEFAULT_WINDOW + 1), DEFAULT_WINDOW)
+    corr = state.matrix()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for k in range(DEFAULT_WINDOW + 2, len(panel.dates) + 1):
+        state = sync_correlation(state, until(k), DEFAULT_WINDOW)
+    incremental = (time.perf_counter() - start) / (len(panel.dates) - DEFAULT_WINDOW - 1)
+
+    reference = RollingCorrelation.from_panel(panel, DEFAULT_WINDOW).matrix()
+    error = float(np.abs(state.matrix() - reference).max())
+
+    start = time.perf_counter()
+    result = cluster(reference)
+    clustering = time.perf_counter() - start
+
+    print(f"{n_tickers}종목 x {DEFAULT_WINDOW}일: 전체 {full:.2f}s, 하루 갱신 {incremental * 1000:.0f}ms "
+          f"(최대 오차 {error:.1e}), 군집 {clustering:.2f}s, 행렬 {reference.nbytes / 1e6:.0f}MB")
+    labels = flat_clusters(result['linkage'], DEFAULT_CLUSTERS)
+    print(f"군집 {DEFAULT_CLUSTERS}개 크기: {np.bincount(labels).tolist()}")
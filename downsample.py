@@ -0,0 +1,52 @@
+"""
+시계열 다운샘플링
+LTTB(Largest-Triangle-Three-Buckets)로 모양(고점/저점)을 유지하며 화면 폭만큼의 점만 남김
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_POINTS = 1000   # 시리즈당 그리는 최대 점 수 (차트 가로 픽셀 수 정도)
+WEBGL_THRESHOLD = 2000      # 차트 전체 점 수가 이보다 많으면 WebGL(Scattergl)로 그림
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """남길 점의 위치 (처음/끝 점 포함 n_out개, n_out이 점 수 이상이면 전부)
+
+    구간마다 이전에 고른 점, 다음 구간 평균점과 만드는 삼각형 넓이가 가장 큰 점을 고른다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 가운데 n-2개 점을 n_out-2개 구간으로 나눈 경계와 구간별 평균점
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    # 마지막 구간의 다음 평균점은 끝 점
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_series(dates: pd.DatetimeIndex, values: np.ndarray, n_out: int = DEFAULT_MAX_POINTS):
+    """결측을 뺀 (날짜, 값)을 n_out개 이하로 줄임"""
+    values = np.asarray(values)
+    valid = ~np.isnan(values)
+    dates, values = pd.DatetimeIndex(dates)[valid], values[valid]
+    keep = lttb(dates.asi8, values, n_out)
+    return dates[keep], values[keep]
@@ -0,0 +1,304 @@
+"""
+시세 수집 단계
+종목별 DataReader 호출을 제한된 워커 풀에서 병렬로 실행
+여러 종목을 한 번에 받는 공급자(yfinance)는 묶음 요청 후 종목별로 나눠 주고, 실패한 종목만 개별 호출
+"""
+
+import time
+import zlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_WORKERS = 8         # 동시 요청 수
+DEFAULT_TICKER_TIMEOUT = 15.0   # 종목당 최대 대기 시간 (초)
+DEFAULT_DEADLINE = 90.0         # 전체 수집 마감 시간 최소값 (초)
+DEADLINE_MARGIN = 1.5           # 요청 수 제한으로 계산한 최소 수집 시간에 곱하는 여유
+DEFAULT_BATCH_SIZE = 200        # 묶음 요청 한 번에 넣는 종목 수
+
+FAKE_ORIGIN = np.datetime64('2015-01-02')  # 가짜 시세 경로의 시작일
+
+_task = threading.local()       # fetch_histories 작업 스레드가 처리 중인 종목의 타이머 (시작 시각 dict, 잠금, 종목코드)
+
+
+class FetchTimeout(Exception):
+    """종목 타임아웃 또는 전체 마감 초과"""
+
+
+def fetch_deadline(n_codes: int, rate: float, margin: float = DEADLINE_MARGIN) -> float:
+    """초당 rate건 제한으로 n_codes개 종목을 모두 받을 수 있는 전체 마감 시간 (초, 최소 DEFAULT_DEADLINE)"""
+    return max(DEFAULT_DEADLINE, n_codes / rate * margin)
+
+
+@contextmanager
+def timeout_paused():
+    """fetch_histories 작업 안에서 여러 종목이 함께 기다리는 준비 작업(묶음 요청)을 감싸, 그동안 종목 타임아웃을 멈추고 끝나면 새로 잼"""
+    timer = getattr(_task, 'timer', None)
+    if timer is None:
+        yield
+        return
+    started, lock, code = timer
+    with lock:
+        started.pop(code, None)
+    try:
+        yield
+    finally:
+        with lock:
+            started[code] = time.monotonic()
+
+
+def fetch_histories(read_fn, codes, start_date, end_date,
+                    max_workers: int = DEFAULT_MAX_WORKERS,
+                    ticker_timeout: float = DEFAULT_TICKER_TIMEOUT,
+                    deadline: float = DEFAULT_DEADLINE):
+    """종목별 시세를 병렬로 가져와 도착 순서대로 (code, df, error)를 반환하는 제너레이터
+
+    read_fn은 fdr.DataReader와 같은 (code, start, end) 시그니처를 가진다.
+    종목 타임아웃은 read_fn이 timeout_paused()로 감싼 구간(묶음 요청 대기)을 빼고 잰다.
+    타임아웃된 종목은 error에 FetchTimeout을 담아 반환하고, 실행 중인 요청은 기다리지 않는다.
+    """
+    codes = list(dict.fromkeys(codes))
+    if not codes:
+        return
+
+    started = {}
+    lock = threading.Lock()
+
+    def task(code):
+        with lock:
+            started[code] = time.monotonic()
+        _task.timer = (started, lock, code)
+        try:
+            return read_fn(code, start_date, end_date)
+        finally:
+            _task.timer = None
+
+    t_end = time.monotonic() + deadline
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(codes))))
+    try:
+        pending = {executor.submit(task, code): code for code in codes}
+
+        while pending:
+            now = time.monotonic()
+            if now >= t_end:
+                for future, code in pending.items():
+                    future.cancel()
+                    yield code, None, FetchTimeout(f"{code}: 전체 마감 시간({deadline:g}s) 초과")
+                return
+
+            # 실행 중인 종목 중 가장 먼저 타임아웃되는 시점까지만 대기
+            with lock:
+                expiries = [started[c] + ticker_timeout for c in pending.values() if c in started]
+            wake = min([t_end] + expiries)
+            done, _ = wait(pending, timeout=max(wake - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                code = pending.pop(future)
+                try:
+                    yield code, future.result(), None
+                except Exception as e:
+                    yield code, None, e
+
+            now = time.monotonic()
+            with lock:
+                expired = [f for f, c in pending.items()
+                           if c in started and now - started[c] >= ticker_timeout and not f.done()]
+            for future in expired:
+                code = pending.pop(future)
+                yield code, None, FetchTimeout(f"{code}: 종목 타임아웃({ticker_timeout:g}s) 초과")
+    finally:
+        # 멈춘 요청 때문에 호출자가 블로킹되지 않도록 기다리지 않고 종료
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BatchReader:
+    """여러 종목을 한 번에 받는 batch_fn 앞에 두는 fdr.DataReader 시그니처의 함수 객체
+
+    처음 호출될 때 codes 전체를 [start_date, end_date] 구간으로 묶음 요청해 메모리에 나눠 두고,
+    이후 종목별 호출은 그 구간을 잘라 돌려준다. 묶음 결과에 없는 종목이나 구간 밖 요청만 read_fn으로 개별 호출한다.
+    batch_fn(codes, start, end)는 종목코드 -> OHLCV DataFrame dict를 돌려준다 (빠진 종목 = 실패).
+    """
+
+    def __init__(self, batch_fn, read_fn, codes, start_date, end_date, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_fn = batch_fn
+        self.read_fn = read_fn
+        self.codes = list(dict.fromkeys(codes))
+        self.start = pd.Timestamp(start_date).normalize()
+        self.end = pd.Timestamp(end_date)
+        self.batch_size = batch_size
+        self.frames = None
+        self.batch_calls = 0
+        self.batch_errors = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def _prefetch(self):
+        frames = {}
+        for i in range(0, len(self.codes), self.batch_size):
+            chunk = self.codes[i:i + self.batch_size]
+            self.batch_calls += 1
+            try:
+                frames.update(self.batch_fn(chunk, self.start, self.end))
+            except Exception:
+                # 묶음 요청 자체가 실패하면 이 묶음은 모두 개별 호출로 넘어감
+                self.batch_errors += 1
+        self.frames = {code: df for code, df in frames.items() if df is not None and len(df) > 0}
+
+    def __call__(self, code, start_date, end_date):
+        if self.frames is None:
+            # 묶음 요청을 받거나 기다리는 동안은 종목 타임아웃을 재지 않음 (전체 마감 시간만 적용)
+            with timeout_paused(), self._lock:
+                if self.frames is None:
+                    self._prefetch()
+        df = self.frames.get(code)
+        start = pd.Timestamp(start_date).normalize()
+        if df is None or start < self.start or pd.Timestamp(end_date) > self.end:
+            with self._lock:
+                self.fallbacks += 1
+            return self.read_fn(code, start_date, end_date)
+        return df.loc[start:pd.Timestamp(end_date)]
+
+    @property
+    def round_trips(self) -> int:
+        return self.batch_calls + self.fallbacks
+
+
+def yfinance_download(codes, start_date, end_date) -> dict:
+    """yfinance 묶음 다운로드를 종목코드 -> OHLCV DataFrame으로 나눔 (받지 못한 종목은 빠짐)"""
+    import yfinance as yf
+
+    # yfinance 심볼은 점 대신 하이픈 (BRK.B -> BRK-B), 종료일은 포함하지 않음
+    symbols = {str(code).replace('.', '-'): code for code in codes}
+    raw = yf.download(list(symbols), start=pd.Timestamp(start_date).date(),
+                      end=(pd.Timestamp(end_date) + pd.Timedelta(days=1)).date(),
+                      group_by='ticker', auto_adjust=False, progress=False, threads=True)
+    if raw is None or raw.empty:
+        return {}
+
+    frames = {}
+    for symbol, code in symbols.items():
+        if isinstance(raw.columns, pd.MultiIndex):
+            if symbol not in raw.columns.get_level_values(0):
+                continue
+            df = raw[symbol]
+        else:
+            df = raw
+        df = df.dropna(how='all')
+        if 'Close' in df.columns and df['Close'].notna().any():
+            df = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+            df.index = pd.DatetimeIndex(df.index).tz_localize(None)
+            df.index.name = 'Date'
+            frames[code] = df
+    return frames
+
+
+class FakeDataReader:
+    """오프라인 측정용 가짜 DataReader (지연 시간과 실패율을 흉내냄)"""
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05,
+                 failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls = 0
+        self.batch_calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, code, start_date, end_date):
+        with self._lock:
+            self.calls += 1
+        rng = np.random.default_rng([self.seed, zlib.crc32(str(code).encode())])
+        time.sleep(max(self.latency + rng.normal() * self.jitter, 0))
+        if rng.random() < self.failure_rate:
+            raise ConnectionError(f"{code}: 가짜 공급자 오류")
+        return self._history(code, start_date, end_date)
+
+    def download(self, codes, start_date, end_date) -> dict:
+        """yfinance_download와 같은 묶음 요청 (지연 한 번, 종목별로 failure_rate 확률로 빠짐)"""
+        with self._lock:
+            self.batch_calls += 1
+        rng = np.random.default_rng([self.seed, len(codes)])
+        time.sleep(max(self.latency + rng.normal() * self.jitter, 0))
+        frames = {}
+        for code in codes:
+            # 묶음 요청의 누락은 개별 호출과 따로 정함 (개별 재시도로 복구되는 경우를 흉내냄)
+            if np.random.default_rng([self.seed, zlib.crc32(str(code).encode()), 2]).random() >= self.failure_rate:
+                frames[code] = self._history(code, start_date, end_date)
+        return frames
+
+    def _history(self, code, start_date, end_date):
+        # 기준일부터 이어지는 하나의 경로를 잘라 쓰므로 겹치는 구간 요청은 같은 값을 돌려줌
+        days = np.arange(FAKE_ORIGIN, np.datetime64(pd.Timestamp(end_date).date()) + 1, dtype='datetime64[D]')
+        dates = days[np.is_busday(days)].astype('datetime64[ns]')
+        path = np.random.default_rng([self.seed, zlib.crc32(str(code).encode()), 1])
+        close = 100 * np.exp(np.cumsum(path.normal(0, 0.02, len(dates))))
+        volume = path.integers(10_000, 1_000_000, len(dates))
+        df = pd.DataFrame({
+            'Open': close * (1 + path.normal(0, 0.005, len(dates))),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': volume,
+        }, index=pd.DatetimeIndex(dates, name='Date'))
+        return df.loc[pd.Timestamp(start_date).normalize():]
+
+
+def compare_batch(n_codes: int = 500, latency: float = 0.05, failure_rate: float = 0.02):
+    """종목별 호출 대비 묶음 요청의 왕복 횟수와 소요 시간 (가짜 공급자)"""
+    from datetime import datetime, timedelta
+
+    end = datetime.now()
+    start = end - timedelta(days=120)
+    codes = [f"T{i:04d}" for i in range(n_codes)]
+
+    single = FakeDataReader(latency=latency, jitter=0.0, failure_rate=failure_rate)
+    t0 = time.perf_counter()
+    ok_single = sum(1 for _, _, err in fetch_histories(single, codes, start, end, deadline=600) if err is None)
+    single_time = time.perf_counter() - t0
+
+    fake = FakeDataReader(latency=latency, jitter=0.0, failure_rate=failure_rate)
+    batch = BatchReader(fake.download, fake, codes, start, end)
+    t0 = time.perf_counter()
+    ok_batch = sum(1 for _, _, err in fetch_histories(batch, codes, start, end, deadline=600) if err is None)
+    batch_time = time.perf_counter() - t0
+
+    return {
+        'codes': n_codes,
+        'single': {'round_trips': single.calls, 'ok': ok_single, 'seconds': single_time},
+        'batch': {'round_trips': fake.batch_calls + fake.calls, 'batch_calls': fake.batch_calls,
+                  'fallbacks': fake.calls, 'ok': ok_batch, 'seconds': batch_time},
+    }
+
+
+if __name__ == "__main__":
+    # 순차 호출 대비 병렬 수집 속도 비교
+    from datetime import datetime, timedelta
+
+    end = datetime.now()
+    start = end - timedelta(days=120)
+    codes = [f"{i:06d}" for i in range(40)]
+
+    reader = FakeDataReader(latency=0.1, jitter=0.02)
+    t0 = time.perf_counter()
+    for code in codes:
+        reader(code, start, end)
+    sequential = time.perf_counter() - t0
+
+    for workers in (4, 8, 16):
+        t0 = time.perf_counter()
+        results = list(fetch_histories(reader, codes, start, end, max_workers=workers))
+        elapsed = time.perf_counter() - t0
+        ok = sum(1 for _, df, err in results if err is None)
+        print(f"workers={workers:2d}  {elapsed:.2f}s  (순차 {sequential:.2f}s, {sequential / elapsed:.1f}x)  성공 {ok}/{len(codes)}")
+
+    # 종목별 호출 대비 묶음 요청 왕복 횟수
+    result = compare_batch()
+    single, batch = result['single'], result['batch']
+    print(f"{result['codes']}종목  종목별 {single['round_trips']}회 {single['seconds']:.2f}s (성공 {single['ok']})  "
+          f"묶음 {batch['round_trips']}회 = 묶음 {batch['batch_calls']} + 개별 {batch['fallbacks']} "
+          f"{batch['seconds']:.2f}s (성공 {batch['ok']})")
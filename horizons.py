@@ -0,0 +1,141 @@
+"""
+기간/봉 피라미드
+긴 일봉 패널 하나에서 주봉/월봉 패널을 한 번씩 만들고, 기간(3M/1Y/3Y/10Y) x 봉(일/주/월) 조합별
+섹터/종목 테이블을 스냅샷을 만들 때 함께 계산해 둠 (화면에서 기간을 바꾸면 조회만 함)
+"""
+
+import numpy as np
+import pandas as pd
+
+from indicators import MIN_HISTORY, compute_indicators, turnaround_score, group_mean
+from price_panel import PricePanel
+from score_history import daily_scores
+
+
+HORIZONS = {'3M': 3, '1Y': 12, '3Y': 36, '10Y': 120}     # 기간 -> 개월
+BAR_SIZES = {'D': '일봉', 'W': '주봉', 'M': '월봉'}
+BARS_PER_MONTH = {'D': 21, 'W': 4, 'M': 1}
+BASE_VIEW = ('3M', 'D')         # 스냅샷 기본 테이블 (조회 구간 120일 일봉)
+SAMPLE_HISTORY_DAYS = 2520      # 가장 긴 기간(10년)의 거래일 수 (샘플 데이터 생성 길이)
+HISTORY_CALENDAR_DAYS = 3660    # 가장 긴 기간(10년)의 달력일 수 (실제 데이터 조회 구간)
+VIEW_TABLES = ('stocks', 'sectors', 'sector_panel', 'sector_scores')
+VIEW_PANELS = ('sector_panel', 'sector_scores')
+
+
+def bar_options(horizon: str) -> list:
+    """기간에서 지표를 계산할 수 있는(봉이 MIN_HISTORY개 이상인) 봉 크기"""
+    return [bar for bar, n in BARS_PER_MONTH.items() if HORIZONS[horizon] * n >= MIN_HISTORY]
+
+
+def resample_panel(panel: PricePanel, bar: str) -> PricePanel:
+    """일봉 패널 -> 주봉/월봉 패널 (구간 안 마지막 유효 종가, 날짜 = 구간 마지막 거래일)"""
+    if bar == 'D' or len(panel.dates) == 0:
+        return panel
+    periods = panel.dates.to_period('W' if bar == 'W' else 'M')
+    ends = np.flatnonzero(np.r_[periods[1:] != periods[:-1], True])
+    starts = np.r_[0, ends[:-1] + 1]
+
+    # 열 위치를 유효한 칸만 앞으로 채워 두면 구간 끝에서 구간 안 마지막 유효 칸을 바로 찾음
+    filled = np.maximum.accumulate(np.where(panel.valid, np.arange(len(panel.dates)), -1), axis=1)[:, ends]
+    inside = filled >= starts
+    values = np.take_along_axis(panel.values, np.maximum(filled, 0), axis=1)
+    return PricePanel(panel.dates[ends], panel.labels, np.where(inside, values, np.nan).astype(np.float32))
+
+
+def horizon_panel(panel: PricePanel, months: int) -> PricePanel:
+    """마지막 날짜 기준 최근 months개월 구간 (뷰)"""
+    if len(panel.dates) == 0:
+        return panel
+    start = panel.dates[-1] - pd.DateOffset(months=months)
+    return panel.tail(int((panel.dates > start).sum()))
+
+
+def view_tables(panel: PricePanel, stocks: pd.DataFrame, sectors: pd.DataFrame, bonus: np.ndarray,
+                sector_bonus: np.ndarray = None, row_of: np.ndarray = None) -> dict:
+    """한 기간/봉 패널(행 = stocks 행, row_of를 주면 stocks 행 i = 패널 행 row_of[i])의 종목/섹터 테이블,
+    섹터 지수 패널과 섹터 스코어 추이 패널
+
+    열 구성은 스냅샷 테이블과 같고, 거래량/외국인 점수(bonus)는 기간과 무관하게 그대로 쓴다.
+    sector_bonus를 주면 섹터 지표와 스코어 추이는 섹터 지수(정규화 가격 평균)에서, 없으면 종목 값의 평균으로 계산한다.
+    여러 섹터에 속한 종목은 row_of로 같은 패널 행을 가리키게 하면 지표를 한 번만 계산한다.
+    봉이 모자라 지표가 없는 종목은 뺀다.
+    """
+    sector_names = list(sectors['sector'])
+    sector_pos = {sector: g for g, sector in enumerate(sector_names)}
+    groups = np.array([sector_pos[sector] for sector in stocks['sector']], dtype=int)
+
+    ind = compute_indicators(panel.values)
+    if sector_bonus is None:
+        # 종목 일자별 스코어 (고유 종목 행만 계산)
+        unique_bonus = bonus if row_of is None else bonus[np.unique(row_of, return_index=True)[1]]
+        history = daily_scores(panel.values, np.asarray(unique_bonus, dtype=float)[:, None])
+    if row_of is not None:
+        ind = {key: values[row_of] for key, values in ind.items()}
+        panel = PricePanel(panel.dates, list(stocks['stock']), panel.values[row_of])
+        if sector_bonus is None:
+            history = history[row_of]
+    score = turnaround_score(ind['from_low'], ind['ma20_vs_ma60'], ind['rsi'], bonus)
+    keep = ~np.isnan(ind['ma20_vs_ma60'])
+    stock_table = stocks.assign(
+        from_low=ind['from_low'].round(1),
+        ma20_vs_ma60=ind['ma20_vs_ma60'].round(2),
+        rsi=ind['rsi'].round(1),
+        turnaround_score=np.rint(np.clip(np.nan_to_num(score), 0, 100)).astype(int),
+        is_turnaround=score >= 50,
+    )[keep].reset_index(drop=True)
+
+    sector_panel = panel.normalized().group_mean(groups, sector_names)
+    if sector_bonus is not None:
+        sector_ind = compute_indicators(sector_panel.values)
+        sector_score = turnaround_score(sector_ind['from_low'], sector_ind['ma20_vs_ma60'], sector_ind['rsi'],
+                                        sector_bonus)
+        sector_history = daily_scores(sector_panel.values, np.asarray(sector_bonus, dtype=float)[:, None])
+    else:
+        kept = groups[keep]
+        sector_ind = {key: group_mean(ind[key][keep], kept, len(sector_names))
+                      for key in ('from_low', 'ma20_vs_ma60', 'rsi')}
+        sector_ind.update(current_price=sector_panel.last(), ma20=np.zeros(len(sector_names)),
+                          ma60=np.zeros(len(sector_names)))
+        sector_score = group_mean(score[keep], kept, len(sector_names))
+        sector_history = PricePanel(panel.dates, panel.labels, history).group_mean(groups, sector_names).values
+    sector_table = sectors.assign(
+        current_price=sector_ind['current_price'],
+        from_low=sector_ind['from_low'].round(1),
+        ma20=sector_ind['ma20'],
+        ma60=sector_ind['ma60'],
+        ma20_vs_ma60=sector_ind['ma20_vs_ma60'].round(2),
+        rsi=sector_ind['rsi'].round(1),
+        turnaround_score=np.rint(np.clip(np.nan_to_num(sector_score), 0, 100)).astype(int),
+        is_turnaround=sector_score >= 50,
+    )
+    # 지표를 낼 종목이 하나도 없는 섹터는 뺌
+    present = np.flatnonzero(~np.isnan(sector_ind['ma20_vs_ma60']))
+    present_names = [sector_names[g] for g in present]
+    return {'stocks': stock_table, 'sectors': sector_table.iloc[present].reset_index(drop=True),
+            'sector_panel': PricePanel(sector_panel.dates, present_names, sector_panel.values[present]),
+            'sector_scores': PricePanel(sector_panel.dates, present_names,
+                                        np.asarray(sector_history, dtype=np.float32)[present])}
+
+
+def build_views(history: PricePanel, stocks: pd.DataFrame, sectors: pd.DataFrame, bonus: np.ndarray,
+                sector_bonus: np.ndarray = None, row_of: np.ndarray = None) -> dict:
+    """(기간, 봉) -> view_tables 결과 (기본 조합과 봉이 모자란 조합은 빼고, 봉 크기별 리샘플링은 한 번씩)"""
+    views = {}
+    for bar in BAR_SIZES:
+        horizons = [h for h in HORIZONS if bar in bar_options(h) and (h, bar) != BASE_VIEW]
+        if not horizons:
+            continue
+        resampled = resample_panel(history, bar)
+        for horizon in horizons:
+            panel = horizon_panel(resampled, HORIZONS[horizon])
+            if len(panel.dates) >= MIN_HISTORY:
+                views[(horizon, bar)] = view_tables(panel, stocks, sectors, bonus, sector_bonus, row_of)
+    return views
+
+
+def select_view(data: dict, horizon: str, bar: str) -> dict:
+    """스냅샷에서 기간/봉 조합의 테이블로 바꾼 데이터 (미리 계산한 조합이 없으면 기본 테이블 그대로)"""
+    view = data.get('views', {}).get((horizon, bar))
+    if view is None:
+        return data
+    return {**data, **view, 'dates': view['sector_panel'].dates}
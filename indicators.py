@@ -0,0 +1,357 @@
+"""
+지표 엔진
+종목 x 일자 가격 행렬 하나로 MA20/MA60, RSI, 저점 대비 상승률, 턴어라운드 스코어를 한 번에 계산
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+RSI_PERIOD = 14
+MA_SHORT = 20
+MA_LONG = 60
+MIN_HISTORY = 20  # 지표 계산에 필요한 최소 거래일 수
+LOOKBACK_DAYS = 120  # 대시보드 기본 테이블 조회 구간 (달력일, 저점 대비 상승률의 저점 구간)
+LOOKBACK_BARS = round(LOOKBACK_DAYS * 252 / 365)  # 같은 구간의 거래일 수 (약 83일)
+
+
+def build_panel(series_list, length: int = None) -> np.ndarray:
+    """가변 길이 가격 배열들을 오른쪽(최근) 정렬한 종목 x 일자 행렬로 변환 (앞쪽은 NaN)"""
+    length = length or max((len(s) for s in series_list), default=0)
+    panel = np.full((len(series_list), length), np.nan)
+    for i, series in enumerate(series_list):
+        values = np.asarray(series, dtype=float)[-length:]
+        if len(values):
+            panel[i, -len(values):] = values
+    return panel
+
+
+def rolling_sum(panel: np.ndarray, window: int, min_periods: int = None):
+    """행별 이동합과 구간 내 유효값 개수 (NaN은 결측으로 취급)
+
+    유효값이 window보다 적으면 있는 값만으로 계산하되 min_periods 미만이면 NaN.
+    """
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(panel)
+    zero = np.zeros((panel.shape[0], 1))
+    csum = np.concatenate([zero, np.cumsum(np.where(valid, panel, 0.0), axis=1)], axis=1)
+    ccnt = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+
+    total = csum[:, window:] - csum[:, :-window] if panel.shape[1] >= window else csum[:, :0]
+    count = ccnt[:, window:] - ccnt[:, :-window] if panel.shape[1] >= window else ccnt[:, :0]
+    # 앞쪽 window-1개 구간은 처음부터의 누적값 사용
+    head = min(window - 1, panel.shape[1])
+    total = np.concatenate([csum[:, 1:head + 1], total], axis=1)
+    count = np.concatenate([ccnt[:, 1:head + 1], count], axis=1)
+
+    total[count < max(min_periods, 1)] = np.nan
+    return total, count
+
+
+def rolling_mean(panel: np.ndarray, window: int, min_periods: int = None) -> np.ndarray:
+    """행별 이동평균"""
+    total, count = rolling_sum(panel, window, min_periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+def rolling_min(panel: np.ndarray, window: int) -> np.ndarray:
+    """행별 이동 최솟값 (앞쪽 window-1일은 처음부터의 최솟값, NaN은 무시하고 모두 NaN이면 NaN)
+
+    window 크기 블록의 앞/뒤 누적 최솟값 두 개로 구간 길이와 무관하게 칸당 상수 시간에 계산한다.
+    """
+    n, days = panel.shape
+    pad_left = window - 1
+    width = pad_left + days
+    width += -width % window
+    padded = np.full((n, width), np.inf, dtype=np.result_type(panel.dtype, np.float32))
+    padded[:, pad_left:pad_left + days] = np.where(np.isnan(panel), np.inf, panel)
+
+    blocks = padded.reshape(n, -1, window)
+    prefix = np.minimum.accumulate(blocks, axis=2).reshape(n, -1)
+    suffix = np.minimum.accumulate(blocks[:, :, ::-1], axis=2)[:, :, ::-1].reshape(n, -1)
+    # t일 구간 = padded[t : t+window] -> 시작 칸의 뒤쪽 누적과 끝 칸의 앞쪽 누적 중 작은 값
+    out = np.minimum(suffix[:, :days], prefix[:, pad_left:pad_left + days])
+    out[np.isinf(out)] = np.nan
+    return out
+
+
+def rsi_panel(panel: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """단순이동평균 방식 RSI (gain/loss 모두 0인 구간은 NaN)"""
+    delta = np.diff(panel, axis=1, prepend=np.nan)
+    # 각 종목의 첫 거래일은 변화량 0 (pandas diff().where() 결과와 동일)
+    first = ~np.isnan(panel) & np.isnan(delta)
+    delta[first] = 0.0
+
+    gain, _ = rolling_sum(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0)), period)
+    loss, _ = rolling_sum(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0)), period)
+
+    # 누적합 차이로 생기는 미세한 오차는 0으로 정리
+    scale = np.nanmax(np.abs(panel), axis=1, keepdims=True, initial=0.0) * 1e-9
+    gain[np.abs(gain) <= scale] = 0.0
+    loss[np.abs(loss) <= scale] = 0.0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+
+def indicator_panels(prices: np.ndarray) -> dict:
+    """일자별 지표 시계열 (종목 x 일자)
+
+    MA60은 이력이 60일보다 짧으면 있는 기간 전체 평균을 쓰고, 저점은 행렬 시작부터의 최저가.
+    """
+    prices = np.asarray(prices, dtype=float)
+    ma20 = rolling_mean(prices, MA_SHORT)
+    ma60 = rolling_mean(prices, MA_LONG, min_periods=MIN_HISTORY)
+    ma60[np.isnan(ma20)] = np.nan
+
+    rsi = rsi_panel(prices)
+    rsi[np.isnan(rsi) & ~np.isnan(prices)] = 50.0
+
+    low = np.fmin.accumulate(np.where(np.isnan(prices), np.inf, prices), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        from_low = np.where(low > 0, (prices - low) / low * 100, 0.0)
+        ma20_vs_ma60 = np.where(ma60 > 0, (ma20 / ma60 - 1) * 100, 0.0)
+    from_low[np.isnan(prices)] = np.nan
+    ma20_vs_ma60[np.isnan(ma20)] = np.nan
+
+    return {
+        'current_price': prices,
+        'ma20': ma20,
+        'ma60': ma60,
+        'rsi': rsi,
+        'from_low': from_low,
+        'ma20_vs_ma60': ma20_vs_ma60,
+    }
+
+
+def compute_indicators(prices: np.ndarray) -> dict:
+    """종목별 마지막 거래일 기준 지표 (각 값은 길이 = 종목 수인 1차원 배열)
+
+    이동평균/RSI는 최근 MA_LONG+1일만 있으면 되므로 그 구간만 계산하고 저점만 전체 기간에서 찾는다.
+    """
+    prices = np.asarray(prices, dtype=float)
+    latest = {name: values[:, -1] for name, values in indicator_panels(prices[:, -(MA_LONG + 1):]).items()}
+
+    low = np.fmin.reduce(prices, axis=1) if prices.shape[1] else np.full(len(prices), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        latest['from_low'] = np.where(low > 0, (latest['current_price'] - low) / low * 100, 0.0)
+    latest['from_low'][np.isnan(latest['current_price'])] = np.nan
+    return latest
+
+
+def volume_points(volume_ratio):
+    """거래량 점수 (최대 15점)"""
+    return np.minimum(np.asarray(volume_ratio, dtype=float) / 10, 15)
+
+
+def turnaround_score(from_low, ma20_vs_ma60, rsi, volume_pts=15.0, foreign_pts=0.0):
+    """턴어라운드 스코어 (100점 상한 적용 전)
+
+    저점 대비 상승률 최대 30점, 골든크로스 20점, RSI 최대 25점, 거래량 최대 15점, 외국인 순매수 10점
+    """
+    from_low = np.asarray(from_low, dtype=float)
+    score = np.minimum(from_low / 2, 30)
+    score = score + np.where(np.asarray(ma20_vs_ma60) > 0, 20, 0)
+    score = score + np.minimum(np.maximum(np.asarray(rsi, dtype=float) - 30, 0) / 2, 25)
+    return score + volume_pts + foreign_pts
+
+
+def bonus_points(table, use_real_data: bool = False) -> np.ndarray:
+    """테이블 행별 거래량 + 외국인 점수 (실제 데이터는 거래량 기본 15점, 외국인 0점)"""
+    if use_real_data:
+        return np.full(len(table), 15.0)
+    return (volume_points(table['volume_ratio'].to_numpy())
+            + np.where(table['foreign_buy'].to_numpy() > 0, 10, 0))
+
+
+def group_mean(values, groups, n_groups: int) -> np.ndarray:
+    """그룹(섹터) 번호별 평균"""
+    values = np.asarray(values, dtype=float)
+    counts = np.bincount(groups, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.bincount(groups, weights=values, minlength=n_groups) / counts
+
+
+class IndicatorState:
+    """종목별 스트리밍 지표 상태 (새 봉 하나당 상수 시간 갱신)
+
+    MA20/MA60 이동합, RSI 상승/하락폭 합, 구간 최저가 후보(단조 덱)를 유지한다.
+    trim()으로 오래된 봉을 빼면 같은 구간을 배치로 계산한 compute_indicators와 같은 값을 낸다.
+    """
+
+    RESUM_EVERY = 1000  # 누적 오차 정리를 위해 이 횟수마다 합계를 다시 계산
+
+    def __init__(self, max_bars: int = None):
+        self.max_bars = max_bars
+        self.bars = deque()     # (날짜, 가격)
+        self.deltas = deque()   # 최근 RSI_PERIOD개 가격 변화
+        self.lows = deque()     # 구간 최저가 후보 (가격 오름차순)
+        self.sum_short = 0.0
+        self.sum_long = 0.0
+        self.gain = 0.0
+        self.loss = 0.0
+        self._updates = 0
+        self._popped = []           # 마지막 봉이 밀어낸 최저가 후보 (밀어낸 순서)
+
+    @classmethod
+    def from_history(cls, dates, prices, max_bars: int = None):
+        state = cls(max_bars)
+        for date, price in zip(dates, prices):
+            state.update(date, price)
+        return state
+
+    @property
+    def last_date(self):
+        return self.bars[-1][0] if self.bars else None
+
+    def update(self, date, price: float):
+        """새 봉 추가 (마지막 봉과 같은 날짜면 그 봉을 수정)"""
+        date = pd.Timestamp(date)
+        price = float(price)
+        if self.bars and date <= self.bars[-1][0]:
+            if date == self.bars[-1][0]:
+                return self._replace_last(price)
+            raise ValueError(f"{date.date()}: 마지막 봉({self.bars[-1][0].date()})보다 이전 봉입니다.")
+
+        prev = self.bars[-1][1] if self.bars else None
+        self.bars.append((date, price))
+        n = len(self.bars)
+        self.sum_short += price
+        self.sum_long += price
+        if n > MA_SHORT:
+            self.sum_short -= self.bars[-MA_SHORT - 1][1]
+        if n > MA_LONG:
+            self.sum_long -= self.bars[-MA_LONG - 1][1]
+
+        self._push_delta(price - prev if prev is not None else 0.0)
+
+        self._popped = []
+        self._push_low(date, price)
+
+        if self.max_bars is not None and n > self.max_bars:
+            self._evict_first()
+
+        self._updates += 1
+        if self._updates % self.RESUM_EVERY == 0:
+            self._resum()
+
+    def trim(self, start):
+        """start 이전 봉 제거 (배치 계산의 조회 구간 시작일에 맞춤)"""
+        start = pd.Timestamp(start).normalize()
+        while self.bars and self.bars[0][0] < start:
+            self._evict_first()
+
+    def snapshot(self):
+        """현재 지표 (봉이 MIN_HISTORY개 미만이면 None)"""
+        n = len(self.bars)
+        if n < MIN_HISTORY:
+            return None
+
+        price = self.bars[-1][1]
+        ma20 = self.sum_short / MA_SHORT
+        ma60 = self.sum_long / min(MA_LONG, n)
+
+        scale = abs(price) * 1e-9
+        gain = self.gain if abs(self.gain) > scale else 0.0
+        loss = self.loss if abs(self.loss) > scale else 0.0
+        if loss > 0:
+            rsi = 100 - 100 / (1 + gain / loss)
+        else:
+            rsi = 100.0 if gain > 0 else 50.0
+
+        low = self.lows[0][1]
+        return {
+            'current_price': price,
+            'ma20': ma20,
+            'ma60': ma60,
+            'rsi': rsi,
+            'from_low': (price - low) / low * 100 if low > 0 else 0.0,
+            'ma20_vs_ma60': (ma20 / ma60 - 1) * 100 if ma60 > 0 else 0.0,
+        }
+
+    def _push_delta(self, delta: float):
+        if len(self.deltas) == RSI_PERIOD:
+            old = self.deltas.popleft()
+            self.gain -= max(old, 0.0)
+            self.loss -= max(-old, 0.0)
+        self.deltas.append(delta)
+        self.gain += max(delta, 0.0)
+        self.loss += max(-delta, 0.0)
+
+    def _replace_last(self, price: float):
+        date, old = self.bars[-1]
+        if price == old:
+            return
+        self.bars[-1] = (date, price)
+        self.sum_short += price - old
+        self.sum_long += price - old
+
+        prev = self.bars[-2][1] if len(self.bars) > 1 else None
+        old_delta = self.deltas.pop()
+        self.gain -= max(old_delta, 0.0)
+        self.loss -= max(-old_delta, 0.0)
+        delta = price - prev if prev is not None else 0.0
+        self.deltas.append(delta)
+        self.gain += max(delta, 0.0)
+        self.loss += max(-delta, 0.0)
+
+        # 최저가 후보: 마지막 봉 자리를 빼고 그 봉이 밀어냈던 후보를 되돌린 뒤 새 가격으로 다시 넣음
+        self.lows.pop()
+        self.lows.extend(reversed(self._popped))
+        self._popped = []
+        self._push_low(date, price)
+
+    def _push_low(self, date, price: float):
+        """최저가 후보 덱에 추가 (더 비싼 이전 후보는 밀어내고 기록)"""
+        while self.lows and self.lows[-1][1] >= price:
+            self._popped.append(self.lows.pop())
+        self.lows.append((date, price))
+
+    def _evict_first(self):
+        date, price = self.bars.popleft()
+        n = len(self.bars)
+        # 남은 봉이 창보다 짧아지면 빠진 봉은 창 안에 있던 값
+        if n < MA_LONG:
+            self.sum_long -= price
+        if n < MA_SHORT:
+            self.sum_short -= price
+        if self.lows and self.lows[0][0] == date:
+            self.lows.popleft()
+        elif self._popped and self._popped[-1][0] == date:
+            self._popped.pop()
+
+    def _resum(self):
+        prices = [p for _, p in self.bars]
+        self.sum_short = math.fsum(prices[-MA_SHORT:])
+        self.sum_long = math.fsum(prices[-MA_LONG:])
+        self.gain = math.fsum(max(d, 0.0) for d in self.deltas)
+        self.loss = math.fsum(max(-d, 0.0) for d in self.deltas)
+
+
+def sync_state(state, dates, prices, start=None) -> IndicatorState:
+    """받은 이력에 맞춰 상태 갱신: 이어지면 새 봉만 반영하고, 이어지지 않으면 이력으로 다시 만듦"""
+    dates = pd.DatetimeIndex(dates)
+    start = pd.Timestamp(start).normalize() if start is not None else dates[0]
+
+    if state is not None and state.bars:
+        state.trim(start)
+        pos = dates.searchsorted(state.last_date) if state.bars else len(dates)
+        first_date, first_price = state.bars[0] if state.bars else (None, None)
+        # 이력의 시작과 겹치는 봉 가격이 같아야 같은 시계열 (수정주가 반영 등으로 바뀌면 재계산)
+        continuous = (
+            pos < len(dates) and dates[pos] == state.last_date
+            and first_date == dates[0] and first_price == float(prices[0])
+        )
+        if continuous:
+            for date, price in zip(dates[pos:], prices[pos:]):
+                state.update(date, price)
+            return state
+
+    state = IndicatorState.from_history(dates, prices)
+    state.trim(start)
+    return state
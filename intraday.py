@@ -0,0 +1,303 @@
+"""
+장중 모드
+1분/5분봉 피드를 받아 스냅샷의 일봉 지표 상태에 오늘 봉으로 반영하고, 바뀐 종목/섹터만 다시 계산
+로컬 파일 재생 피드로 네트워크 없이 실행 가능 (python intraday.py KOSPI 로 재생 파일 생성 후 재생 시간 측정)
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import IndicatorState, bonus_points, turnaround_score
+from price_panel import PricePanel
+from price_store import DEFAULT_STORE_DIR
+
+
+INTERVALS = {'1분': '1min', '5분': '5min'}
+DEFAULT_SPEED = 60.0        # 재생 속도 (실제 1초 = 장중 60초)
+REPLAY_DIR = os.path.join(DEFAULT_STORE_DIR, 'intraday')
+
+# 시장별 정규장 시작 시각과 분봉 수
+SESSION_HOURS = {
+    'KOSPI': (9, 0, 390),
+    'KOSDAQ': (9, 0, 390),
+    'US': (9, 30, 390),
+}
+
+# 장중에 다시 계산하는 열 -> 표시 소수 자릿수 (스냅샷 테이블과 같게)
+LIVE_COLUMNS = {'from_low': 1, 'ma20_vs_ma60': 2, 'rsi': 1, 'turnaround_score': 0}
+
+
+def replay_path(market: str, use_real_data: bool) -> str:
+    return os.path.join(REPLAY_DIR, f"{market}-{'real' if use_real_data else 'sample'}.parquet")
+
+
+def read_bars(path: str, columns=None) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=columns) if path.endswith('.parquet') else pd.read_csv(path, usecols=columns)
+
+
+def replay_matches(path: str, data: dict) -> bool:
+    """재생 파일이 스냅샷과 맞는지 (종목 라벨 집합이 같고 모든 봉이 스냅샷 마지막 거래일 뒤)"""
+    try:
+        df = read_bars(path, ['time', 'label'])
+    except (OSError, ValueError, KeyError):
+        return False
+    panel = data['panel']
+    return (len(df) > 0 and set(df['label'].unique()) == set(panel.labels)
+            and pd.to_datetime(df['time']).min().normalize() > panel.dates[-1])
+
+
+def ensure_replay(data: dict, path: str, market: str) -> bool:
+    """재생 파일이 없거나 스냅샷과 맞지 않으면(다른 종목, 지난 날짜) 스냅샷 종가로 새로 만듦 (새로 만들었으면 True)"""
+    if os.path.exists(path) and replay_matches(path, data):
+        return False
+    make_replay(data, path, market)
+    return True
+
+
+class FileReplayFeed:
+    """장중 봉 파일(time, label, close[, volume])을 재생하는 피드
+
+    poll()은 지난 호출 이후 재생 시각까지 도착한 봉을 시간순 DataFrame으로 돌려준다.
+    speed가 None이면 poll()마다 봉 시각 하나씩 진행한다 (테스트/측정용).
+    다른 피드도 같은 poll()만 구현하면 IntradaySession에 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, path: str, interval: str = '1min', speed: float = DEFAULT_SPEED, clock=time.monotonic):
+        df = read_bars(path)
+        df['time'] = pd.to_datetime(df['time'])
+        if interval != '1min':
+            # 구간 끝 시각 기준으로 묶어 마지막 종가만 남김
+            df['time'] = df['time'].dt.ceil(interval)
+            df = df.groupby(['time', 'label'], sort=False, as_index=False).agg(
+                close=('close', 'last'), volume=('volume', 'sum') if 'volume' in df.columns else ('close', 'size'))
+        df = df.sort_values('time', kind='stable').reset_index(drop=True)
+
+        self.bars = df
+        self.times = df['time'].to_numpy()
+        self.interval = interval
+        self.speed = speed
+        self.clock = clock
+        self.pos = 0
+        self.started = clock()
+
+    @property
+    def now(self):
+        """마지막으로 내보낸 봉 시각 (아직 없으면 None)"""
+        return pd.Timestamp(self.times[self.pos - 1]) if self.pos else None
+
+    @property
+    def done(self) -> bool:
+        return self.pos >= len(self.times)
+
+    def poll(self) -> pd.DataFrame:
+        if self.done:
+            return self.bars.iloc[0:0]
+        if self.speed is None:
+            until = self.times[self.pos]
+        else:
+            elapsed = np.timedelta64(int((self.clock() - self.started) * self.speed * 1e9), 'ns')
+            until = self.times[0] + elapsed
+        end = int(np.searchsorted(self.times, until, 'right'))
+        out = self.bars.iloc[self.pos:end]
+        self.pos = max(end, self.pos)
+        return out
+
+
+def make_replay(data: dict, path: str, market: str = 'KOSPI', date=None, volatility: float = 0.001,
+                seed: int = 0) -> str:
+    """스냅샷 마지막 종가에서 시작하는 합성 1분봉 재생 파일 생성 (오프라인 테스트용)"""
+    panel = data['panel']
+    # 같은 라벨이 여러 행이면 첫 행 종가 기준 (IntradaySession이 나머지 행을 배율로 맞춤)
+    labels, first = np.unique(np.asarray(panel.labels, dtype=object), return_index=True)
+    last = panel.last()[first]
+    hour, minute, n_bars = SESSION_HOURS.get(market, SESSION_HOURS['KOSPI'])
+    day = pd.Timestamp(date) if date is not None else panel.dates[-1] + pd.offsets.BDay(1)
+    times = day.normalize() + pd.Timedelta(hours=hour, minutes=minute) + pd.to_timedelta(np.arange(1, n_bars + 1), 'min')
+
+    rng = np.random.default_rng(seed)
+    close = last[:, None] * np.exp(np.cumsum(rng.normal(0, volatility, (len(labels), n_bars)), axis=1))
+    df = pd.DataFrame({
+        'time': np.tile(times, len(labels)),
+        'label': np.repeat(labels, n_bars),
+        'close': close.ravel().astype(np.float32),
+        'volume': rng.integers(100, 10_000, close.size),
+    }).dropna().sort_values('time', kind='stable')
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_parquet(path, index=False)
+    return path
+
+
+def indicator_states(panel) -> list:
+    """패널 행별 일봉 지표 상태 (오늘 봉이 새로 들어오면 가장 오래된 봉이 빠져 구간 길이 유지)"""
+    states = []
+    for row in panel.values:
+        valid = ~np.isnan(row)
+        states.append(IndicatorState.from_history(panel.dates[valid], row[valid], max_bars=max(int(valid.sum()), 1)))
+    return states
+
+
+def read_states(states: list, rows, live: dict, extra: np.ndarray):
+    """rows 상태의 지표를 live 열 배열에 다시 읽고 스코어는 한 번에 계산"""
+    snaps = [(i, states[i].snapshot()) for i in rows]
+    snaps = [(i, snap) for i, snap in snaps if snap is not None]
+    if not snaps:
+        return
+    rows = np.array([i for i, _ in snaps])
+    for column in ('from_low', 'ma20_vs_ma60', 'rsi'):
+        live[column][rows] = [snap[column] for _, snap in snaps]
+    score = turnaround_score(live['from_low'][rows], live['ma20_vs_ma60'][rows], live['rsi'][rows], extra[rows])
+    live['turnaround_score'][rows] = np.clip(score, 0, 100)
+
+
+def write_rows(frame: pd.DataFrame, rows: np.ndarray, live: dict):
+    """바뀐 행만 테이블에 반영 (스냅샷과 같은 자릿수로 반올림)"""
+    for column, decimals in LIVE_COLUMNS.items():
+        frame.loc[rows, column] = live[column][rows].round(decimals)
+    score = live['turnaround_score'][rows]
+    frame.loc[rows, 'turnaround_score'] = np.rint(score).astype(int)
+    frame.loc[rows, 'is_turnaround'] = score >= 50
+
+
+class IntradaySession:
+    """스냅샷 위에 장중 봉을 반영하는 상태
+
+    종목은 행별 IndicatorState의 오늘 봉을 고쳐 다시 읽고, 섹터는 바뀐 종목이 속한 섹터만 다시 계산한다.
+    섹터 값은 스냅샷과 같은 방식으로 구한다: 실제 데이터는 종목 값의 섹터 평균(변화량 합계로 갱신),
+    샘플 데이터는 정규화 가격 평균인 섹터 지수의 지표(섹터별 IndicatorState).
+    """
+
+    def __init__(self, data: dict, use_real_data: bool = False):
+        self.stocks = data['stocks'].reset_index(drop=True).copy()
+        self.sectors = data['sectors'].reset_index(drop=True).copy()
+        for frame in (self.stocks, self.sectors):
+            for column in LIVE_COLUMNS:
+                if column != 'turnaround_score':
+                    frame[column] = frame[column].astype(float)
+        panel = data['panel']
+
+        self.states = indicator_states(panel)
+        # 라벨 -> [(행, 배율)]: 같은 종목이 여러 섹터에 있으면 첫 행 종가 대비 비율로 맞춤 (실제 데이터는 1)
+        last = panel.last().astype(float)
+        self.rows_of = {}
+        for i, label in enumerate(panel.labels):
+            rows = self.rows_of.setdefault(label, [])
+            rows.append((i, last[i] / last[rows[0][0]] if rows else 1.0))
+
+        # 거래량/외국인 점수는 장중에 바뀌지 않는 값으로 둠
+        self.extra = bonus_points(self.stocks, use_real_data)
+
+        sector_pos = {sector: g for g, sector in enumerate(self.sectors['sector'])}
+        self.sector_of = np.array([sector_pos.get(sector, -1) for sector in self.stocks['sector']], dtype=int)
+        inside = self.sector_of >= 0
+        self.sector_count = np.bincount(self.sector_of[inside], minlength=len(self.sectors))
+
+        self.live = {column: self.stocks[column].to_numpy(dtype=float).copy() for column in LIVE_COLUMNS}
+        read_states(self.states, range(len(self.states)), self.live, self.extra)
+        self.initial = {column: values.copy() for column, values in self.live.items()}
+        self.sector_live = {column: self.sectors[column].to_numpy(dtype=float).copy() for column in LIVE_COLUMNS}
+
+        if use_real_data:
+            # 섹터 = 종목 값 평균: 스냅샷 값에 종목 변화량 합계 / 종목 수를 더함
+            self.sector_states = None
+            self.sector_base = {column: values.copy() for column, values in self.sector_live.items()}
+            self.delta_sum = {column: np.zeros(len(self.sectors)) for column in LIVE_COLUMNS}
+        else:
+            # 섹터 지수 = 첫 가격 기준 정규화 가격의 섹터 평균: 오늘 값은 정규화 가격 합계로 갱신
+            sector_panel = data['sector_panel']
+            index_panel = PricePanel(sector_panel.dates, list(self.sectors['sector']),
+                                     sector_panel.values[[sector_panel.row(s) for s in self.sectors['sector']]])
+            self.sector_states = indicator_states(index_panel)
+            self.sector_extra = bonus_points(self.sectors)
+            first = panel.values[np.arange(len(panel.labels)), np.argmax(panel.valid, axis=1)].astype(float)
+            self.base_price = first
+            self.norm = last / first * 100
+            self.norm_sum = np.bincount(self.sector_of[inside], weights=self.norm[inside], minlength=len(self.sectors))
+            read_states(self.sector_states, range(len(self.sector_states)), self.sector_live, self.sector_extra)
+
+        self.bars_applied = 0
+        self.bars_matched = 0        # 스냅샷 종목과 라벨이 맞은 봉 수 (0이면 피드가 다른 종목을 보냄)
+        self.as_of = None
+
+    def apply(self, bars: pd.DataFrame) -> dict:
+        """봉 묶음 반영 후 바뀐 종목 행/섹터 위치 {'stocks': 행 배열, 'sectors': 섹터 배열}
+
+        같은 종목의 봉이 여러 개면 마지막 봉만 반영한다 (일봉 지표는 오늘 종가만 봄).
+        """
+        empty = np.empty(0, dtype=int)
+        if len(bars) == 0:
+            return {'stocks': empty, 'sectors': empty}
+
+        latest = bars.drop_duplicates('label', keep='last')
+        days = latest['time'].dt.normalize()
+        rows = []
+        for label, day, close in zip(latest['label'], days, latest['close'].tolist()):
+            for i, scale in self.rows_of.get(label, ()):
+                self.states[i].update(day, close * scale)
+                rows.append(i)
+        rows = np.array(sorted(set(rows)), dtype=int)
+        self.bars_applied += len(bars)
+        self.bars_matched += int(bars['label'].isin(self.rows_of).sum())
+        self.as_of = pd.Timestamp(bars['time'].iloc[-1])
+        if len(rows) == 0:
+            return {'stocks': empty, 'sectors': empty}
+
+        before = {column: values[rows].copy() for column, values in self.live.items()}
+        read_states(self.states, rows, self.live, self.extra)
+
+        # 바뀐 종목이 속한 섹터만 다시 계산
+        groups = self.sector_of[rows]
+        inside = groups >= 0
+        sectors = np.unique(groups[inside])
+        if self.sector_states is None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for column, values in self.live.items():
+                    np.add.at(self.delta_sum[column], groups[inside], (values[rows] - before[column])[inside])
+                    self.sector_live[column][sectors] = (self.sector_base[column][sectors]
+                                                         + self.delta_sum[column][sectors] / self.sector_count[sectors])
+            self.sector_live['turnaround_score'][sectors] = np.clip(self.sector_live['turnaround_score'][sectors], 0, 100)
+        else:
+            norm = np.array([self.states[i].bars[-1][1] for i in rows]) / self.base_price[rows] * 100
+            np.add.at(self.norm_sum, groups[inside], (norm - self.norm[rows])[inside])
+            self.norm[rows] = norm
+            day = days.max()
+            for g in sectors:
+                self.sector_states[g].update(day, self.norm_sum[g] / self.sector_count[g])
+            read_states(self.sector_states, sectors, self.sector_live, self.sector_extra)
+
+        write_rows(self.stocks, rows, self.live)
+        write_rows(self.sectors, sectors, self.sector_live)
+        return {'stocks': rows, 'sectors': sectors}
+
+    def score_change(self) -> np.ndarray:
+        """종목별 스냅샷 대비 스코어 변화"""
+        return self.live['turnaround_score'] - self.initial['turnaround_score']
+
+
+if __name__ == "__main__":
+    # 합성 재생 파일을 만들어 하루치 분봉을 끝까지 반영하는 시간 측정
+    from pipeline import generate_sample_data
+
+    market = sys.argv[1] if len(sys.argv) > 1 else 'KOSPI'
+    n_tickers = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    data = generate_sample_data(market, n_tickers=n_tickers, n_sectors=30)
+    # 대시보드 재생 파일(replay_path)을 덮어쓰지 않도록 측정용 파일을 따로 씀
+    path = make_replay(data, os.path.join(REPLAY_DIR, f"{market}-bench.parquet"), market)
+
+    for interval in INTERVALS.values():
+        t0 = time.perf_counter()
+        session = IntradaySession(data)
+        setup = time.perf_counter() - t0
+        feed = FileReplayFeed(path, interval=interval, speed=None)
+        t0 = time.perf_counter()
+        ticks = changed = 0
+        while not feed.done:
+            changed += len(session.apply(feed.poll())['stocks'])
+            ticks += 1
+        elapsed = time.perf_counter() - t0
+        print(f"{interval}: {n_tickers}종목 준비 {setup:.2f}s, 봉 {ticks}회 반영 {elapsed:.2f}s "
+              f"(회당 {elapsed / ticks * 1000:.1f}ms, 평균 {changed / ticks:.0f}종목 변경) -> {path}")
@@ -0,0 +1,96 @@
+"""
+계측
+데이터 로드/렌더링의 단계별 소요 시간, 종목 수, 공급자 응답 시간 분위수를 모아 구조화된 로그(JSON 한 줄)로 남김
+"""
+
+import sys
+import json
+import time
+import logging
+from collections import Counter
+
+import numpy as np
+
+
+logger = logging.getLogger('turnaround')
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def setup_logging(level=logging.INFO):
+    """'turnaround' 로거를 stderr로 출력 (이미 핸들러가 있으면 그대로 둠)"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+def percentiles(values, qs=LATENCY_PERCENTILES) -> dict:
+    """초 단위 값들의 개수와 분위수/최댓값 (밀리초)"""
+    if len(values) == 0:
+        return {'count': 0}
+    ms = np.asarray(values, dtype=float) * 1000
+    summary = {'count': len(ms)}
+    summary.update({f"p{q}": round(float(v), 1) for q, v in zip(qs, np.percentile(ms, qs))})
+    summary['max'] = round(float(ms.max()), 1)
+    return summary
+
+
+class Metrics:
+    """한 번의 로드 또는 렌더링에서 모은 단계별 시간, 개수, 오류 종류, 공급자 응답 시간"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.stages = {}
+        self.counts = Counter()
+        self.errors = Counter()
+        self.latencies = []
+        self._lap = time.perf_counter()
+
+    def lap(self, name: str):
+        """직전 lap(또는 생성) 이후 걸린 시간을 name 단계에 더함"""
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._lap
+        self._lap = now
+
+    def count(self, key: str, n: int = 1):
+        self.counts[key] += n
+
+    def error(self, exc: BaseException):
+        self.counts['failed'] += 1
+        self.errors[type(exc).__name__] += 1
+
+    def timed(self, read_fn):
+        """fdr.DataReader와 같은 시그니처로, 호출마다 응답 시간을 기록하는 함수 (실패한 호출 포함)"""
+        def timed_read(code, start_date, end_date):
+            start = time.perf_counter()
+            try:
+                return read_fn(code, start_date, end_date)
+            finally:
+                # list.append는 GIL 아래에서 원자적이므로 수집 스레드에서 바로 기록
+                self.latencies.append(time.perf_counter() - start)
+        return timed_read
+
+    def summary(self) -> dict:
+        """pickle/JSON 가능한 요약"""
+        return {
+            'name': self.name,
+            'started': self.started,
+            'total': round(sum(self.stages.values()), 4),
+            'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            'counts': dict(self.counts),
+            'errors': dict(self.errors),
+            'latency_ms': percentiles(self.latencies),
+        }
+
+    def log(self, **fields) -> dict:
+        """요약을 JSON 한 줄로 로그에 남기고 반환"""
+        summary = self.summary()
+        fields = {'event': summary['name'], **fields}
+        fields.update((key, value) for key, value in summary.items() if key != 'name')
+        logger.info(json.dumps(fields, ensure_ascii=False, default=str))
+        return summary
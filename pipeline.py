@@ -0,0 +1,547 @@
+"""
+턴어라운드 계산 파이프라인
+Streamlit 없이 시장별 섹터/종목 턴어라운드 테이블을 만들고 파일로 저장 (배치/크론용 CLI 포함)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fetcher import (
+    BatchReader, fetch_histories, fetch_deadline, yfinance_download, DEFAULT_MAX_WORKERS, DEFAULT_TICKER_TIMEOUT,
+)
+from price_store import PriceStore, DEFAULT_STORE_DIR
+from providers import DEFAULT_RATE, default_provider
+from indicators import (
+    MIN_HISTORY, LOOKBACK_DAYS, build_panel, compute_indicators, turnaround_score, volume_points, bonus_points,
+    group_mean, sync_state,
+)
+from synthetic import generate_market
+from price_panel import PricePanel
+from horizons import SAMPLE_HISTORY_DAYS, HISTORY_CALENDAR_DAYS, VIEW_TABLES, VIEW_PANELS, build_views
+from score_history import extend_scores, sample_scores
+from snapshots import current_slot
+from ticker_memo import TickerMemo, default_memo
+from metrics import Metrics, setup_logging
+from universe import load_universe, ticker_index
+
+
+MARKETS = ['KOSPI', 'KOSDAQ', 'US']
+DEFAULT_OUTPUT_DIR = os.path.join(DEFAULT_STORE_DIR, 'batch')
+OUTPUT_TABLES = ('sectors', 'stocks', 'panel', 'sector_panel', 'stock_scores', 'sector_scores')
+PANEL_TABLES = ('panel', 'sector_panel', 'stock_scores', 'sector_scores')
+
+
+def load_market_data(market: str, use_real_data: bool = False, read_fn=None):
+    """시장 데이터 로드 (실제 API 또는 샘플 데이터, 실제 데이터가 불완전하면 예외)
+
+    read_fn을 주면 기본 공급자 대신 사용한다 (예: 프로세스 간 공유 캐시를 거치는 함수).
+    """
+    
+    if not use_real_data:
+        return generate_sample_data(market, history_days=SAMPLE_HISTORY_DAYS)
+    
+    store = PriceStore()
+    states = store.load_state(f"indicators-{market}")
+    scores = store.load_state(f"scores-{market}")
+    data = load_real_data(market, read_fn=read_fn, batch_fn=default_batch_fn(market), store=store,
+                          states=states, scores=scores, history_days=HISTORY_CALENDAR_DAYS,
+                          memo=default_memo(), fresh_since=current_slot(market))
+    store.save_state(f"indicators-{market}", states)
+    store.save_state(f"scores-{market}", scores)
+    # 데이터 유효성 검사
+    if not data or 'sectors' not in data or len(data['sectors']) == 0 \
+            or 'turnaround_score' not in data['sectors'].columns:
+        raise Exception("실제 데이터가 불완전합니다.")
+    return data
+
+
+def default_reader():
+    """기본 시세 공급자 (FinanceDataReader -> 로컬 파일 순, 공급자별 요청 수 제한/재시도/서킷 브레이커)"""
+    return default_provider()
+
+
+def default_batch_fn(market: str):
+    """여러 종목을 한 번에 받는 공급자 (미국 시장만 yfinance, 없으면 None)"""
+    if market != 'US' or importlib.util.find_spec('yfinance') is None:
+        return None
+    return yfinance_download
+
+
+def load_real_data(market: str, read_fn=None, batch_fn=None, store: PriceStore = None, universe: dict = None,
+                   states: dict = None, scores: dict = None, as_of: datetime = None, history_days: int = None,
+                   memo: TickerMemo = None, fresh_since: float = None,
+                   max_workers: int = DEFAULT_MAX_WORKERS,
+                   ticker_timeout: float = DEFAULT_TICKER_TIMEOUT,
+                   deadline: float = None):
+    """실제 데이터 로드 (FinanceDataReader 사용, read_fn으로 다른 공급자 지정 가능)
+
+    batch_fn(codes, start, end)을 주면 전 종목을 묶음 요청으로 받고, 묶음에서 빠진 종목만 read_fn으로 개별 호출한다.
+    store를 주면 로컬 저장소에 없는 구간만 받아온다.
+    states(종목코드 -> IndicatorState)를 주면 새로 들어온 봉만 반영해 지표를 갱신하고 그 dict를 고쳐 쓴다.
+    scores를 주면 그 안의 'history'(종목코드별 스코어 이력)에 새 날짜만 계산해 이어 붙이고 고쳐 쓴다.
+    history_days(달력일)를 주면 그만큼 받아 두고, 기본 테이블은 최근 120일로 계산하되
+    기간/봉 조합별 테이블을 'views'((기간, 봉) -> 테이블)로 함께 만든다.
+    memo(TickerMemo)를 주면 fresh_since 이후에 받은 종목 시세를 종목 단위로 재사용한다.
+    여러 섹터에 속한 종목도 종목코드별로 한 번만 받고 계산해 행으로 펼친다.
+    deadline 안에 받지 못한 종목은 빼고 계산하며, 스캔 범위는 결과의 'coverage'에 기록한다.
+    deadline을 주지 않으면 공급자 초당 요청 수 제한으로 전 종목을 받을 수 있는 시간으로 잡는다.
+    가격 시계열은 'panel'(행 순서 = stocks 행 순서)과 'sector_panel'(라벨 = 섹터명) PricePanel로,
+    일자별 스코어는 같은 행 구성의 'stock_scores'와 'sector_scores' PricePanel로 돌려준다.
+    단계별 시간, 종목 수(수집/부족/실패), 공급자 응답 시간은 'metrics'에 담고 로그로도 남긴다.
+    """
+    scan_start = time.perf_counter()
+    metrics = Metrics('load_real_data')
+    if read_fn is None:
+        read_fn = default_reader()
+    read_fn = metrics.timed(read_fn)
+    
+    end_date = as_of or datetime.now()
+    start_date = end_date - timedelta(days=LOOKBACK_DAYS)
+    fetch_start = min(start_date, end_date - timedelta(days=history_days)) if history_days else start_date
+    
+    # 로컬 상장 목록 스냅샷 기준 전 종목 (없으면 기본 종목)
+    sector_stocks = universe if universe is not None else load_universe(market)
+    
+    sector_data = []
+    stock_data = []
+    
+    # 종목코드 -> [(섹터, 종목명, 순번)]
+    listings = ticker_index(sector_stocks)
+    if deadline is None:
+        deadline = fetch_deadline(len(listings), DEFAULT_RATE)
+    
+    batch = None
+    if batch_fn is not None:
+        # 저장소에서 빠진 구간이 있는 종목이 처음 생길 때 전 종목을 한 번에 받음
+        batch = BatchReader(metrics.timed(batch_fn), read_fn, listings.keys(), fetch_start, end_date)
+        read_fn = batch
+    if store is not None:
+        read_fn = store.reader(read_fn)
+    if memo is not None:
+        # 이번 갱신 구간에 이미 받은 종목은 저장소/공급자까지 가지 않음
+        read_fn = memo.reader(read_fn, fresh_since=fresh_since)
+        memo_before = memo.stats.copy()
+    
+    # 병렬 수집: 도착하는 순서대로 종가만 추려 둠
+    closes = {}
+    long_closes = {}
+    for code, df, error in fetch_histories(read_fn, listings.keys(), fetch_start, end_date,
+                                           max_workers=max_workers, ticker_timeout=ticker_timeout,
+                                           deadline=deadline):
+        if error is not None:
+            metrics.error(error)
+            continue
+        
+        if df is None or 'Close' not in df.columns:
+            metrics.count('no_close')
+            continue
+        
+        series = df['Close'].dropna()
+        if history_days:
+            long_closes[code] = series
+            series = series[series.index >= pd.Timestamp(start_date).normalize()]
+        if len(series) < MIN_HISTORY:
+            metrics.count('too_short')
+            continue
+        closes[code] = series
+        metrics.count('fetched')
+        if states is not None:
+            states[code] = sync_state(states.get(code), series.index, series.values, start_date)
+    metrics.count('universe', len(listings))
+    if batch is not None:
+        metrics.count('batch_calls', batch.batch_calls)
+        metrics.count('fallbacks', batch.fallbacks)
+    metrics.lap('fetch')
+    
+    # 원래 종목 순서대로 정렬한 (순번, 섹터, 종목명, 코드)
+    rows = sorted((order, sector_name, name, code)
+                  for code, entries in listings.items() if code in closes
+                  for sector_name, name, order in entries)
+    
+    if rows:
+        # 여러 섹터에 속한 종목은 종목코드별로 한 번만 계산해 행으로 펼침
+        codes = list(dict.fromkeys(code for _, _, _, code in rows))
+        code_pos = {code: i for i, code in enumerate(codes)}
+        row_of = np.array([code_pos[code] for _, _, _, code in rows])
+        if states is not None:
+            # 종목별 스트리밍 상태에서 바로 읽음
+            snapshots = [states[code].snapshot() for code in codes]
+            code_ind = {key: np.array([snap[key] for snap in snapshots]) for key in snapshots[0]}
+        else:
+            code_ind = compute_indicators(build_panel([closes[code] for code in codes]))
+        code_score = turnaround_score(code_ind['from_low'], code_ind['ma20_vs_ma60'], code_ind['rsi'],
+                                      volume_pts=15.0)  # 거래량 기본점수
+        ind = {key: values[row_of] for key, values in code_ind.items()}
+        score = code_score[row_of]
+        metrics.count('rows', len(rows))
+        if memo is not None:
+            for key, n in (memo.stats - memo_before).items():
+                metrics.count(f"memo_{key}", n)
+        metrics.lap('indicators')
+        
+        for i, (_, sector_name, name, _) in enumerate(rows):
+            stock_data.append({
+                'sector': sector_name,
+                'stock': name,
+                'from_low': round(float(ind['from_low'][i]), 1),
+                'ma20_vs_ma60': round(float(ind['ma20_vs_ma60'][i]), 2),
+                'rsi': round(float(ind['rsi'][i]), 1),
+                'volume_ratio': 100.0,
+                'foreign_buy': 0.0,
+                'turnaround_score': round(min(float(score[i]), 100)),
+                'is_turnaround': bool(score[i] >= 50),
+            })
+        
+        # 섹터 평균 계산
+        sector_names = list(sector_stocks)
+        sector_pos = {sector_name: g for g, sector_name in enumerate(sector_names)}
+        groups = np.array([sector_pos[sector_name] for _, sector_name, _, _ in rows])
+        avg_from_low = group_mean(ind['from_low'], groups, len(sector_names))
+        avg_ma = group_mean(ind['ma20_vs_ma60'], groups, len(sector_names))
+        avg_rsi = group_mean(ind['rsi'], groups, len(sector_names))
+        avg_score = group_mean(score, groups, len(sector_names))
+        
+        # 가격 데이터 평균 (거래일 기준으로 맞춘 정규화 가격의 날짜별 평균)
+        code_panel = PricePanel.from_series(codes, [closes[code] for code in codes])
+        names = [name for _, _, name, _ in rows]
+        panel = PricePanel(code_panel.dates, names, code_panel.values[row_of])
+        all_sector_panel = panel.normalized().group_mean(groups, sector_names)
+        current_prices = all_sector_panel.last()
+        
+        present = []
+        for g, sector_name in enumerate(sector_names):
+            if not np.any(groups == g):
+                continue
+            present.append(g)
+            
+            sector_data.append({
+                'sector': sector_name,
+                'current_price': float(current_prices[g]),
+                'from_low': round(float(avg_from_low[g]), 1),
+                'ma20': 0.0,
+                'ma60': 0.0,
+                'ma20_vs_ma60': round(float(avg_ma[g]), 2),
+                'rsi': round(float(avg_rsi[g]), 1),
+                'volume_ratio': 100.0,
+                'foreign_buy': 0.0,
+                'turnaround_score': round(min(float(avg_score[g]), 100)),
+                'is_turnaround': bool(avg_score[g] >= 50),
+            })
+        sector_panel = PricePanel(all_sector_panel.dates, [sector_names[g] for g in present],
+                                  all_sector_panel.values[present]).tail(90)
+        metrics.lap('aggregate')
+        
+        # 스코어 이력: 종목별로 새 날짜만 계산해 잇고, 섹터는 종목 스코어의 날짜별 평균
+        history = extend_scores(scores.get('history') if scores is not None else None, code_panel)
+        if scores is not None:
+            scores['history'] = history
+        stock_scores = PricePanel(history.dates, names, history.values[row_of])
+        all_sector_scores = stock_scores.group_mean(groups, sector_names)
+        sector_scores = PricePanel(history.dates, sector_panel.labels, all_sector_scores.values[present])
+    metrics.lap('scores')
+    
+    stocks_df = pd.DataFrame(stock_data) if stock_data else pd.DataFrame()
+    sectors_df = pd.DataFrame(sector_data)
+    views = {}
+    if history_days and rows:
+        # 기간/봉 조합별 테이블 (긴 이력 패널을 종목 행 순서로 맞춰 한 번에)
+        long_panel = PricePanel.from_series(codes, [long_closes[code] for code in codes])
+        views = build_views(long_panel, stocks_df, sectors_df, bonus_points(stocks_df, use_real_data=True),
+                            row_of=row_of)
+        metrics.lap('views')
+    summary = metrics.log(market=market)
+    
+    if not sector_data:
+        raise Exception("데이터를 가져올 수 없습니다. 네트워크 연결을 확인하세요.")
+    
+    return {
+        'sectors': sectors_df,
+        'stocks': stocks_df,
+        'dates': sector_panel.dates,
+        'panel': panel,
+        'sector_panel': sector_panel,
+        'stock_scores': stock_scores,
+        'sector_scores': sector_scores,
+        'views': views,
+        'coverage': {
+            'universe': len(listings),
+            'scanned': len(closes),
+            'elapsed': time.perf_counter() - scan_start,
+            'budget': deadline,
+        },
+        'metrics': summary,
+    }
+
+
+def generate_sample_data(market: str, n_tickers: int = None, n_sectors: int = None,
+                         n_days: int = 90, seed: int = 42, history_days: int = None) -> dict:
+    """샘플 데이터 생성
+
+    n_tickers를 주면 시장별 기본 종목 대신 n_sectors개 섹터의 합성 종목으로 대규모 시장을 만든다.
+    history_days를 주면 그만큼 생성해 기본 테이블은 최근 n_days로 계산하고, 기간/봉 조합별 테이블을 'views'로 함께 만든다.
+    """
+    metrics = Metrics('generate_sample_data')
+    
+    sectors_config = {
+        'KOSPI': {
+            '반도체': ['삼성전자', 'SK하이닉스', 'DB하이텍', '리노공업', '한미반도체'],
+            '자동차': ['현대차', '기아', '현대모비스', '만도', 'HL만도'],
+            '금융': ['KB금융', '신한지주', '하나금융', '우리금융', '삼성생명'],
+            '바이오': ['삼성바이오', '셀트리온', 'SK바이오팜', '유한양행', '녹십자'],
+            '2차전지': ['LG에너지솔루션', '삼성SDI', 'SK이노베이션', '에코프로비엠', '포스코퓨처엠'],
+            '철강': ['POSCO홀딩스', '현대제철', '동국제강', '세아베스틸', '고려아연'],
+            '화학': ['LG화학', 'S-Oil', '롯데케미칼', '금호석유', 'SK케미칼'],
+            '조선': ['한국조선해양', '현대미포조선', '삼성중공업', '대우조선해양', 'HD현대'],
+            '건설': ['삼성물산', '현대건설', 'GS건설', '대림산업', 'DL이앤씨'],
+            '유통': ['삼성물산', '신세계', '현대백화점', '롯데쇼핑', 'BGF리테일'],
+        },
+        'KOSDAQ': {
+            'IT서비스': ['카카오게임즈', '더존비즈온', '위메이드', '컴투스', '네오위즈'],
+            '게임': ['크래프톤', '펄어비스', '스마일게이트', '넷마블', '웹젠'],
+            '바이오': ['알테오젠', '에이비엘바이오', '레고켐바이오', '펩트론', '메드팩토'],
+            '엔터테인먼트': ['하이브', 'JYP엔터', 'SM엔터', '와이지엔터', '큐브엔터'],
+            '반도체장비': ['원익IPS', '주성엔지니어링', '피에스케이', '테스', '유진테크'],
+            '2차전지소재': ['에코프로', '엘앤에프', '코스모신소재', '나노신소재', '천보'],
+            '로봇': ['레인보우로보틱스', '두산로보틱스', '로보스타', '뉴로메카', '티로보틱스'],
+            'AI/SW': ['솔트룩스', '마인즈랩', '셀바스AI', '코난테크놀로지', '플리토'],
+            '의료기기': ['오스템임플란트', '레이', '바텍', '디오', '덴티움'],
+            '신재생에너지': ['씨에스윈드', '한화솔루션', 'OCI', 'SK가스', '두산퓨얼셀'],
+        },
+        'US': {
+            'Technology': ['NVIDIA', 'Apple', 'Microsoft', 'Google', 'Meta'],
+            'Healthcare': ['UnitedHealth', 'Johnson & Johnson', 'Pfizer', 'Abbvie', 'Merck'],
+            'Financials': ['JPMorgan', 'Bank of America', 'Wells Fargo', 'Goldman Sachs', 'Morgan Stanley'],
+            'Energy': ['Exxon Mobil', 'Chevron', 'ConocoPhillips', 'Schlumberger', 'EOG Resources'],
+            'Consumer': ['Amazon', 'Tesla', 'Walmart', 'Home Depot', 'Nike'],
+            'Industrials': ['Caterpillar', 'Boeing', 'Honeywell', '3M', 'Union Pacific'],
+            'Materials': ['Linde', 'Air Products', 'Sherwin-Williams', 'Freeport-McMoRan', 'Nucor'],
+            'Real Estate': ['Prologis', 'American Tower', 'Crown Castle', 'Equinix', 'Public Storage'],
+            'Utilities': ['NextEra Energy', 'Duke Energy', 'Southern Company', 'Dominion', 'Exelon'],
+            'Communication': ['Verizon', 'AT&T', 'T-Mobile', 'Comcast', 'Disney'],
+        }
+    }
+    
+    if n_tickers is None:
+        sectors = sectors_config.get(market, sectors_config['KOSPI'])
+    else:
+        # 부하 테스트용 합성 종목
+        n_sectors = n_sectors or 10
+        sizes = np.full(n_sectors, n_tickers // n_sectors)
+        sizes[:n_tickers % n_sectors] += 1
+        sectors = {
+            f"섹터{s + 1:02d}": [f"{market}-{s + 1:02d}-{i + 1:04d}" for i in range(size)]
+            for s, size in enumerate(sizes)
+        }
+    
+    sector_names = list(sectors)
+    names = [name for stocks in sectors.values() for name in stocks]
+    market_data = generate_market(n_days=max(n_days, history_days or 0), seed=seed,
+                                  sector_sizes=[len(stocks) for stocks in sectors.values()])
+    
+    # 여러 섹터에 속한 종목(예: 삼성물산)은 첫 행의 시세를 같이 쓰고, 지표/스코어는 한 번만 계산해 행으로 펼침
+    name_pos = {}
+    row_of = np.array([name_pos.setdefault(name, len(name_pos)) for name in names])
+    firsts = np.unique(row_of, return_index=True)[1]
+    if len(firsts) == len(names):
+        firsts, row_of = slice(None), None
+    else:
+        for key in ('close', 'volume', 'foreign_buy'):
+            market_data[key] = market_data[key][firsts][row_of]
+    dates = market_data['dates'][-n_days:]
+    close = market_data['close'][:, -n_days:].astype(float)
+    volume = market_data['volume'][:, -n_days:]
+    sector_of = market_data['sector_of']
+    metrics.count('universe', len(sector_of))
+    metrics.lap('generate')
+    
+    # 종목 지표
+    ind = compute_indicators(close[firsts])
+    if row_of is not None:
+        ind = {key: values[row_of] for key, values in ind.items()}
+    volume_ratio = volume[:, -5:].mean(axis=1) / volume[:, -60:].mean(axis=1) * 100
+    foreign_buy = market_data['foreign_buy']
+    score = turnaround_score(ind['from_low'], ind['ma20_vs_ma60'], ind['rsi'],
+                             volume_points(volume_ratio), np.where(foreign_buy > 0, 10, 0))
+    metrics.lap('indicators')
+    
+    stocks_df = pd.DataFrame({
+        'sector': np.array(sector_names)[sector_of],
+        'stock': names,
+        'from_low': ind['from_low'].round(1),
+        'ma20_vs_ma60': ind['ma20_vs_ma60'].round(2),
+        'rsi': ind['rsi'].round(1),
+        'volume_ratio': volume_ratio.round(1),
+        'foreign_buy': foreign_buy.round(1),
+        'turnaround_score': np.rint(np.clip(score, 0, 100)).astype(int),
+        'is_turnaround': score >= 50,
+    })
+    
+    # 섹터 지수 (기준=100 정규화 가격의 섹터 평균)
+    starts = np.concatenate([[0], np.cumsum(np.bincount(sector_of))[:-1]])
+    counts = np.bincount(sector_of)
+    sector_prices = np.add.reduceat(close / close[:, :1] * 100, starts, axis=0) / counts[:, None]
+    
+    sector_ind = compute_indicators(sector_prices)
+    sector_volume = group_mean(volume_ratio, sector_of, len(sector_names))
+    sector_foreign = group_mean(foreign_buy, sector_of, len(sector_names))
+    sector_score = turnaround_score(sector_ind['from_low'], sector_ind['ma20_vs_ma60'], sector_ind['rsi'],
+                                    volume_points(sector_volume), np.where(sector_foreign > 0, 10, 0))
+    
+    sectors_df = pd.DataFrame({
+        'sector': sector_names,
+        'current_price': sector_ind['current_price'],
+        'from_low': sector_ind['from_low'].round(1),
+        'ma20': sector_ind['ma20'],
+        'ma60': sector_ind['ma60'],
+        'ma20_vs_ma60': sector_ind['ma20_vs_ma60'].round(2),
+        'rsi': sector_ind['rsi'].round(1),
+        'volume_ratio': sector_volume.round(1),
+        'foreign_buy': sector_foreign.round(1),
+        'turnaround_score': np.rint(np.minimum(sector_score, 100)).astype(int),
+        'is_turnaround': sector_score >= 50,
+    })
+    metrics.lap('aggregate')
+    
+    # 일자별 스코어 이력 (마지막 날짜 = 위 테이블의 스코어)
+    stock_scores, sector_scores = sample_scores(close[firsts], volume[firsts], foreign_buy[firsts], sector_of,
+                                                sector_prices, row_of)
+    metrics.lap('scores')
+    
+    views = {}
+    if history_days:
+        history = PricePanel(market_data['dates'], stocks_df['stock'].to_numpy()[firsts], market_data['close'][firsts])
+        views = build_views(history, stocks_df, sectors_df, bonus_points(stocks_df), bonus_points(sectors_df), row_of)
+        metrics.lap('views')
+    
+    return {
+        'sectors': sectors_df,
+        'stocks': stocks_df,
+        'dates': dates,
+        'panel': PricePanel(dates, stocks_df['stock'], market_data['close'][:, -n_days:]),
+        'sector_panel': PricePanel(dates, sector_names, sector_prices),
+        'stock_scores': PricePanel(dates, stocks_df['stock'], stock_scores),
+        'sector_scores': PricePanel(dates, sector_names, sector_scores),
+        'views': views,
+        'metrics': metrics.log(market=market),
+    }
+
+
+# ============ 배치 출력 ============
+
+def output_prefix(market: str, use_real_data: bool, out_dir: str = None) -> str:
+    """시장별 출력 파일 경로 앞부분 (예: .data/batch/KOSPI-real)"""
+    return os.path.join(out_dir or DEFAULT_OUTPUT_DIR, f"{market}-{'real' if use_real_data else 'sample'}")
+
+
+def view_name(view: tuple) -> str:
+    """(기간, 봉) -> 파일 이름용 문자열 (예: 1Y-W)"""
+    return '-'.join(view)
+
+
+def write_table(table, path: str, fmt: str) -> str:
+    df = table.to_frame() if isinstance(table, PricePanel) else table
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if fmt == 'parquet':
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_json(tmp, orient='records', date_format='iso', force_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+
+def write_output(data: dict, market: str, use_real_data: bool, out_dir: str = None, fmt: str = 'parquet') -> list:
+    """섹터/종목 테이블, 기간/봉 조합별 테이블과 메타 정보를 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    prefix = output_prefix(market, use_real_data, out_dir)
+    os.makedirs(os.path.dirname(prefix), exist_ok=True)
+
+    paths = [write_table(data[table], f"{prefix}-{table}.{fmt}", fmt) for table in OUTPUT_TABLES]
+    views = data.get('views', {})
+    for view, tables in views.items():
+        for table in VIEW_TABLES:
+            paths.append(write_table(tables[table], f"{prefix}-view-{view_name(view)}-{table}.{fmt}", fmt))
+
+    # 메타 정보는 마지막에 써서, 읽는 쪽이 메타를 보면 테이블도 준비된 상태가 되도록 함
+    meta = {
+        'market': market,
+        'use_real_data': use_real_data,
+        'format': fmt,
+        'generated_at': time.time(),
+        'dates': [d.isoformat() for d in pd.DatetimeIndex(data['dates'])],
+        'coverage': data.get('coverage'),
+        'metrics': data.get('metrics'),
+        'views': [view_name(view) for view in views],
+    }
+    path = f"{prefix}-meta-{fmt}.json"
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    paths.append(path)
+    return paths
+
+
+def read_output(market: str, use_real_data: bool, out_dir: str = None, fresh_since: float = None):
+    """배치로 저장한 Parquet 결과를 load_market_data와 같은 형태로 읽음 (없거나 오래됐으면 None)"""
+    prefix = output_prefix(market, use_real_data, out_dir)
+    try:
+        with open(f"{prefix}-meta-parquet.json", encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if fresh_since is not None and meta['generated_at'] < fresh_since:
+        return None
+
+    data = {'dates': pd.DatetimeIndex(meta['dates']), 'views': {}}
+    try:
+        for table in OUTPUT_TABLES:
+            df = pd.read_parquet(f"{prefix}-{table}.parquet")
+            data[table] = PricePanel.from_frame(df) if table in PANEL_TABLES else df
+        for name in meta.get('views', []):
+            tables = {table: pd.read_parquet(f"{prefix}-view-{name}-{table}.parquet") for table in VIEW_TABLES}
+            for table in VIEW_PANELS:
+                tables[table] = PricePanel.from_frame(tables[table])
+            data['views'][tuple(name.split('-'))] = tables
+    except OSError:
+        # 이전 형식의 출력 (패널/스코어 이력 파일 없음)
+        return None
+    for key in ('coverage', 'metrics'):
+        if meta.get(key):
+            data[key] = meta[key]
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="섹터/종목 턴어라운드 테이블 배치 계산")
+    parser.add_argument('markets', nargs='*', default=MARKETS, help="시장 (기본: KOSPI KOSDAQ US)")
+    parser.add_argument('--real', action='store_true', help="실제 데이터 사용 (기본: 샘플 데이터)")
+    parser.add_argument('--format', choices=['parquet', 'json'], default='parquet')
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_DIR, help="출력 디렉터리")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    failed = 0
+    for market in args.markets:
+        start = time.perf_counter()
+        try:
+            data = load_market_data(market, args.real)
+        except Exception as e:
+            print(f"{market}: 실패 - {e}", file=sys.stderr)
+            failed += 1
+            continue
+        paths = write_output(data, market, args.real, args.out, args.format)
+        print(f"{market}: 섹터 {len(data['sectors'])}개, 종목 {len(data['stocks'])}개 "
+              f"({time.perf_counter() - start:.2f}초) -> {paths[0]}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # 사용법: python pipeline.py KOSPI US --real --format json --out ./out
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+가격 패널
+공통 거래일 인덱스 하나와 float32 종목 x 일자 행렬로 여러 가격 시계열을 보관 (결측일은 NaN)
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PricePanel:
+    """행 = labels, 열 = dates 인 float32 가격 행렬
+
+    섹터/종목 테이블은 시계열을 복사해 들고 있지 않고 이 패널의 행을 가리킨다.
+    """
+    dates: pd.DatetimeIndex
+    labels: list
+    values: np.ndarray
+    _rows: dict = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.dates = pd.DatetimeIndex(self.dates)
+        self.labels = list(self.labels)
+        self.values = np.asarray(self.values, dtype=np.float32)
+        if self.values.shape != (len(self.labels), len(self.dates)):
+            raise ValueError(f"패널 크기 {self.values.shape}가 라벨 {len(self.labels)}개 x 날짜 {len(self.dates)}개와 다릅니다.")
+
+    @classmethod
+    def from_series(cls, labels, series_list, dates=None) -> 'PricePanel':
+        """날짜 인덱스 Series들을 거래일 기준으로 맞춰 패널 생성 (dates가 없으면 전체 날짜의 합집합)"""
+        if dates is None:
+            indexes = [pd.DatetimeIndex(s.index).values for s in series_list]
+            dates = np.unique(np.concatenate(indexes)) if indexes else np.array([], dtype='datetime64[ns]')
+        dates = pd.DatetimeIndex(dates)
+        values = np.full((len(series_list), len(dates)), np.nan, dtype=np.float32)
+        for i, s in enumerate(series_list):
+            cols = dates.get_indexer(pd.DatetimeIndex(s.index))
+            keep = cols >= 0
+            values[i, cols[keep]] = np.asarray(s, dtype=np.float32)[keep]
+        return cls(dates, labels, values)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """값이 있는 칸 (False = 결측일)"""
+        return ~np.isnan(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def row(self, label) -> int:
+        if self._rows is None:
+            self._rows = {label: i for i, label in enumerate(self.labels)}
+        return self._rows[label]
+
+    def series(self, label) -> np.ndarray:
+        """한 행의 가격 (뷰, 복사하지 않음)"""
+        return self.values[self.row(label)]
+
+    def tail(self, n: int) -> 'PricePanel':
+        """최근 n 거래일만 남긴 패널 (뷰)"""
+        return PricePanel(self.dates[-n:], self.labels, self.values[:, -n:])
+
+    def last(self) -> np.ndarray:
+        """행별 마지막 유효값 (모두 결측이면 NaN)"""
+        valid = self.valid
+        last = self.values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+        out = self.values[np.arange(len(self.labels)), last] if self.values.shape[1] else np.full(len(self.labels), np.nan)
+        return np.where(valid.any(axis=1), out, np.nan)
+
+    def normalized(self, base: float = 100.0) -> 'PricePanel':
+        """행별 첫 유효값 기준으로 정규화한 패널"""
+        valid = self.valid
+        first = np.argmax(valid, axis=1)
+        start = self.values[np.arange(len(self.labels)), first]
+        start[~valid.any(axis=1)] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return PricePanel(self.dates, self.labels, self.values / start[:, None] * np.float32(base))
+
+    def group_mean(self, groups, labels) -> 'PricePanel':
+        """날짜별로 같은 그룹(0..len(labels)-1) 행의 평균 (결측은 빼고 평균, 모두 결측이면 NaN)"""
+        groups = np.asarray(groups)
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]) if len(groups) else groups
+        valid = self.valid[order]
+
+        total = np.full((len(labels), len(self.dates)), np.nan)
+        count = np.zeros((len(labels), len(self.dates)), dtype=np.int64)
+        if len(starts):
+            present = sorted_groups[starts]
+            total[present] = np.add.reduceat(np.where(valid, self.values[order], 0.0), starts, axis=0)
+            count[present] = np.add.reduceat(valid, starts, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / count, np.nan)
+        return PricePanel(self.dates, labels, mean)
+
+    def to_frame(self) -> pd.DataFrame:
+        """저장용 DataFrame (행 = 라벨, 열 = ISO 날짜)"""
+        df = pd.DataFrame(self.values, columns=[d.isoformat() for d in self.dates])
+        df.insert(0, 'label', self.labels)
+        return df
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'PricePanel':
+        values = df.drop(columns='label')
+        return cls(pd.DatetimeIndex(values.columns), df['label'].tolist(), values.to_numpy(np.float32))
@@ -0,0 +1,133 @@
+"""
+로컬 시세 저장소
+종목별 OHLCV를 Parquet 파일로 보관하고 빠진 구간만 새로 받아 이어 붙임
+"""
+
+import os
+import re
+import time
+import pickle
+
+import pandas as pd
+
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'TURNAROUND_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+)
+DEFAULT_MAX_AGE = 600  # 이 시간(초) 안에 갱신된 파일은 네트워크 확인 생략
+
+_COVERED_FROM = b'covered_from'
+
+
+class PriceStore:
+    """종목코드 -> 날짜 인덱스 OHLCV Parquet 저장소"""
+
+    def __init__(self, root: str = None, max_age: float = DEFAULT_MAX_AGE):
+        self.root = os.path.join(root or DEFAULT_STORE_DIR, 'prices')
+        self.max_age = max_age
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, code: str) -> str:
+        safe = re.sub(r'[^0-9A-Za-z._-]', '_', str(code))
+        return os.path.join(self.root, f"{safe}.parquet")
+
+    def load(self, code: str):
+        """저장된 전체 이력과 요청이 커버된 시작일 반환 (없으면 (None, None))"""
+        path = self.path(code)
+        if not os.path.exists(path):
+            return None, None
+        # pyarrow는 저장소를 실제로 쓸 때만 가져옴 (샘플 데이터/JSON 배치 경로는 pandas/NumPy만 필요)
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        meta = table.schema.metadata or {}
+        df = table.to_pandas()
+        covered_from = pd.Timestamp(meta[_COVERED_FROM].decode()) if _COVERED_FROM in meta else df.index.min()
+        return df, covered_from
+
+    def save(self, code: str, df: pd.DataFrame, covered_from):
+        """임시 파일에 쓴 뒤 교체 (읽는 쪽이 중간 상태를 보지 않도록)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df)
+        meta = dict(table.schema.metadata or {})
+        meta[_COVERED_FROM] = pd.Timestamp(covered_from).isoformat().encode()
+        table = table.replace_schema_metadata(meta)
+
+        path = self.path(code)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def read(self, read_fn, code, start_date, end_date):
+        """저장소를 먼저 보고 빠진 앞/뒤 구간만 read_fn으로 받아 병합"""
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        stored, covered_from = self.load(code)
+
+        if stored is None or len(stored) == 0:
+            df = read_fn(code, start_date, end_date)
+            if df is not None and len(df) > 0:
+                self.save(code, _clean(df), start)
+            return df
+
+        gaps = []
+        if start < covered_from:
+            gaps.append((start, covered_from - pd.Timedelta(days=1)))
+        fresh = time.time() - os.path.getmtime(self.path(code)) < self.max_age
+        last = stored.index.max()
+        if not (fresh and last >= end - pd.offsets.BDay(1)):
+            # 장중에 받은 마지막 봉은 미완성일 수 있으므로 마지막 날짜부터 다시 받음
+            gaps.append((last, end))
+
+        parts = [stored]
+        try:
+            for gap_start, gap_end in gaps:
+                if gap_start <= gap_end:
+                    part = read_fn(code, gap_start, gap_end)
+                    if part is not None and len(part) > 0:
+                        parts.append(_clean(part))
+        except Exception:
+            # 갱신 실패 시 저장된 이력으로 대신함
+            if len(parts) == 1:
+                return stored.loc[start:end]
+            raise
+
+        if gaps:
+            merged = pd.concat(parts)
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            self.save(code, merged, min(start, covered_from))
+            stored = merged
+        return stored.loc[start:end]
+
+    def load_state(self, name: str) -> dict:
+        """저장된 계산 상태 (없거나 읽을 수 없으면 빈 dict)"""
+        path = os.path.join(os.path.dirname(self.root), 'state', f"{name}.pkl")
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return {}
+
+    def save_state(self, name: str, state: dict):
+        path = os.path.join(os.path.dirname(self.root), 'state', f"{name}.pkl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def reader(self, read_fn):
+        """fdr.DataReader와 같은 시그니처의 저장소 경유 함수 반환"""
+        def cached_read(code, start_date, end_date):
+            return self.read(read_fn, code, start_date, end_date)
+        return cached_read
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.index = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+    df.index.name = 'Date'
+    return df[~df.index.duplicated(keep='last')].sort_index()
@@ -0,0 +1,260 @@
+"""
+시세 공급자 계층
+공급자별 요청 수 제한(토큰 버킷), 지터를 넣은 재시도, 서킷 브레이커를 두고 여러 공급자를 순서대로 시도
+로컬 파일 공급자로 네트워크 없이 실행/측정 가능 (python providers.py)
+"""
+
+import os
+import re
+import time
+import random
+import threading
+from collections import Counter
+from functools import lru_cache
+
+import pandas as pd
+
+from price_store import DEFAULT_STORE_DIR
+from metrics import logger
+
+
+DEFAULT_RATE = 10.0          # 공급자별 초당 요청 수
+DEFAULT_BURST = 10           # 몰아서 보낼 수 있는 요청 수
+DEFAULT_RETRIES = 2          # 실패 시 재시도 횟수
+BACKOFF_BASE = 0.2           # 재시도 대기 기본값 (초, 시도마다 2배)
+BACKOFF_CAP = 5.0            # 재시도 대기 상한 (초)
+BREAKER_THRESHOLD = 5        # 이 횟수만큼 연속 실패하면 차단
+BREAKER_COOLDOWN = 30.0      # 차단 후 시험 요청까지 기다리는 시간 (초)
+OFFLINE_DIR = os.path.join(DEFAULT_STORE_DIR, 'offline')
+
+
+class CircuitOpen(Exception):
+    """서킷 브레이커가 열려 요청을 보내지 않음"""
+
+
+class TickerNotFound(LookupError):
+    """공급자에 없는 종목 (재시도하지 않고 브레이커 실패로도 세지 않음)"""
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 (스레드 안전)"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 하나를 쓸 때까지 기다리고 기다린 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold번이면 열고, cooldown 뒤 시험 요청 하나만 보내 성공하면 닫음"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        return self.HALF_OPEN if time.monotonic() - self.opened_at >= self.cooldown else self.OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> bool:
+        """실패 기록 (이번 실패로 열렸으면 True)"""
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self._trial = False
+                return True
+            return False
+
+
+def backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """attempt번째 재시도 전 대기 시간 (0 ~ base x 2^attempt 사이 균등 지터, cap 상한)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Provider:
+    """fdr.DataReader 시그니처 함수에 요청 수 제한, 재시도, 서킷 브레이커를 씌운 공급자"""
+
+    def __init__(self, name: str, read_fn, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 retries: int = DEFAULT_RETRIES, breaker: CircuitBreaker = None):
+        self.name = name
+        self.read_fn = read_fn
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, n: float = 1):
+        """stats 누적 (여러 수집 스레드가 함께 부름)"""
+        with self._lock:
+            self.stats[key] += n
+
+    def __call__(self, code, start_date, end_date):
+        if not self.breaker.allow():
+            self._count('rejected')
+            raise CircuitOpen(f"{self.name}: 연속 실패로 차단됨")
+
+        for attempt in range(self.retries + 1):
+            self._count('throttled', self.bucket.acquire())
+            self._count('calls')
+            try:
+                df = self.read_fn(code, start_date, end_date)
+            except TickerNotFound:
+                # 응답은 정상이므로 공급자 상태로는 성공
+                self.breaker.success()
+                raise
+            except Exception as e:
+                error = e
+                if attempt < self.retries:
+                    self._count('retries')
+                    time.sleep(backoff(attempt))
+                continue
+            self.breaker.success()
+            return df
+
+        self._count('failures')
+        if self.breaker.failure():
+            logger.warning(f"{self.name}: 연속 {self.breaker.failures}회 실패로 "
+                           f"{self.breaker.cooldown:g}초 차단 ({type(error).__name__}: {error})")
+        raise error
+
+    def summary(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        return {'state': self.breaker.state, **{key: round(value, 3) for key, value in stats.items()}}
+
+
+class ProviderChain:
+    """공급자를 순서대로 시도해 처음 받은 결과를 반환 (차단된 공급자는 바로 건너뜀)"""
+
+    def __init__(self, providers: list):
+        self.providers = list(providers)
+
+    def __call__(self, code, start_date, end_date):
+        error = None
+        for provider in self.providers:
+            try:
+                df = provider(code, start_date, end_date)
+            except Exception as e:
+                error = e
+                continue
+            if df is not None and len(df) > 0:
+                return df
+        if error is None:
+            raise TickerNotFound(f"{code}: 데이터 없음")
+        raise error
+
+    def summary(self) -> dict:
+        """공급자별 상태와 호출/재시도/실패/차단 횟수"""
+        return {provider.name: provider.summary() for provider in self.providers}
+
+
+class FileProvider:
+    """디렉터리의 종목별 Parquet/CSV 파일(<코드>.parquet, 인덱스 = 날짜)을 읽는 공급자 (오프라인 실행/측정용)"""
+
+    def __init__(self, root: str = OFFLINE_DIR, latency: float = 0.0):
+        self.root = root
+        self.latency = latency
+
+    def path(self, code: str, ext: str = 'parquet') -> str:
+        safe = re.sub(r'[^0-9A-Za-z._-]', '_', str(code))
+        return os.path.join(self.root, f"{safe}.{ext}")
+
+    def __call__(self, code, start_date, end_date):
+        if self.latency:
+            time.sleep(self.latency)
+        if os.path.exists(self.path(code)):
+            df = pd.read_parquet(self.path(code))
+        elif os.path.exists(self.path(code, 'csv')):
+            df = pd.read_csv(self.path(code, 'csv'), index_col=0, parse_dates=True)
+        else:
+            raise TickerNotFound(f"{code}: 로컬 파일 없음")
+        return df.sort_index().loc[pd.Timestamp(start_date).normalize():pd.Timestamp(end_date)]
+
+    def save(self, code: str, df: pd.DataFrame):
+        os.makedirs(self.root, exist_ok=True)
+        df.to_parquet(self.path(code))
+
+
+@lru_cache(maxsize=None)
+def default_provider() -> ProviderChain:
+    """프로세스 공용 기본 공급자 (FinanceDataReader -> 로컬 파일 순, 브레이커 상태는 프로세스 안에서 유지)"""
+    providers = []
+    try:
+        import FinanceDataReader as fdr
+        providers.append(Provider('fdr', fdr.DataReader))
+    except ImportError:
+        pass
+    if os.path.isdir(OFFLINE_DIR):
+        providers.append(Provider('file', FileProvider(), rate=1000.0, burst=1000, retries=0))
+    if not providers:
+        raise Exception("FinanceDataReader가 설치되어 있지 않습니다.")
+    return ProviderChain(providers)
+
+
+if __name__ == "__main__":
+    # 가짜 공급자(장애 비율 지정) + 로컬 파일 대체 공급자로 수집 시간/성공 수/브레이커 동작 측정
+    import tempfile
+    from datetime import datetime, timedelta
+    from fetcher import FakeDataReader, fetch_histories
+
+    end = datetime.now()
+    start = end - timedelta(days=120)
+    codes = [f"{i:06d}" for i in range(200)]
+    root = tempfile.mkdtemp()
+    files = FileProvider(root)
+    seed = FakeDataReader(latency=0.0, jitter=0.0)
+    for code in codes:
+        files.save(code, seed(code, start, end))
+
+    for failure_rate in (0.0, 0.2, 1.0):
+        fake = FakeDataReader(latency=0.02, jitter=0.01, failure_rate=failure_rate, seed=1)
+        chain = ProviderChain([
+            Provider('fake', fake, rate=200.0, burst=20, breaker=CircuitBreaker(cooldown=60)),
+            Provider('file', FileProvider(root, latency=0.002), rate=1000.0, burst=1000, retries=0),
+        ])
+        t0 = time.perf_counter()
+        ok = sum(1 for _, _, err in fetch_histories(chain, codes, start, end, deadline=120) if err is None)
+        print(f"장애 {failure_rate:.0%}: {time.perf_counter() - t0:.2f}s  성공 {ok}/{len(codes)}  {chain.summary()}")
@@ -0,0 +1,104 @@
+"""
+스코어 이력
+일자별 턴어라운드 스코어를 한 번의 벡터 연산으로 계산하고, 새 봉이 들어오면 그 날짜만 이어 붙임
+"""
+
+import numpy as np
+
+from indicators import MIN_HISTORY, MA_LONG, indicator_panels, rolling_mean, turnaround_score, volume_points
+from price_panel import PricePanel
+
+
+SCORE_HISTORY_DAYS = 250   # 보관하는 스코어 이력 길이 (거래일)
+
+
+def volume_ratio_history(volume: np.ndarray) -> np.ndarray:
+    """일자별 거래량 비율 (최근 5일 평균 / 60일 평균 x 100)"""
+    volume = np.asarray(volume, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return rolling_mean(volume, 5) / rolling_mean(volume, MA_LONG, min_periods=MIN_HISTORY) * 100
+
+
+def daily_scores(prices: np.ndarray, volume_pts=15.0, foreign_pts=0.0, start: int = 0) -> np.ndarray:
+    """start열부터 마지막 열까지 일자별 스코어 (종목 x 일자 float32, 100점 상한, 지표 준비 전은 NaN)
+
+    각 날짜의 값은 그날까지의 가격만으로 계산한 대시보드 스코어와 같다 (저점은 행렬 시작부터의 최저가).
+    이동평균/RSI는 start 직전 MA_LONG+1일만 더 읽으므로 뒤쪽 몇 열만 계산하는 비용은 열 수에 비례한다.
+    volume_pts, foreign_pts는 스칼라, 종목별 (종목 x 1), 또는 일자별 (종목 x 일자) 배열.
+    """
+    prices = np.asarray(prices, dtype=float)
+    lo = max(start - (MA_LONG + 1), 0)
+    ind = indicator_panels(prices[:, lo:])
+    cols = slice(start - lo, None)
+
+    low = np.fmin.accumulate(np.where(np.isnan(prices), np.inf, prices), axis=1)[:, start:]
+    current = prices[:, start:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        from_low = np.where(low > 0, (current - low) / low * 100, 0.0)
+
+    def tail(pts):
+        pts = np.asarray(pts, dtype=float)
+        return pts[:, start:] if pts.ndim == 2 and pts.shape[1] == prices.shape[1] else pts
+
+    score = turnaround_score(from_low, ind['ma20_vs_ma60'][:, cols], ind['rsi'][:, cols],
+                             tail(volume_pts), tail(foreign_pts))
+    score = np.minimum(score, 100).astype(np.float32)
+    score[np.isnan(ind['ma20'][:, cols]) | np.isnan(current)] = np.nan
+    return score
+
+
+def extend_scores(history: PricePanel, panel: PricePanel, max_days: int = SCORE_HISTORY_DAYS) -> PricePanel:
+    """이전 스코어 이력에 panel의 새 날짜만 계산해 이어 붙인 이력 (라벨 = panel 라벨)
+
+    이전 이력의 마지막 날짜는 장중 봉이 바뀌었을 수 있으므로 다시 계산한다.
+    이전 이력에 없던 라벨은 panel 전체 기간을 계산해 채운다.
+    """
+    if history is None or len(history.dates) == 0:
+        return PricePanel(panel.dates, panel.labels, daily_scores(panel.values)).tail(max_days)
+
+    start = int(panel.dates.searchsorted(history.dates[-1]))
+    new_dates = panel.dates[start:]
+    kept = history.dates < new_dates[0] if len(new_dates) else np.ones(len(history.dates), dtype=bool)
+    kept_dates = history.dates[kept]
+
+    old = np.full((len(panel.labels), len(kept_dates)), np.nan, dtype=np.float32)
+    known = {label: i for i, label in enumerate(history.labels)}
+    rows = np.array([known.get(label, -1) for label in panel.labels], dtype=int)
+    found = rows >= 0
+    old[found] = history.values[rows[found]][:, kept]
+
+    if not found.all():
+        # 새로 들어온 종목은 받은 기간 전체를 계산해 겹치는 날짜에 채움
+        fresh = daily_scores(panel.values[~found])
+        cols = kept_dates.get_indexer(panel.dates)
+        inside = cols >= 0
+        block = old[~found]
+        block[:, cols[inside]] = fresh[:, inside]
+        old[~found] = block
+
+    if len(new_dates):
+        new = daily_scores(panel.values, start=start)
+    else:
+        new = np.empty((len(panel.labels), 0), dtype=np.float32)
+    return PricePanel(kept_dates.append(new_dates), panel.labels, np.concatenate([old, new], axis=1)).tail(max_days)
+
+
+def sample_scores(close: np.ndarray, volume: np.ndarray, foreign_buy: np.ndarray,
+                  sector_of: np.ndarray, sector_prices: np.ndarray, row_of: np.ndarray = None):
+    """샘플 데이터의 종목/섹터 스코어 이력 (generate_sample_data와 같은 배점, 외국인 점수는 기간 내 고정)
+
+    row_of를 주면 close/volume/foreign_buy는 고유 종목 행이고 종목 행 i는 그 행 row_of[i]를 쓴다.
+    """
+    ratio = volume_ratio_history(volume)
+    stock = daily_scores(close, volume_points(ratio), np.where(foreign_buy > 0, 10, 0)[:, None])
+    if row_of is not None:
+        stock, ratio, foreign_buy = stock[row_of], ratio[row_of], foreign_buy[row_of]
+
+    n_sectors = len(sector_prices)
+    counts = np.bincount(sector_of, minlength=n_sectors)[:, None]
+    sector_ratio = np.zeros((n_sectors, ratio.shape[1]))
+    np.add.at(sector_ratio, sector_of, np.nan_to_num(ratio))
+    sector_foreign = np.bincount(sector_of, weights=foreign_buy, minlength=n_sectors) / counts[:, 0]
+    sector = daily_scores(sector_prices, volume_points(sector_ratio / counts),
+                          np.where(sector_foreign > 0, 10, 0)[:, None])
+    return stock, sector
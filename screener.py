@@ -0,0 +1,159 @@
+"""
+종목 스크리너
+stocks 테이블을 열별 numpy 배열과 정렬 색인으로 한 번 바꿔 두고,
+'rsi > 50 & from_low > 15' 같은 복합 조건을 가장 좁은 범위 조건부터 좁혀 가며 평가해 상위 k개를 반환
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_QUERY = 'rsi > 50 & from_low > 15 & ma20_vs_ma60 > 0'
+DEFAULT_TOP_K = 20
+
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+_CLAUSE = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(>=|<=|==|!=|>|<)\s*(.+?)\s*$')
+
+
+def parse_query(query: str) -> list:
+    """조건식 -> [[(컬럼, 연산자, 값), ...], ...] ('|'로 나뉜 묶음의 OR, 묶음 안은 '&'의 AND)
+
+    빈 조건식은 전체 종목 (조건 없는 묶음 하나).
+    """
+    groups = []
+    for group in (query or '').split('|'):
+        clauses = []
+        for text in group.split('&'):
+            if not text.strip():
+                continue
+            match = _CLAUSE.match(text)
+            if match is None:
+                raise ValueError(f"조건을 읽을 수 없습니다: '{text.strip()}' (예: rsi > 50 & from_low > 15)")
+            column, op, value = match.groups()
+            clauses.append((column, op, value.strip('\'"')))
+        groups.append(clauses)
+    return groups or [[]]
+
+
+class ScreenerIndex:
+    """stocks 테이블의 열별 배열과 숫자 열의 정렬 색인 (스냅샷마다 한 번 만듦)"""
+
+    def __init__(self, stocks: pd.DataFrame):
+        self.frame = stocks.reset_index(drop=True)
+        self.numeric = {}
+        self.text = {}
+        for column in self.frame.columns:
+            values = self.frame[column]
+            if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+                self.numeric[column] = values.to_numpy(dtype=float)
+            else:
+                self.text[column] = values.astype(str).to_numpy()
+        # 숫자 열 정렬 색인 (NaN은 끝으로)
+        self.order = {column: np.argsort(values, kind='stable') for column, values in self.numeric.items()}
+        self.sorted = {column: values[self.order[column]] for column, values in self.numeric.items()}
+        self.valid = {column: int((~np.isnan(values)).sum()) for column, values in self.numeric.items()}
+
+    @classmethod
+    def from_markets(cls, frames: dict) -> 'ScreenerIndex':
+        """시장 -> stocks 테이블 여러 개를 'market' 열을 붙여 하나로"""
+        parts = [df.assign(market=market) for market, df in frames.items() if len(df)]
+        stocks = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        if 'market' in stocks.columns:
+            stocks = stocks[['market'] + [c for c in stocks.columns if c != 'market']]
+        return cls(stocks)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def columns(self) -> list:
+        return list(self.frame.columns)
+
+    def _value(self, column: str, value: str):
+        if column in self.numeric:
+            try:
+                return float(value)
+            except ValueError:
+                if value.lower() in ('true', 'false'):
+                    return float(value.lower() == 'true')
+                raise ValueError(f"'{column}'은 숫자 열입니다: {value}")
+        if column in self.text:
+            return value
+        raise ValueError(f"알 수 없는 열: {column} (가능: {', '.join(self.columns)})")
+
+    def _range(self, column: str, op: str, value: float):
+        """정렬 색인에서 조건을 만족하는 구간 [lo, hi) (범위로 표현할 수 없으면 None)"""
+        values = self.sorted[column][:self.valid[column]]
+        valid = len(values)
+        if op == '>':
+            return np.searchsorted(values, value, 'right'), valid
+        if op == '>=':
+            return np.searchsorted(values, value, 'left'), valid
+        if op == '<':
+            return 0, np.searchsorted(values, value, 'left')
+        if op == '<=':
+            return 0, np.searchsorted(values, value, 'right')
+        if op == '==':
+            return np.searchsorted(values, value, 'left'), np.searchsorted(values, value, 'right')
+        return None
+
+    def _match_group(self, clauses: list) -> np.ndarray:
+        parsed = [(column, op, self._value(column, value)) for column, op, value in clauses]
+
+        # 숫자 범위 조건 중 가장 좁은 것으로 후보를 먼저 자름 (이진 탐색)
+        best, best_range = None, None
+        for i, (column, op, value) in enumerate(parsed):
+            if column in self.numeric:
+                bounds = self._range(column, op, value)
+                if bounds is not None and (best_range is None or bounds[1] - bounds[0] < best_range[1] - best_range[0]):
+                    best, best_range = i, bounds
+        if best is None:
+            rows = np.arange(len(self.frame))
+        else:
+            column = parsed[best][0]
+            rows = np.sort(self.order[column][best_range[0]:best_range[1]])
+
+        # 나머지 조건은 후보 행에서만 평가
+        for i, (column, op, value) in enumerate(parsed):
+            if i == best or len(rows) == 0:
+                continue
+            values = self.numeric[column][rows] if column in self.numeric else self.text[column][rows]
+            rows = rows[OPERATORS[op](values, value)]
+        return rows
+
+    def match(self, query: str) -> np.ndarray:
+        """조건을 만족하는 행 위치 (오름차순)"""
+        groups = parse_query(query)
+        if len(groups) == 1:
+            return self._match_group(groups[0])
+        return np.unique(np.concatenate([self._match_group(clauses) for clauses in groups]))
+
+    def top(self, query: str, by: str = 'turnaround_score', k: int = DEFAULT_TOP_K,
+            ascending: bool = False) -> pd.DataFrame:
+        """조건을 만족하는 종목 중 by 기준 상위 k개 (argpartition 후 k개만 정렬)"""
+        rows = self.match(query)
+        if by in self.numeric:
+            values = self.numeric[by][rows]
+            # NaN은 항상 뒤로
+            keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+            if k < len(rows):
+                part = np.argpartition(keys, k - 1)[:k]
+                rows, keys = rows[part], keys[part]
+            # 같은 값은 원래 행 순서대로
+            rows = rows[np.lexsort((rows, keys))]
+        elif by in self.text:
+            order = np.argsort(self.text[by][rows], kind='stable')
+            rows = rows[order if ascending else order[::-1]]
+        else:
+            raise ValueError(f"알 수 없는 열: {by} (가능: {', '.join(self.columns)})")
+        return self.frame.iloc[rows[:k]]
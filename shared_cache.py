@@ -0,0 +1,154 @@
+"""
+프로세스 간 공유 캐시
+여러 Streamlit 서버 프로세스가 같은 SQLite 파일을 통해 계산 결과를 나눠 씀 (한 프로세스만 계산, 나머지는 읽기)
+"""
+
+import os
+import time
+import uuid
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from price_store import DEFAULT_STORE_DIR
+
+
+CACHE_VERSION = 5                      # 저장 형식이 바뀌면 올림 (이전 버전 항목은 무시되고 밀려남)
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_STORE_DIR, 'cache.sqlite')
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2    # 캐시 전체 크기 상한
+LOCK_TTL = 60                          # 계산 중 표시가 유효한 시간 (초, 프로세스가 죽어도 풀리도록)
+HEARTBEAT = LOCK_TTL / 3               # 계산하는 동안 표시의 만료 시각을 연장하는 주기 (초)
+POLL = 0.2
+
+
+class SharedCache:
+    """버전이 붙은 키 -> pickle 값 SQLite 캐시 (크기 초과 시 오래 안 쓴 항목부터 제거)"""
+
+    def __init__(self, path: str = None, max_bytes: int = DEFAULT_MAX_BYTES, version: int = CACHE_VERSION):
+        self.path = path or DEFAULT_CACHE_PATH
+        self.max_bytes = max_bytes
+        self.version = version
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, version INTEGER, created REAL, accessed REAL, size INTEGER, value BLOB)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _key(self, namespace: str, key) -> str:
+        return f"v{self.version}:{namespace}:{key}"
+
+    def get(self, namespace: str, key, fresh_since: float = None):
+        """저장된 값 (없거나 버전이 다르거나 fresh_since 이전에 만들어졌으면 None)"""
+        full_key = self._key(namespace, key)
+        with self._connect() as conn:
+            row = conn.execute("SELECT version, created, value FROM entries WHERE key = ?", (full_key,)).fetchone()
+            if row is None or row[0] != self.version or (fresh_since is not None and row[1] < fresh_since):
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), full_key))
+        return pickle.loads(row[2])
+
+    def set(self, namespace: str, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                         (self._key(namespace, key), self.version, now, now, len(blob), blob))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """크기 상한을 넘으면 다른 버전 항목, 오래 안 쓴 항목 순으로 제거"""
+        conn.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total - removed <= self.max_bytes:
+                break
+            victims.append((key,))
+            removed += size
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def _try_lock(self, full_key: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO locks VALUES (?, ?, ?)", (full_key, self.owner, now + LOCK_TTL))
+            if cur.rowcount == 1:
+                return True
+            # 만료된 표시는 가져옴 (계산하던 프로세스가 죽은 경우)
+            cur = conn.execute("UPDATE locks SET owner = ?, expires = ? WHERE key = ? AND expires < ?",
+                               (self.owner, now + LOCK_TTL, full_key, now))
+            return cur.rowcount == 1
+
+    def _unlock(self, full_key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM locks WHERE key = ? AND owner = ?", (full_key, self.owner))
+
+    @contextmanager
+    def _hold(self, full_key: str):
+        """잠금을 가진 동안 HEARTBEAT마다 만료 시각을 연장하고 끝나면 풂 (계산이 LOCK_TTL보다 길어도 다른 프로세스가 가져가지 않음)"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(HEARTBEAT):
+                try:
+                    with self._connect() as conn:
+                        conn.execute("UPDATE locks SET expires = ? WHERE key = ? AND owner = ?",
+                                     (time.time() + LOCK_TTL, full_key, self.owner))
+                except sqlite3.Error:
+                    pass    # 다음 주기에 다시 연장
+
+        thread = threading.Thread(target=beat, name='shared-cache-lock', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            self._unlock(full_key)
+
+    def get_or_compute(self, namespace: str, key, compute, fresh_since: float = None):
+        """fresh_since 이후 값이 있으면 읽고, 없으면 한 프로세스만 compute()를 실행해 저장
+
+        다른 프로세스가 계산 중이면 결과가 저장되거나 그 프로세스가 잠금을 풀 때까지 기다린다
+        (계산하던 프로세스가 죽으면 연장이 멈춰 LOCK_TTL 뒤 잠금을 가져옴). compute가 실패하면 예외를 그대로 던진다.
+        """
+        value = self.get(namespace, key, fresh_since)
+        if value is not None:
+            return value
+
+        full_key = self._key(namespace, key)
+        while not self._try_lock(full_key):
+            time.sleep(POLL)
+            value = self.get(namespace, key, fresh_since)
+            if value is not None:
+                return value
+
+        with self._hold(full_key):
+            # 잠금을 얻는 사이에 다른 프로세스가 저장했을 수 있음
+            value = self.get(namespace, key, fresh_since)
+            if value is None:
+                value = compute()
+                self.set(namespace, key, value)
+            return value
+
+    def reader(self, read_fn, namespace: str = 'history', max_age: float = 600):
+        """fdr.DataReader와 같은 시그니처로, 같은 (종목, 기간) 요청을 프로세스 간에 한 번만 보내는 함수"""
+        def shared_read(code, start_date, end_date):
+            key = f"{code}:{str(start_date)[:10]}:{str(end_date)[:10]}"
+            return self.get_or_compute(namespace, key, lambda: read_fn(code, start_date, end_date),
+                                       fresh_since=time.time() - max_age)
+        return shared_read
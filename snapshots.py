@@ -0,0 +1,142 @@
+"""
+시장 스냅샷 백그라운드 갱신
+정해진 주기 또는 장 마감 직후에 스냅샷을 다시 만들어 통째로 교체 (페이지는 항상 마지막 정상 스냅샷을 즉시 사용)
+"""
+
+import time
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+DEFAULT_INTERVAL = 3600   # 정기 갱신 주기 (초)
+CLOSE_GRACE = 600         # 장 마감 후 데이터 반영까지 기다리는 시간 (초)
+TICK = 30                 # 갱신 필요 여부 확인 주기 (초)
+
+# 시장별 정규장 마감 시각
+MARKET_CLOSE = {
+    'KOSPI': ('Asia/Seoul', 15, 30),
+    'KOSDAQ': ('Asia/Seoul', 15, 30),
+    'US': ('America/New_York', 16, 0),
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """한 시점의 시장 데이터 (data가 None이면 아직 한 번도 만들지 못한 상태)"""
+    data: dict = None
+    built_at: float = None       # 마지막 정상 스냅샷 생성 시각 (epoch)
+    error: str = None            # 마지막 갱신 실패 사유 (성공하면 None)
+    failed_at: float = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.built_at if self.built_at else float('inf')
+
+
+def last_close_before(market: str, ts: float) -> float:
+    """ts 이전 마지막 장 마감 시각 + 반영 대기 (epoch, 주말 제외)"""
+    tz_name, hour, minute = MARKET_CLOSE.get(market, MARKET_CLOSE['KOSPI'])
+    local = datetime.fromtimestamp(ts, ZoneInfo(tz_name))
+    close = local.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(seconds=CLOSE_GRACE)
+    while close > local or close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close.timestamp()
+
+
+def current_slot(market: str, ts: float = None, interval: float = DEFAULT_INTERVAL) -> float:
+    """ts가 속한 갱신 구간의 시작 시각
+
+    정기 갱신을 벽시계 기준(정각 등)으로 맞춰 두어 여러 프로세스가 같은 구간의 결과를 공유할 수 있게 한다.
+    """
+    ts = time.time() if ts is None else ts
+    return max(ts // interval * interval, last_close_before(market, ts))
+
+
+def next_close_after(market: str, ts: float) -> float:
+    """ts 이후 첫 장 마감 시각 + 반영 대기 (epoch, 주말 제외)"""
+    tz_name, hour, minute = MARKET_CLOSE.get(market, MARKET_CLOSE['KOSPI'])
+    tz = ZoneInfo(tz_name)
+    local = datetime.fromtimestamp(ts, tz)
+    close = local.replace(hour=hour, minute=minute, second=0, microsecond=0) + timedelta(seconds=CLOSE_GRACE)
+    while close <= local or close.weekday() >= 5:
+        close += timedelta(days=1)
+    return close.timestamp()
+
+
+class SnapshotRefresher:
+    """(시장, 실제 데이터 여부) 키별 스냅샷을 백그라운드에서 갱신
+
+    build_fn(market, use_real_data)은 실패 시 예외를 던져야 하며, 그때는 이전 스냅샷을 유지한다.
+    """
+
+    def __init__(self, build_fn, interval: float = DEFAULT_INTERVAL, tick: float = TICK):
+        self.build_fn = build_fn
+        self.interval = interval
+        self.tick = tick
+        self._snapshots = {}
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, key) -> Snapshot:
+        """마지막 스냅샷 즉시 반환 (처음 요청된 키만 한 번 직접 만듦)"""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return self.refresh(key)
+        return snapshot
+
+    def due_at(self, key) -> float:
+        """다음 갱신 시각 (다음 정기 구간과 장 마감 중 빠른 쪽, 실패 후에는 1분 뒤 재시도)"""
+        snapshot = self._snapshots.get(key, Snapshot())
+        if snapshot.error is not None:
+            return snapshot.failed_at + max(self.tick, 60)
+        if snapshot.built_at is None:
+            return 0.0
+        market = key[0] if isinstance(key, tuple) else key
+        next_slot = (snapshot.built_at // self.interval + 1) * self.interval
+        return min(next_slot, next_close_after(market, snapshot.built_at))
+
+    def refresh(self, key) -> Snapshot:
+        """스냅샷을 새로 만들어 교체 (같은 키를 이미 만드는 중이면 그 결과를 기다림)"""
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+            requested_at = time.time()
+
+        with build_lock:
+            current = self._snapshots.get(key, Snapshot())
+            # 기다리는 동안 다른 스레드가 이미 만들었으면 그대로 사용
+            if (current.built_at or 0) >= requested_at or (current.failed_at or 0) >= requested_at:
+                return current
+
+            args = key if isinstance(key, tuple) else (key,)
+            try:
+                data = self.build_fn(*args)
+                snapshot = Snapshot(data=data, built_at=time.time())
+            except Exception as e:
+                snapshot = Snapshot(data=current.data, built_at=current.built_at,
+                                    error=str(e) or type(e).__name__, failed_at=time.time())
+
+            with self._lock:
+                self._snapshots[key] = snapshot
+            return snapshot
+
+    def start(self):
+        """백그라운드 갱신 스레드 시작 (이미 돌고 있으면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='snapshot-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            now = time.time()
+            for key in list(self._snapshots):
+                if self.due_at(key) <= now:
+                    self.refresh(key)
@@ -0,0 +1,163 @@
+"""
+서버 시작
+`python startup.py`로 Streamlit 서버를 띄우면서 KOSPI/KOSDAQ/US 스냅샷을 백그라운드에서 미리 만들고,
+모듈 가져오기 시간과 첫 화면까지 걸린 시간을 구조화된 로그(JSON 한 줄)로 남김
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import threading
+from functools import lru_cache
+
+from snapshots import MARKET_CLOSE, SnapshotRefresher, current_slot
+from metrics import logger, setup_logging
+
+
+STARTED = time.time()         # 이 모듈을 처음 가져온 시각 (startup.py로 띄우면 서버 프로세스 시작과 같음)
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+PREWARM_MARKETS = tuple(MARKET_CLOSE)
+
+_lock = threading.Lock()
+_imports = {}                 # 모듈 -> 처음 가져오는 데 걸린 시간 (초)
+_prewarm = {}                 # '시장:실제 데이터 여부' -> 미리 만들기 결과
+_requested = set()            # 미리 만들기를 이미 요청한 키
+_first_render = {}
+_mode = {'launcher': False}
+
+
+def record_import(name: str, seconds: float):
+    """모듈을 처음 가져오는 데 걸린 시간 기록 (같은 이름은 처음 값만 유지)"""
+    with _lock:
+        _imports.setdefault(name, round(seconds, 4))
+
+
+def lazy_import(name: str):
+    """name 모듈을 처음 쓸 때 가져옴 (plotly.express처럼 무거운 모듈을 첫 화면 뒤로 미룸)"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        record_import(name, time.perf_counter() - start)
+    return module
+
+
+# ============ 프로세스 공용 스냅샷 ============
+
+@lru_cache(maxsize=None)
+def get_shared_cache():
+    from shared_cache import SharedCache
+
+    return SharedCache()
+
+
+def build_shared_snapshot(market: str, use_real_data: bool = False):
+    """현재 갱신 구간의 스냅샷 (배치 출력 -> 프로세스 간 공유 캐시 순으로 찾고, 없으면 이 프로세스가 만들어 저장)"""
+    # pandas/pyarrow를 끌어오는 모듈은 서버가 뜬 뒤 백그라운드 스레드에서 가져옴
+    from pipeline import load_market_data, default_reader, read_output
+
+    fresh_since = current_slot(market)
+    data = read_output(market, use_real_data, fresh_since=fresh_since)
+    if data is not None:
+        return data
+
+    def build():
+        read_fn = get_shared_cache().reader(default_reader()) if use_real_data else None
+        return load_market_data(market, use_real_data, read_fn=read_fn)
+
+    return get_shared_cache().get_or_compute('market', f"{market}:{int(use_real_data)}", build,
+                                             fresh_since=fresh_since)
+
+
+@lru_cache(maxsize=None)
+def get_refresher() -> SnapshotRefresher:
+    """프로세스 공용 스냅샷 갱신기 (한 번 만들고 백그라운드 갱신 시작)"""
+    return SnapshotRefresher(build_shared_snapshot).start()
+
+
+def prewarm(keys) -> threading.Thread:
+    """(시장, 실제 데이터 여부) 스냅샷을 백그라운드에서 차례로 만들어 둠 (이미 요청한 키는 건너뜀)
+
+    화면 요청과 겹치면 갱신기가 같은 키를 한 번만 만들고 양쪽이 그 결과를 쓴다.
+    """
+    with _lock:
+        keys = [key for key in keys if key not in _requested]
+        _requested.update(keys)
+    if not keys:
+        return None
+
+    def run():
+        for market, use_real_data in keys:
+            start = time.perf_counter()
+            snapshot = get_refresher().get((market, use_real_data))
+            result = {'seconds': round(time.perf_counter() - start, 3), 'since_start': round(time.time() - STARTED, 3),
+                      'ok': snapshot.data is not None}
+            with _lock:
+                _prewarm[f"{market}:{int(use_real_data)}"] = result
+            logger.info(json.dumps({'event': 'prewarm', 'market': market, 'real': use_real_data, **result,
+                                    'error': snapshot.error}, ensure_ascii=False))
+
+    thread = threading.Thread(target=run, name='snapshot-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+# ============ 시작 지표 ============
+
+def startup_report() -> dict:
+    """가져오기 시간, 미리 만들기 결과, 첫 화면 시간 (pickle/JSON 가능)"""
+    with _lock:
+        return {
+            'started': STARTED,
+            'launcher': _mode['launcher'],
+            'imports': dict(_imports),
+            'prewarm': dict(_prewarm),
+            'first_render': dict(_first_render),
+        }
+
+
+def record_first_render(render: dict, **fields) -> dict:
+    """프로세스의 첫 화면을 그린 뒤 한 번만 시작 지표를 로그로 남김
+
+    since_start는 서버 시작(startup.py로 띄우지 않았으면 첫 요청)부터 첫 화면 완료까지의 시간이다.
+    """
+    with _lock:
+        if _first_render:
+            first = False
+        else:
+            first = True
+            _first_render.update(since_start=round(time.time() - STARTED, 3), render=render['total'])
+    report = startup_report()
+    if first:
+        logger.info(json.dumps({'event': 'startup', **fields, **report}, ensure_ascii=False, default=str))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="스냅샷을 미리 만들면서 Streamlit 서버 시작",
+                                     epilog="나머지 인자는 streamlit run에 그대로 넘김 (예: --server.port 8502)")
+    parser.add_argument('--markets', nargs='+', default=list(PREWARM_MARKETS), help="미리 만들 시장")
+    parser.add_argument('--real', action='store_true', help="실제 데이터 스냅샷도 미리 만듦")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    setup_logging()
+    _mode['launcher'] = True
+    keys = [(market, False) for market in args.markets]
+    if args.real:
+        keys += [(market, True) for market in args.markets]
+    prewarm(keys)
+
+    # 같은 프로세스에서 서버를 띄워야 app.py가 미리 만든 스냅샷(갱신기)을 그대로 씀
+    from streamlit.web import cli
+
+    sys.argv = ['streamlit', 'run', APP_PATH, *streamlit_args]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    # app.py가 가져오는 startup 모듈과 상태(갱신기, 지표)를 함께 쓰도록 모듈로 가져와 실행
+    import startup
+    startup.main()
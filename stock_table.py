@@ -0,0 +1,74 @@
+"""
+종목 테이블 조회
+섹터별 행 위치를 한 번만 색인해 두고, 필터/정렬은 해당 섹터 행의 numpy 열로, 표시용 DataFrame은 현재 페이지만 만듦
+"""
+
+import numpy as np
+import pandas as pd
+
+
+PAGE_SIZE = 50
+
+# 스코어 구간 (하한, 표시) - 높은 구간부터
+SCORE_BANDS = ((70, '🟢 강함'), (50, '🟡 보통'), (0, '🔴 약함'))
+
+# 원본 컬럼 -> 표시 이름
+DISPLAY_COLUMNS = {
+    'stock': '종목명',
+    'turnaround_score': '스코어',
+    'from_low': '저점대비(%)',
+    'ma20_vs_ma60': 'MA크로스(%)',
+    'rsi': 'RSI',
+    'volume_ratio': '거래량(%)',
+}
+
+
+def sector_rows(stocks: pd.DataFrame) -> dict:
+    """섹터 -> 행 위치 배열 (스냅샷마다 한 번만 만듦)"""
+    if len(stocks) == 0:
+        return {}
+    return {sector: np.asarray(rows) for sector, rows in stocks.groupby('sector', sort=False).indices.items()}
+
+
+def score_band(scores) -> np.ndarray:
+    """스코어 구간 표시 열 (행별 함수 호출 없이 한 번에)"""
+    scores = np.asarray(scores)
+    return np.select([scores >= low for low, _ in SCORE_BANDS[:-1]],
+                     [label for _, label in SCORE_BANDS[:-1]], default=SCORE_BANDS[-1][1])
+
+
+def query_stocks(stocks: pd.DataFrame, rows: np.ndarray, search: str = '', min_score: float = 0,
+                 only_turnaround: bool = False, sort_by: str = 'turnaround_score',
+                 ascending: bool = False) -> np.ndarray:
+    """조건에 맞는 행 위치를 정렬해 반환 (rows = 한 섹터의 행 위치)"""
+    keep = np.ones(len(rows), dtype=bool)
+    if min_score:
+        keep &= stocks['turnaround_score'].to_numpy()[rows] >= min_score
+    if only_turnaround:
+        keep &= stocks['is_turnaround'].to_numpy()[rows]
+    if search:
+        names = stocks['stock'].to_numpy()[rows]
+        keep &= pd.Series(names).str.contains(search, case=False, regex=False).to_numpy()
+    rows = rows[keep]
+
+    values = stocks[sort_by].to_numpy()[rows]
+    if values.dtype.kind in 'iuf':
+        # 숫자 열은 부호를 바꿔 내림차순에서도 같은 값의 원래 순서를 유지
+        order = np.argsort(values if ascending else -values, kind='stable')
+    else:
+        order = np.argsort(values.astype(str), kind='stable')
+        if not ascending:
+            order = order[::-1]
+    return rows[order]
+
+
+def stock_page(stocks: pd.DataFrame, rows: np.ndarray, page: int = 1, page_size: int = PAGE_SIZE) -> pd.DataFrame:
+    """page번째(1부터) 페이지의 표시용 테이블 (구간 열 포함)"""
+    start = (page - 1) * page_size
+    table = stocks.iloc[rows[start:start + page_size]][list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
+    table.insert(1, '구간', score_band(table['스코어']))
+    return table.reset_index(drop=True)
+
+
+def page_count(n_rows: int, page_size: int = PAGE_SIZE) -> int:
+    return max(1, -(-n_rows // page_size))
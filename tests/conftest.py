@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 최상위의 평면 모듈(pipeline, intraday 등)을 그대로 가져오도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
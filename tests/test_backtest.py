@@ -0,0 +1,14 @@
+import numpy as np
+
+from synthetic import generate_market
+from backtest import LOW_WINDOW, score_components, score_panel
+from indicators import compute_indicators, turnaround_score
+
+
+def test_last_day_matches_dashboard_score():
+    # 기본 테이블은 조회 구간(LOW_WINDOW 거래일) 가격만으로 계산하므로 같은 구간을 잘라 비교
+    close = generate_market(n_tickers=200, n_days=400)['close'].astype(float)
+    backtest = score_panel(score_components(close))[:, -1]
+    ind = compute_indicators(close[:, -LOW_WINDOW:])
+    dashboard = np.minimum(turnaround_score(ind['from_low'], ind['ma20_vs_ma60'], ind['rsi'], volume_pts=15.0), 100)
+    np.testing.assert_allclose(backtest, dashboard, atol=1e-3)
@@ -0,0 +1,41 @@
+import time
+
+import pandas as pd
+
+from fetcher import BatchReader, FetchTimeout, fetch_histories
+
+
+def frame(start_date, end_date):
+    index = pd.bdate_range(start_date, end_date)
+    return pd.DataFrame({'Close': range(1, len(index) + 1)}, index=index, dtype=float)
+
+
+def test_slow_batch_prefetch_does_not_time_out_waiting_tickers():
+    codes = [f"T{i}" for i in range(12)]
+
+    def slow_batch(chunk, start_date, end_date):
+        time.sleep(0.6)
+        return {code: frame(start_date, end_date) for code in chunk}
+
+    def single(code, start_date, end_date):
+        raise AssertionError(f"{code}: 묶음 결과가 있으면 개별 호출하지 않음")
+
+    start, end = pd.Timestamp('2024-01-01'), pd.Timestamp('2024-03-31')
+    batch = BatchReader(slow_batch, single, codes, start, end, batch_size=5)
+    results = list(fetch_histories(batch, codes, start, end, max_workers=4, ticker_timeout=0.3, deadline=30))
+
+    assert [code for code, _, error in results if error is not None] == []
+    assert sorted(code for code, _, _ in results) == sorted(codes)
+    assert batch.batch_calls == 3
+
+
+def test_slow_ticker_still_times_out():
+    def read(code, start_date, end_date):
+        if code == 'SLOW':
+            time.sleep(1.0)
+        return frame(start_date, end_date)
+
+    results = {code: error for code, _, error in
+               fetch_histories(read, ['A', 'SLOW', 'B'], '2024-01-01', '2024-01-31', ticker_timeout=0.2)}
+    assert isinstance(results['SLOW'], FetchTimeout)
+    assert results['A'] is None and results['B'] is None
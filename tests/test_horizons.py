@@ -0,0 +1,16 @@
+import numpy as np
+
+from pipeline import generate_sample_data
+from horizons import select_view
+
+
+def test_view_score_trend_ends_at_table_score():
+    data = generate_sample_data('KOSPI', history_days=2520)
+    assert data['views']
+    for (horizon, bar), view in data['views'].items():
+        selected = select_view(data, horizon, bar)
+        scores = selected['sector_scores']
+        assert scores.labels == list(selected['sectors']['sector'])
+        assert scores.dates.equals(selected['sector_panel'].dates)
+        last = np.clip(np.rint(scores.values[:, -1]), 0, 100)
+        np.testing.assert_array_equal(last, selected['sectors']['turnaround_score'].to_numpy())
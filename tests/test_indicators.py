@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import LOOKBACK_BARS, MA_LONG, IndicatorState, compute_indicators, sync_state
+
+
+@pytest.fixture(scope='module')
+def history():
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range('2020-01-01', periods=400)
+    prices = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return dates, np.round(prices, 0)
+
+
+def assert_matches(state, prices):
+    expected = compute_indicators(np.asarray(prices, dtype=float)[None, :])
+    snapshot = state.snapshot()
+    for name, values in expected.items():
+        assert snapshot[name] == pytest.approx(values[0], rel=1e-9, abs=1e-9), name
+
+
+def test_from_history_matches_batch(history):
+    dates, prices = history
+    state = IndicatorState.from_history(dates, prices)
+    state.trim(dates[-LOOKBACK_BARS])
+    assert_matches(state, prices[-LOOKBACK_BARS:])
+
+
+def test_sync_state_matches_batch_on_each_new_bar(history):
+    dates, prices = history
+    state = None
+    # 조회 구간을 하루씩 밀며 새 봉만 반영해도 같은 구간 배치 계산과 같아야 함
+    for end in range(LOOKBACK_BARS, len(dates) + 1):
+        start = end - LOOKBACK_BARS
+        state = sync_state(state, dates[start:end], prices[start:end], dates[start])
+        assert_matches(state, prices[start:end])
+    assert len(state.bars) == LOOKBACK_BARS
+
+
+def test_replacing_last_bar_matches_batch(history):
+    dates, prices = history
+    window = prices[-LOOKBACK_BARS:].copy()
+    state = IndicatorState.from_history(dates[-LOOKBACK_BARS:], window)
+    # 장중 같은 날짜 봉 수정 (새 저점을 만들었다가 되돌림)
+    for price in (window.min() * 0.9, window[-2] * 1.05, window[-1]):
+        state.update(dates[-1], price)
+        window[-1] = price
+        assert_matches(state, window)
+
+
+def test_long_stream_with_max_bars_matches_batch(history):
+    dates, prices = history
+    dates = pd.bdate_range(dates[0], periods=len(dates) * 4)
+    prices = np.tile(prices, 4)
+    state = IndicatorState(max_bars=MA_LONG + 1)
+    for date, price in zip(dates, prices):
+        state.update(date, price)
+    assert state._updates > IndicatorState.RESUM_EVERY
+    assert_matches(state, prices[-(MA_LONG + 1):])
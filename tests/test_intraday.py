@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import generate_sample_data
+from intraday import FileReplayFeed, IntradaySession, ensure_replay, make_replay, replay_matches
+
+
+@pytest.fixture(scope='module')
+def data():
+    return generate_sample_data('KOSPI')
+
+
+def test_replay_with_other_labels_is_rebuilt(data, tmp_path):
+    # 측정용 합성 종목(KOSPI-xx-xxxx)으로 만든 파일은 대시보드 스냅샷과 맞지 않음
+    path = str(tmp_path / 'KOSPI-sample.parquet')
+    make_replay(generate_sample_data('KOSPI', n_tickers=60, n_sectors=6), path, 'KOSPI')
+    assert not replay_matches(path, data)
+
+    assert ensure_replay(data, path, 'KOSPI')
+    assert replay_matches(path, data)
+    assert not ensure_replay(data, path, 'KOSPI')
+
+    session = IntradaySession(data)
+    changes = session.apply(FileReplayFeed(path, speed=None).poll())
+    assert len(changes['stocks']) == len(data['stocks'])
+    assert session.bars_matched == session.bars_applied > 0
+
+
+def test_replay_not_after_snapshot_is_stale(data, tmp_path):
+    path = str(tmp_path / 'KOSPI-sample.parquet')
+    make_replay(data, path, 'KOSPI', date=data['panel'].dates[-1])
+    assert not replay_matches(path, data)
+    assert ensure_replay(data, path, 'KOSPI')
+    assert replay_matches(path, data)
+
+
+def test_unmatched_bars_are_counted(data):
+    session = IntradaySession(data)
+    day = data['panel'].dates[-1] + pd.offsets.BDay(1)
+    bars = pd.DataFrame({'time': [day + pd.Timedelta(hours=9, minutes=1)], 'label': ['KOSPI-01-0001'],
+                         'close': [100.0], 'volume': [1]})
+    changes = session.apply(bars)
+    assert len(changes['stocks']) == 0
+    assert session.bars_applied == 1 and session.bars_matched == 0
+    assert np.array_equal(session.live['turnaround_score'], session.initial['turnaround_score'])
@@ -0,0 +1,41 @@
+import threading
+import time
+
+import shared_cache
+from shared_cache import SharedCache
+
+
+def test_long_compute_keeps_lock_past_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, 'LOCK_TTL', 0.3)
+    monkeypatch.setattr(shared_cache, 'HEARTBEAT', 0.1)
+    path = str(tmp_path / 'cache.sqlite')
+    first, second = SharedCache(path), SharedCache(path)    # 서로 다른 프로세스처럼 owner가 다름
+    calls, results = [], {}
+
+    def slow_build():
+        calls.append('first')
+        time.sleep(1.0)
+        return 'snapshot'
+
+    def build_again():
+        calls.append('second')
+        return 'other'
+
+    worker = threading.Thread(target=lambda: results.update(first=first.get_or_compute('market', 'KOSPI', slow_build)))
+    worker.start()
+    time.sleep(0.1)
+    # 계산이 LOCK_TTL의 3배 넘게 걸려도 두 번째 프로세스는 기다렸다가 결과를 읽음
+    results['second'] = second.get_or_compute('market', 'KOSPI', build_again)
+    worker.join()
+
+    assert calls == ['first']
+    assert results == {'first': 'snapshot', 'second': 'snapshot'}
+
+
+def test_lock_of_dead_owner_expires(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_cache, 'LOCK_TTL', 0.2)
+    path = str(tmp_path / 'cache.sqlite')
+    dead, alive = SharedCache(path), SharedCache(path)
+    assert dead._try_lock(alive._key('market', 'KOSPI'))    # 잠금만 잡고 죽은 프로세스
+
+    assert alive.get_or_compute('market', 'KOSPI', lambda: 'rebuilt') == 'rebuilt'
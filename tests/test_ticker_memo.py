@@ -0,0 +1,56 @@
+import threading
+
+import pandas as pd
+
+from ticker_memo import TickerMemo
+
+
+def counting_reader(calls):
+    def read(code, start_date, end_date):
+        calls.append((code, start_date, end_date))
+        index = pd.date_range(start_date, end_date, freq='D')
+        return pd.DataFrame({'Close': range(len(index))}, index=index, dtype=float)
+    return read
+
+
+def test_reader_refetches_later_end_date():
+    calls = []
+    read = TickerMemo().reader(counting_reader(calls))
+
+    df = read('005930', '2024-01-01', '2024-03-31')
+    assert df.index[-1] == pd.Timestamp('2024-03-31')
+
+    # 받은 구간 안의 요청은 메모에서 잘라 줌
+    inner = read('005930', '2024-02-01', '2024-02-29')
+    assert (inner.index[0], inner.index[-1]) == (pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-29'))
+    assert len(calls) == 1
+
+    # 받은 구간보다 늦은 종료일은 다시 받음
+    later = read('005930', '2024-01-01', '2024-04-30')
+    assert later.index[-1] == pd.Timestamp('2024-04-30')
+    assert len(calls) == 2
+
+
+def test_key_locks_do_not_accumulate():
+    memo = TickerMemo()
+    for code in range(1000):
+        memo.get_or_compute('indicators', code, lambda: code)
+    assert len(memo) == 1000
+    assert memo._key_locks == {}
+
+    # 같은 키를 동시에 요청하면 한 번만 계산하고, 끝나면 잠금도 지움
+    started, calls = threading.Event(), []
+
+    def compute():
+        calls.append(1)
+        started.wait(1)
+        return 'value'
+
+    threads = [threading.Thread(target=memo.get_or_compute, args=('indicators', 'same', compute)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert memo._key_locks == {}
@@ -0,0 +1,165 @@
+"""
+종목 단위 메모
+시세 이력을 종목 하나 단위로 프로세스 메모리에 기억해, 시장을 바꾸거나 실제 데이터를 껐다 켜도
+같은 종목은 갱신 구간마다 한 번만 받음 (크기 상한 + 나이 기준 LRU 제거, 같은 종목 동시 요청은 한 번만 실행)
+"""
+
+import sys
+import time
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2    # 메모 전체 크기 상한
+DEFAULT_MAX_AGE = 2 * 3600             # 만든 지 이만큼 지난 항목은 쓰지 않고 제거 (초, 정기 갱신 주기의 2배)
+
+
+def sizeof(value) -> int:
+    """값이 차지하는 대략적인 메모리 (바이트, 표/배열은 버퍼 크기, dict/tuple은 항목 합)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class TickerMemo:
+    """(이름공간, 종목 키) -> 값 메모
+
+    크기 상한을 넘으면 오래 안 쓴 항목부터, 만든 지 max_age가 지난 항목은 순서와 상관없이 제거한다.
+    stats에 적중/부재/제거 횟수를 누적한다.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats = Counter()
+        self._entries = OrderedDict()    # 키 -> (값, 크기), 오래 안 쓴 순
+        self._created = OrderedDict()    # 키 -> 만든 시각, 오래 만든 순
+        self._bytes = 0
+        self._key_locks = {}             # 키 -> [잠금, 쓰는 스레드 수] (받거나 계산 중인 키만)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, namespace: str, key, fresh_since: float = None):
+        """저장된 값 (없거나 fresh_since 이전에 만들어졌으면 None)"""
+        full_key = (namespace, key)
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(full_key)
+            if entry is None or (fresh_since is not None and self._created[full_key] < fresh_since):
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def set(self, namespace: str, key, value, size: int = None):
+        size = sizeof(value) if size is None else size
+        full_key = (namespace, key)
+        with self._lock:
+            if full_key in self._entries:
+                self._remove(full_key)
+            self._entries[full_key] = (value, size)
+            self._created[full_key] = time.time()
+            self._bytes += size
+            self._expire()
+            # 크기 상한을 넘으면 오래 안 쓴 항목부터 (방금 넣은 항목 하나는 남김)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.stats['evicted'] += 1
+
+    def _remove(self, full_key):
+        self._bytes -= self._entries.pop(full_key)[1]
+        del self._created[full_key]
+
+    def _expire(self):
+        """만든 지 max_age가 지난 항목 제거 (만든 순서로 앞에서부터)"""
+        cutoff = time.time() - self.max_age
+        while self._created and next(iter(self._created.values())) < cutoff:
+            self._remove(next(iter(self._created)))
+            self.stats['expired'] += 1
+
+    @contextmanager
+    def key_lock(self, namespace: str, key):
+        """같은 종목을 동시에 받거나 계산하지 않도록 키별로 잡는 잠금 (쓰는 스레드가 없어지면 지워 종목 수만큼 쌓이지 않음)"""
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._key_locks.setdefault(full_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[full_key]
+
+    def get_or_compute(self, namespace: str, key, compute, fresh_since: float = None):
+        """fresh_since 이후 값이 있으면 쓰고, 없으면 compute()를 실행해 저장 (같은 키는 동시에 한 번만 실행)
+
+        compute가 None을 돌려주면 저장하지 않고, 실패하면 예외를 그대로 던진다.
+        """
+        value = self.get(namespace, key, fresh_since)
+        if value is not None:
+            return value
+        with self.key_lock(namespace, key):
+            # 기다리는 동안 다른 스레드가 만들었으면 그대로 사용
+            value = self.get(namespace, key, fresh_since)
+            if value is None:
+                value = compute()
+                if value is not None:
+                    self.set(namespace, key, value)
+            return value
+
+    def reader(self, read_fn, namespace: str = 'history', fresh_since: float = None):
+        """fdr.DataReader와 같은 시그니처로, 종목마다 한 번만 받고 이미 받은 구간 안의 요청은 메모에서 잘라 주는 함수
+
+        종목 키는 기간과 무관하게 종목코드 하나이며, 받은 구간(요청한 시작일~종료일)보다 앞선 시작일이나
+        늦은 종료일을 요청하면 다시 받아 교체한다.
+        """
+        def memo_read(code, start_date, end_date):
+            start = pd.Timestamp(start_date).normalize()
+            end = pd.Timestamp(end_date).normalize()
+            with self.key_lock(namespace, code):
+                entry = self.get(namespace, code, fresh_since)
+                if entry is None or entry[0] > start or entry[1] < end:
+                    df = read_fn(code, start_date, end_date)
+                    if df is None:
+                        return None
+                    entry = (start, end, df)
+                    self.set(namespace, code, entry, sizeof(df))
+            fetched_from, fetched_to, df = entry
+            if (fetched_from, fetched_to) == (start, end) or not isinstance(df.index, pd.DatetimeIndex):
+                return df
+            return df[(df.index >= start) & (df.index < end + pd.Timedelta(days=1))]
+        return memo_read
+
+    def summary(self) -> dict:
+        """항목 수, 크기(MB), 누적 적중/부재/제거 횟수"""
+        with self._lock:
+            return {'entries': len(self._entries), 'mb': round(self._bytes / 1024 ** 2, 2), **self.stats}
+
+
+@lru_cache(maxsize=None)
+def default_memo() -> TickerMemo:
+    """프로세스 공용 종목 메모 (시장/실제 데이터 여부와 무관하게 하나)"""
+    return TickerMemo()
@@ -0,0 +1,131 @@
+"""
+종목 유니버스
+로컬 상장 종목 스냅샷(CSV/Parquet)에서 섹터 -> 종목 매핑과 종목 -> 섹터 색인을 만듦
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+from price_store import DEFAULT_STORE_DIR
+
+
+UNIVERSE_DIR = os.path.join(DEFAULT_STORE_DIR, 'universe')
+
+# 스냅샷이 없을 때 쓰는 기본 종목 (섹터 -> {종목코드: 종목명})
+DEFAULT_UNIVERSE = {
+    'KOSPI': {
+        '반도체': {'005930': '삼성전자', '000660': 'SK하이닉스', '042700': '한미반도체'},
+        '자동차': {'005380': '현대차', '000270': '기아', '012330': '현대모비스'},
+        '금융': {'105560': 'KB금융', '055550': '신한지주', '086790': '하나금융'},
+        '바이오': {'207940': '삼성바이오', '068270': '셀트리온', '326030': 'SK바이오팜'},
+        '2차전지': {'373220': 'LG에너지솔루션', '006400': '삼성SDI', '096770': 'SK이노베이션'},
+        '철강': {'005490': 'POSCO홀딩스', '004020': '현대제철', '001230': '동국제강'},
+        '화학': {'051910': 'LG화학', '010950': 'S-Oil', '011170': '롯데케미칼'},
+        '조선': {'009540': '한국조선해양', '010620': '현대미포조선', '042660': '대우조선해양'},
+    },
+    'KOSDAQ': {
+        '바이오': {'196170': '알테오젠', '298380': '에이비엘바이오', '141080': '레고켐바이오'},
+        '2차전지소재': {'247540': '에코프로비엠', '278280': '천보', '086520': '에코프로'},
+        '게임': {'263750': '펄어비스', '112040': '위메이드', '194480': '데브시스터즈'},
+        'IT서비스': {'403870': '플레이트', '053800': '안랩', '030520': '한글과컴퓨터'},
+        '반도체장비': {'036830': '솔브레인홀딩스', '098460': '고영', '240810': '원익IPS'},
+    },
+    'US': {
+        'Technology': {'NVDA': 'NVIDIA', 'AAPL': 'Apple', 'MSFT': 'Microsoft', 'GOOGL': 'Google', 'META': 'Meta'},
+        'Healthcare': {'UNH': 'UnitedHealth', 'JNJ': 'J&J', 'PFE': 'Pfizer', 'ABBV': 'Abbvie', 'MRK': 'Merck'},
+        'Financials': {'JPM': 'JPMorgan', 'BAC': 'Bank of America', 'WFC': 'Wells Fargo', 'GS': 'Goldman', 'MS': 'Morgan Stanley'},
+        'Energy': {'XOM': 'Exxon', 'CVX': 'Chevron', 'COP': 'ConocoPhillips', 'SLB': 'Schlumberger', 'EOG': 'EOG'},
+        'Consumer': {'AMZN': 'Amazon', 'TSLA': 'Tesla', 'WMT': 'Walmart', 'HD': 'Home Depot', 'NKE': 'Nike'},
+    },
+}
+
+# 스냅샷 파일에서 허용하는 컬럼 이름
+_COLUMN_ALIASES = {
+    'code': ['code', 'Code', 'Symbol', 'symbol', 'ticker', 'Ticker'],
+    'name': ['name', 'Name'],
+    'sector': ['sector', 'Sector', 'Industry', 'industry'],
+}
+
+
+def snapshot_path(market: str, root: str = None):
+    """시장별 스냅샷 파일 경로 (Parquet 우선, 없으면 CSV, 둘 다 없으면 None)"""
+    root = root or UNIVERSE_DIR
+    for ext in ('parquet', 'csv'):
+        path = os.path.join(root, f"{market}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def normalize_listing(df: pd.DataFrame) -> pd.DataFrame:
+    """상장 목록을 code/name/sector 세 컬럼으로 정리"""
+    columns = {}
+    for target, aliases in _COLUMN_ALIASES.items():
+        found = next((c for c in aliases if c in df.columns), None)
+        if found is None:
+            raise ValueError(f"'{target}' 컬럼이 없습니다. (허용: {', '.join(aliases)})")
+        columns[found] = target
+
+    df = df[list(columns)].rename(columns=columns).dropna(subset=['code', 'sector'])
+    df['code'] = df['code'].astype(str).str.strip()
+    df['name'] = df['name'].fillna(df['code']).astype(str)
+    df['sector'] = df['sector'].astype(str).str.strip()
+    return df.drop_duplicates(['code', 'sector']).reset_index(drop=True)
+
+
+def read_listing(path: str) -> pd.DataFrame:
+    """스냅샷 파일 읽기"""
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype=str)
+    return normalize_listing(df)
+
+
+def load_universe(market: str, root: str = None) -> dict:
+    """섹터 -> {종목코드: 종목명} (스냅샷이 없으면 기본 종목)"""
+    path = snapshot_path(market, root)
+    if path is None:
+        return DEFAULT_UNIVERSE.get(market, DEFAULT_UNIVERSE['KOSPI'])
+
+    universe = {}
+    for row in read_listing(path).itertuples(index=False):
+        universe.setdefault(row.sector, {})[row.code] = row.name
+    return universe
+
+
+def ticker_index(universe: dict) -> dict:
+    """종목코드 -> [(섹터, 종목명, 순번)] (순번 = 섹터 순으로 펼친 전체 목록에서의 위치, 여러 섹터 종목은 항목 여러 개)"""
+    index = {}
+    order = 0
+    for sector, stocks in universe.items():
+        for code, name in stocks.items():
+            index.setdefault(code, []).append((sector, name, order))
+            order += 1
+    return index
+
+
+def save_listing_snapshot(market: str, root: str = None) -> str:
+    """FinanceDataReader 상장 종목 목록을 받아 스냅샷으로 저장"""
+    import FinanceDataReader as fdr
+
+    if market == 'US':
+        listing = fdr.StockListing('S&P500')
+    else:
+        listing = fdr.StockListing('KRX-DESC')
+        listing = listing[listing['Market'] == market]
+
+    root = root or UNIVERSE_DIR
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{market}.parquet")
+    normalize_listing(listing).to_parquet(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    # 사용법: python universe.py KOSPI KOSDAQ US
+    for market in sys.argv[1:] or ['KOSPI', 'KOSDAQ', 'US']:
+        path = save_listing_snapshot(market)
+        print(f"{market}: {len(read_listing(path))}개 종목 -> {path}")